@@ -1,9 +1,20 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import CustomUser
+from django.contrib.auth.forms import AdminPasswordChangeForm
+from .models import CustomUser, OutboundEmail
+
+
+class RevokingAdminPasswordChangeForm(AdminPasswordChangeForm):
+    """Password change in the admin that also revokes the user's issued tokens"""
+
+    def save(self, commit=True):
+        self.user.revoke_tokens()
+        return super().save(commit)
+
 
 class CustomUserAdmin(UserAdmin):
     model = CustomUser
+    change_password_form = RevokingAdminPasswordChangeForm
     list_display = ('email', 'username', 'first_name', 'last_name', 'is_staff', 'is_active', 'date_joined')
     list_filter = ('is_staff', 'is_active', 'is_superuser', 'date_joined')
     search_fields = ('email', 'username', 'first_name', 'last_name')
@@ -24,3 +35,12 @@ class CustomUserAdmin(UserAdmin):
     )
 
 admin.site.register(CustomUser, CustomUserAdmin)
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'to_email', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('to_email', 'subject')
+    ordering = ('-created_at',)
+    readonly_fields = ('created_at', 'sent_at', 'last_error')
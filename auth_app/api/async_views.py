@@ -0,0 +1,139 @@
+"""
+Async variants of the login and registration endpoints (AUTH_ASYNC_VIEWS)
+
+Under ASGI the event loop keeps serving other requests while the password
+hash is computed in the bounded hashing pool; database access goes through
+the async ORM or sync_to_async. Status codes and bodies match the sync
+views, so clients cannot tell which variant answered.
+"""
+import json
+from asgiref.sync import sync_to_async
+from django.contrib.auth.hashers import check_password, make_password
+from django.http import JsonResponse
+from django.views import View
+from rest_framework.exceptions import Throttled
+from core.throttling import get_throttle_wait
+from .serializers import LoginSerializer, UserRegistrationSerializer, UserSerializer
+from ..hashing import HashingOverloaded, run_hashing
+from ..models import CustomUser as User
+from ..services import send_activation_email
+from ..tokens import VersionedRefreshToken
+from ..utils import get_login_error, login_validation_error, registration_validation_error, set_auth_cookies
+
+
+def parse_json_body(request):
+    """
+    Returns (data, None) or (None, error message) with DRF's JSON parser wording
+    """
+    try:
+        return json.loads(request.body.decode() or '{}'), None
+    except (ValueError, UnicodeDecodeError) as e:
+        return None, f'JSON parse error - {e}'
+
+
+def throttled_response(wait):
+    exception = Throttled(wait)
+    response = JsonResponse({'detail': str(exception.detail)}, status=exception.status_code)
+    response['Retry-After'] = str(exception.wait)
+    return response
+
+
+def overloaded_response():
+    response = JsonResponse({'error': 'Server ausgelastet, bitte erneut versuchen.'}, status=503)
+    response['Retry-After'] = '1'
+    return response
+
+
+def create_inactive_user(email, password_hash):
+    """
+    Legt einen inaktiven Benutzer mit bereits gehashtem Passwort und Aktivierungstoken an
+    """
+    return User.objects.create_user_with_unique_username(
+        email=email, password_hash=password_hash, is_active=False, **User.new_activation_token()
+    )
+
+
+class AsyncAuthView(View):
+    """
+    Basis: JSON-Body lesen und die Ratenbegrenzung des Scopes anwenden
+    """
+    http_method_names = ['post', 'options']
+    throttle_scope = None
+
+    async def get_data(self, request):
+        """
+        Returns (data, None) or (None, error response)
+        """
+        data, parse_error = parse_json_body(request)
+        if parse_error:
+            return None, JsonResponse({'detail': parse_error}, status=400)
+        wait = await sync_to_async(get_throttle_wait)(request, data, self.throttle_scope)
+        if wait:
+            return None, throttled_response(wait)
+        return data, None
+
+
+class AsyncLoginView(AsyncAuthView):
+    throttle_scope = 'login'
+
+    async def post(self, request):
+        data, error = await self.get_data(request)
+        if error:
+            return error
+
+        serializer = LoginSerializer(data=data)
+        if not serializer.is_valid():
+            return JsonResponse(login_validation_error(serializer.errors), status=400)
+        email = serializer.validated_data['email']
+        password = serializer.validated_data['password']
+
+        user = await User.objects.filter(email=email).afirst()
+        try:
+            if user is None:
+                # Gleiche Laufzeit wie bei existierenden Konten
+                await run_hashing(make_password, password)
+                valid = False
+            else:
+                valid = await run_hashing(check_password, password, user.password)
+        except HashingOverloaded:
+            return overloaded_response()
+
+        login_error = get_login_error(user, valid)
+        if login_error:
+            return JsonResponse({'error': login_error}, status=401)
+
+        refresh = await sync_to_async(VersionedRefreshToken.for_user)(user)
+        response = JsonResponse({
+            'detail': 'Login successful!',
+            'access': str(refresh.access_token),
+            'refresh': str(refresh),
+            'user': UserSerializer(user).data,
+        })
+        set_auth_cookies(response, refresh)
+        return response
+
+
+class AsyncRegisterView(AsyncAuthView):
+    throttle_scope = 'register'
+
+    async def post(self, request):
+        data, error = await self.get_data(request)
+        if error:
+            return error
+
+        serializer = UserRegistrationSerializer(data=data)
+        if not await sync_to_async(serializer.is_valid)():
+            return JsonResponse(registration_validation_error(serializer.errors), status=400)
+
+        try:
+            password_hash = await run_hashing(make_password, serializer.validated_data['password'])
+        except HashingOverloaded:
+            return overloaded_response()
+
+        user = await sync_to_async(create_inactive_user)(serializer.validated_data['email'], password_hash)
+        await sync_to_async(send_activation_email)(user, request)
+        return JsonResponse({
+            'user': UserSerializer(user).data,
+            'token': str(user.activation_token),
+            'message': 'Registrierung erfolgreich! Bitte überprüfen Sie Ihre E-Mail.',
+        }, status=201)
@@ -1,7 +1,9 @@
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework_simplejwt.tokens import AccessToken
 from django.conf import settings
+from ..tokens import TOKEN_VERSION_CLAIM, get_cached_user
 
 
 class CustomJWTAuthentication(JWTAuthentication):
@@ -35,3 +37,40 @@ class CustomJWTAuthentication(JWTAuthentication):
             return AccessToken(raw_token)
         except (InvalidToken, TokenError) as e:
             raise InvalidToken(str(e))
+    
+    def get_user(self, validated_token):
+        """
+        Lädt den Benutzer des Tokens. Mit AUTH_USER_CACHE aus dem Prozess-/Redis-Cache
+        statt per SELECT; Tokens mit veralteter Version werden abgelehnt.
+        """
+        version = validated_token.get(TOKEN_VERSION_CLAIM)
+        if version is None or not settings.AUTH_USER_CACHE:
+            user = super().get_user(validated_token)
+            if version is not None and user.token_version != version:
+                raise AuthenticationFailed('Token wurde widerrufen.', code='token_revoked')
+            return user
+        
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Token enthält keine Benutzer-ID.')
+        
+        user = get_cached_user(user_id, version)
+        if user is None:
+            raise AuthenticationFailed('Benutzer nicht gefunden oder Token widerrufen.', code='user_not_found')
+        if not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed('Benutzer ist inaktiv.', code='user_inactive')
+        return user
+
+
+class StatelessJWTAuthentication(CustomJWTAuthentication):
+    """
+    Für lesende Endpunkte, die nur die Benutzer-ID brauchen: liefert einen TokenUser
+    aus den Token-Claims, ganz ohne Datenbank oder Cache. Widerrufene Tokens
+    bleiben bis zu ihrem Ablauf gültig.
+    """
+    
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken('Token enthält keine Benutzer-ID.')
+        return api_settings.TOKEN_USER_CLASS(validated_token)
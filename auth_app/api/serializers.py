@@ -25,22 +25,13 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
     
     def create(self, validated_data):
         confirmed_password = validated_data.pop('confirmed_password')
-        email = validated_data['email']
-        username = email.split('@')[0]
         
-        base_username = username
-        counter = 1
-        while User.objects.filter(username=username).exists():
-            username = f"{base_username}{counter}"
-            counter += 1
-        
-        user = User.objects.create_user(
-            username=username,
+        user = User.objects.create_user_with_unique_username(
             email=validated_data['email'],
             password=validated_data['password'],
-            is_active=False
+            is_active=False,
+            **User.new_activation_token()
         )
-        user.generate_activation_token()
         return user
 
 class UserSerializer(serializers.ModelSerializer):
@@ -55,12 +46,15 @@ class LoginSerializer(serializers.Serializer):
 class PasswordResetSerializer(serializers.Serializer):
     email = serializers.EmailField()
     
-    def validate_email(self, value):
+    def validate(self, attrs):
+        """
+        Looks the user up once and passes it on as validated_data['user']
+        """
         try:
-            User.objects.get(email=value)
+            attrs['user'] = User.objects.get(email=attrs['email'])
         except User.DoesNotExist:
-            raise serializers.ValidationError("Kein Benutzer mit dieser E-Mail-Adresse gefunden.")
-        return value
+            raise serializers.ValidationError({'email': "Kein Benutzer mit dieser E-Mail-Adresse gefunden."})
+        return attrs
 
 class PasswordConfirmSerializer(serializers.Serializer):
     new_password = serializers.CharField(write_only=True)
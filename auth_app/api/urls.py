@@ -1,11 +1,20 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from django.views.decorators.csrf import csrf_exempt
+from . import async_views, views
+
+if settings.AUTH_ASYNC_VIEWS:
+    register_view = csrf_exempt(async_views.AsyncRegisterView.as_view())
+    login_view = csrf_exempt(async_views.AsyncLoginView.as_view())
+else:
+    register_view = views.RegisterView.as_view()
+    login_view = views.LoginView.as_view()
 
 urlpatterns = [
     path('csrf-token/', views.CSRFTokenView.as_view(), name='csrf_token'),
-    path('register/', views.RegisterView.as_view(), name='register'),
+    path('register/', register_view, name='register'),
     path('activate/<str:uidb64>/<str:token>/', views.ActivateAccountView.as_view(), name='activate_account'),
-    path('login/', views.LoginView.as_view(), name='login'),
+    path('login/', login_view, name='login'),
     path('logout/', views.LogoutView.as_view(), name='logout'),
     path('token/refresh/', views.TokenRefreshView.as_view(), name='token_refresh'),
     path('password_reset/', views.PasswordResetView.as_view(), name='password_reset'),
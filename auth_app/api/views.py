@@ -1,12 +1,13 @@
 from rest_framework import generics, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import AllowAny
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.exceptions import TokenError
 from django.contrib.auth import authenticate
 from django.http import HttpResponseRedirect
 from django.conf import settings
+from core.throttling import AUTH_THROTTLE_CLASSES
 from .serializers import (
     UserRegistrationSerializer, 
     UserSerializer, 
@@ -14,19 +15,22 @@ from .serializers import (
     PasswordResetSerializer,
     PasswordConfirmSerializer
 )
-from ..models import CustomUser as User
+from ..tokens import VersionedRefreshToken
 from ..services import send_activation_email, send_password_reset_email
 from ..utils import (
-    get_user_by_id, validate_activation_token, activate_user, redirect_to_login,
+    get_user_by_activation_token, validate_activation_token, activate_user, redirect_to_login,
     authenticate_user, create_login_response, set_auth_cookies,
     blacklist_refresh_token, create_logout_response, clear_auth_cookies,
     get_refresh_token, create_refresh_response, set_access_token_cookie,
-    validate_password_reset_token, reset_user_password
+    get_user_by_password_reset_token, validate_password_reset_token, reset_user_password,
+    login_validation_error, registration_validation_error
 )
 
 class RegisterView(generics.CreateAPIView):
     serializer_class = UserRegistrationSerializer
     permission_classes = [AllowAny]
+    throttle_classes = AUTH_THROTTLE_CLASSES
+    throttle_scope = 'register'
     
     def create(self, request, *args, **kwargs):
         try:
@@ -45,6 +49,8 @@ class RegisterView(generics.CreateAPIView):
             
             return Response(response_data, status=status.HTTP_201_CREATED)
             
+        except ValidationError as e:
+            return Response(registration_validation_error(e.detail), status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response({
                 'error': f'Registration error: {str(e)}'
@@ -55,7 +61,7 @@ class ActivateAccountView(APIView):
     
     def get(self, request, uidb64, token):
         try:
-            user = get_user_by_id(uidb64)
+            user = get_user_by_activation_token(uidb64, token)
             if isinstance(user, Response):
                 return user
             
@@ -63,10 +69,9 @@ class ActivateAccountView(APIView):
             if validation_error:
                 return validation_error
             
-            if user.is_active:
+            if user.is_active or not activate_user(user, token):
                 return Response({'message': 'Account already activated.'}, status=status.HTTP_200_OK)
             
-            activate_user(user)
             return redirect_to_login(request)
             
         except Exception as e:
@@ -75,6 +80,8 @@ class ActivateAccountView(APIView):
 class LoginView(generics.GenericAPIView):
     serializer_class = LoginSerializer
     permission_classes = [AllowAny]
+    throttle_classes = AUTH_THROTTLE_CLASSES
+    throttle_scope = 'login'
     
     def post(self, request):
         try:
@@ -83,12 +90,14 @@ class LoginView(generics.GenericAPIView):
             if isinstance(user, Response):
                 return user
             
-            refresh = RefreshToken.for_user(user)
+            refresh = VersionedRefreshToken.for_user(user)
             response = create_login_response(user, refresh)
             set_auth_cookies(response, refresh)
             
             return response
             
+        except ValidationError as e:
+            return Response(login_validation_error(e.detail), status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response({'error': f'Login error: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -116,7 +125,7 @@ class TokenRefreshView(generics.GenericAPIView):
             if isinstance(refresh_token, Response):
                 return refresh_token
             
-            token = RefreshToken(refresh_token)
+            token = VersionedRefreshToken(refresh_token)
             response = create_refresh_response(token)
             set_access_token_cookie(response, token)
             
@@ -130,13 +139,14 @@ class TokenRefreshView(generics.GenericAPIView):
 class PasswordResetView(generics.GenericAPIView):
     serializer_class = PasswordResetSerializer
     permission_classes = [AllowAny]
+    throttle_classes = AUTH_THROTTLE_CLASSES
+    throttle_scope = 'password_reset'
     
     def post(self, request):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
-        email = serializer.validated_data['email']
-        user = User.objects.get(email=email)
+        user = serializer.validated_data['user']
         
         # Generate token before sending email
         user.generate_password_reset_token()
@@ -157,7 +167,7 @@ class PasswordConfirmView(generics.GenericAPIView):
         serializer.is_valid(raise_exception=True)
         
         try:
-            user = get_user_by_id(uidb64)
+            user = get_user_by_password_reset_token(uidb64, token)
             if isinstance(user, Response):
                 return user
             
@@ -165,7 +175,8 @@ class PasswordConfirmView(generics.GenericAPIView):
             if validation_error:
                 return validation_error
             
-            reset_user_password(user, serializer.validated_data['new_password'])
+            if not reset_user_password(user, token, serializer.validated_data['new_password']):
+                return Response({'error': 'Ungültiger Passwort-Reset-Token.'}, status=status.HTTP_400_BAD_REQUEST)
             
             return Response({'detail': 'Password has been reset successfully.'}, status=status.HTTP_200_OK)
             
@@ -0,0 +1,47 @@
+"""
+Authentication backend with a cached user lookup for session-authenticated requests
+"""
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from core.instrumentation import cache_get
+from .models import CustomUser as User
+
+SESSION_USER_CACHE_KEY = 'auth_session_user:{user_id}'
+SESSION_AUTH_HASH = '_session_auth_hash'
+
+
+def get_session_user_cache_key(user_id):
+    return SESSION_USER_CACHE_KEY.format(user_id=user_id)
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend whose get_user (called by AuthenticationMiddleware on every
+    session request) is served from the cache. The entry holds every field
+    except the password hash, plus the precomputed session auth hash the
+    session check needs; the password is loaded only if something asks for
+    it. The entry is dropped whenever the user is saved.
+    """
+
+    def get_user(self, user_id):
+        key = get_session_user_cache_key(user_id)
+        values = cache_get(key)
+        if values is None:
+            user = User._default_manager.filter(pk=user_id).first()
+            if user is None:
+                return None
+            values = {
+                field.attname: getattr(user, field.attname)
+                for field in User._meta.concrete_fields if field.attname != 'password'
+            }
+            values[SESSION_AUTH_HASH] = user.get_session_auth_hash()
+            cache.set(key, values, settings.AUTH_USER_CACHE_TIMEOUT)
+            return user if self.user_can_authenticate(user) else None
+
+        values = dict(values)
+        session_auth_hash = values.pop(SESSION_AUTH_HASH, None)
+        user = User.from_db(DEFAULT_DB_ALIAS, list(values), list(values.values()))
+        user.cached_session_auth_hash = session_auth_hash
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,177 @@
+"""
+Refresh token blacklist lookups in front of the simplejwt tables
+
+Blacklisted jtis are mirrored into Redis, either as a sorted set (jti scored
+by expiry, exact answers) or, with TOKEN_BLACKLIST_BLOOM, as a Bloom filter
+bitmap of fixed size that answers "definitely not blacklisted" and sends the
+rare positives to Postgres. Until the mirror has been loaded (see
+rebuild_blacklist_cache) every check goes to the database. The mirror fails
+closed: if Redis errors, the mirror key was evicted, or a token could not be
+mirrored, checks go to the database until the next rebuild.
+"""
+import hashlib
+import logging
+import time
+from django.conf import settings
+from django.utils import timezone
+from redis.exceptions import RedisError
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from core.redis_client import get_redis_connection
+
+BLACKLIST_SET_KEY = 'token_blacklist:jtis'
+BLACKLIST_BLOOM_KEY = 'token_blacklist:bloom'
+BLACKLIST_READY_KEY = 'token_blacklist:ready'
+# Keeps the sorted set alive when no token is blacklisted; never pruned
+SET_SENTINEL = '__loaded__'
+
+logger = logging.getLogger(__name__)
+
+
+def bloom_offsets(jti):
+    """
+    Bit positions of a jti in the Bloom filter (double hashing over one SHA-256)
+    """
+    digest = hashlib.sha256(jti.encode()).digest()
+    first = int.from_bytes(digest[:8], 'big')
+    second = int.from_bytes(digest[8:16], 'big') | 1
+    size = settings.TOKEN_BLACKLIST_BLOOM_BITS
+    return [(first + index * second) % size for index in range(settings.TOKEN_BLACKLIST_BLOOM_HASHES)]
+
+
+def _db_is_blacklisted(jti):
+    return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+
+def _add(pipe, key, jti, exp):
+    if settings.TOKEN_BLACKLIST_BLOOM:
+        for offset in bloom_offsets(jti):
+            pipe.setbit(key, offset, 1)
+    else:
+        pipe.zadd(key, {jti: exp})
+
+
+def _cache_key():
+    return BLACKLIST_BLOOM_KEY if settings.TOKEN_BLACKLIST_BLOOM else BLACKLIST_SET_KEY
+
+
+def _add_sentinel(pipe, key):
+    """
+    Creates the set/filter even without entries, so an evicted key can be told
+    apart from an empty blacklist
+    """
+    if settings.TOKEN_BLACKLIST_BLOOM:
+        pipe.setbit(key, settings.TOKEN_BLACKLIST_BLOOM_BITS - 1, 0)
+    else:
+        pipe.zadd(key, {SET_SENTINEL: float('inf')})
+
+
+def is_blacklisted(jti):
+    """
+    Checks a refresh token jti against the Redis mirror, falling back to the
+    database while the mirror is not loaded, missing or unreachable, or the
+    Bloom filter reports a hit
+    """
+    redis = get_redis_connection()
+    if redis is None:
+        return _db_is_blacklisted(jti)
+
+    try:
+        pipe = redis.pipeline()
+        pipe.get(BLACKLIST_READY_KEY)
+        pipe.exists(_cache_key())
+        if settings.TOKEN_BLACKLIST_BLOOM:
+            for offset in bloom_offsets(jti):
+                pipe.getbit(BLACKLIST_BLOOM_KEY, offset)
+        else:
+            pipe.zscore(BLACKLIST_SET_KEY, jti)
+        ready, loaded, *results = pipe.execute()
+    except RedisError as e:
+        logger.warning(f"Token blacklist mirror unavailable, checking the database: {e}")
+        return _db_is_blacklisted(jti)
+
+    if not ready or not loaded:
+        return _db_is_blacklisted(jti)
+    if settings.TOKEN_BLACKLIST_BLOOM:
+        return all(results) and _db_is_blacklisted(jti)
+    return results[0] is not None
+
+
+def add_to_blacklist(jti, exp):
+    """
+    Mirrors a token that was just written to the blacklist table. If that
+    fails the mirror is marked as not loaded, so checks go to the database
+    until the next rebuild instead of accepting the revoked token.
+    """
+    redis = get_redis_connection()
+    if redis is None:
+        return
+    try:
+        pipe = redis.pipeline()
+        _add(pipe, _cache_key(), jti, exp)
+        pipe.execute()
+    except RedisError as e:
+        logger.warning(f"Could not mirror blacklisted token, disabling the mirror until the next rebuild: {e}")
+        try:
+            redis.delete(BLACKLIST_READY_KEY)
+        except RedisError:
+            logger.error("Could not reset the token blacklist ready flag; run rebuild_blacklist_cache")
+
+
+def rebuild_blacklist_cache(batch_size=None):
+    """
+    Loads all unexpired blacklisted jtis into a fresh set/filter and swaps it
+    in atomically. Entries blacklisted while loading are added again after the
+    swap. Returns the number of mirrored tokens, or None without Redis.
+    """
+    redis = get_redis_connection()
+    if redis is None:
+        return None
+
+    batch_size = batch_size or settings.TOKEN_BLACKLIST_PRUNE_BATCH_SIZE
+    key = _cache_key()
+    building_key = f'{key}:building'
+    started = timezone.now()
+    rows = BlacklistedToken.objects.filter(token__expires_at__gt=started).values_list('token__jti', 'token__expires_at')
+
+    redis.delete(building_key)
+    total = 0
+    pipe = redis.pipeline()
+    _add_sentinel(pipe, building_key)
+    for jti, expires_at in rows.iterator(chunk_size=batch_size):
+        _add(pipe, building_key, jti, expires_at.timestamp())
+        total += 1
+        if total % batch_size == 0:
+            pipe.execute()
+    pipe.execute()
+
+    redis.rename(building_key, key)
+    for jti, expires_at in rows.filter(blacklisted_at__gte=started):
+        _add(pipe, key, jti, expires_at.timestamp())
+    pipe.execute()
+    redis.set(BLACKLIST_READY_KEY, 1)
+    return total
+
+
+def prune_expired_tokens(batch_size=None):
+    """
+    Deletes expired outstanding tokens (and their blacklist entries) in small
+    batches so that no statement holds locks on the whole table, then drops
+    expired jtis from the Redis mirror. Returns the number of deleted tokens.
+    """
+    batch_size = batch_size or settings.TOKEN_BLACKLIST_PRUNE_BATCH_SIZE
+    now = timezone.now()
+    deleted = 0
+    while True:
+        ids = list(
+            OutstandingToken.objects.filter(expires_at__lte=now).order_by('id').values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        BlacklistedToken.objects.filter(token_id__in=ids).delete()
+        OutstandingToken.objects.filter(id__in=ids).delete()
+        deleted += len(ids)
+
+    redis = get_redis_connection()
+    if redis is not None and not settings.TOKEN_BLACKLIST_BLOOM:
+        redis.zremrangebyscore(BLACKLIST_SET_KEY, '-inf', time.time())
+    return deleted
@@ -0,0 +1,86 @@
+"""
+Batch cleanup of expired activation/reset tokens, abandoned registrations and sessions
+
+Rows are selected by primary key in small batches and updated or deleted per
+batch, so every statement only locks the rows of its batch.
+"""
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.db.models import Q
+from django.utils import timezone
+from .models import ACTIVATION_TOKEN_LIFETIME, PASSWORD_RESET_TOKEN_LIFETIME, CustomUser as User
+
+
+def _in_batches(queryset, batch_size, apply):
+    """
+    Applies `apply` to the matching rows batch by batch until none are left.
+    Returns the number of processed rows.
+    """
+    total = 0
+    while True:
+        ids = list(queryset.order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return total
+        apply(queryset.filter(pk__in=ids))
+        total += len(ids)
+
+
+def clear_expired_password_reset_tokens(batch_size=None):
+    cutoff = timezone.now() - PASSWORD_RESET_TOKEN_LIFETIME
+    return _in_batches(
+        User.objects.filter(password_reset_token__isnull=False, password_reset_token_created__lt=cutoff),
+        batch_size or settings.ACCOUNT_CLEANUP_BATCH_SIZE,
+        lambda batch: batch.update(password_reset_token=None, password_reset_token_created=None),
+    )
+
+
+def clear_expired_activation_tokens(batch_size=None):
+    """
+    Clears expired activation tokens of accounts that are already active
+    """
+    cutoff = timezone.now() - ACTIVATION_TOKEN_LIFETIME
+    return _in_batches(
+        User.objects.filter(is_active=True, activation_token__isnull=False, activation_token_created__lt=cutoff),
+        batch_size or settings.ACCOUNT_CLEANUP_BATCH_SIZE,
+        lambda batch: batch.update(activation_token=None, activation_token_created=None),
+    )
+
+
+def delete_abandoned_accounts(batch_size=None):
+    """
+    Deletes registrations that were never activated: inactive, still holding
+    an activation token that expired more than ACCOUNT_ABANDONED_DAYS ago.
+    Deactivated accounts have no activation token and are never touched.
+    """
+    cutoff = timezone.now() - ACTIVATION_TOKEN_LIFETIME - timezone.timedelta(days=settings.ACCOUNT_ABANDONED_DAYS)
+    return _in_batches(
+        User.objects.filter(
+            Q(activation_token_created__lt=cutoff) | Q(activation_token_created__isnull=True),
+            is_active=False, activation_token__isnull=False, date_joined__lt=cutoff,
+        ),
+        batch_size or settings.ACCOUNT_CLEANUP_BATCH_SIZE,
+        lambda batch: batch.delete(),
+    )
+
+
+def clear_expired_sessions(batch_size=None):
+    """
+    Batched variant of `clearsessions` for the db and cached_db session stores
+    (cache-only sessions expire in Redis on their own)
+    """
+    return _in_batches(
+        Session.objects.filter(expire_date__lt=timezone.now()),
+        batch_size or settings.SESSION_CLEANUP_BATCH_SIZE,
+        lambda batch: batch.delete(),
+    )
+
+
+def purge_stale_accounts(batch_size=None):
+    """
+    Runs all cleanup steps, returns the number of affected accounts per step
+    """
+    return {
+        'reset_tokens_cleared': clear_expired_password_reset_tokens(batch_size),
+        'activation_tokens_cleared': clear_expired_activation_tokens(batch_size),
+        'abandoned_accounts_deleted': delete_abandoned_accounts(batch_size),
+    }
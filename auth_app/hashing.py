@@ -0,0 +1,46 @@
+"""
+Bounded thread pool for password hashing in the async auth views
+
+PBKDF2 spends its time in C code that releases the GIL, so a few threads
+hash in parallel while the event loop keeps serving other requests. The
+pool size caps the CPU spent on hashing per process; once more than
+AUTH_HASH_MAX_PENDING hashes are queued, new ones are refused.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+
+
+class HashingOverloaded(Exception):
+    """Raised when the hashing queue is full"""
+
+
+_executor = None
+_executor_lock = threading.Lock()
+_pending = 0
+_pending_lock = threading.Lock()
+
+
+def get_hash_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.AUTH_HASH_WORKERS, thread_name_prefix='auth-hash')
+        return _executor
+
+
+async def run_hashing(func, *args):
+    """
+    Runs a CPU-bound hashing function in the bounded pool and awaits the result
+    """
+    global _pending
+    with _pending_lock:
+        if _pending >= settings.AUTH_HASH_MAX_PENDING:
+            raise HashingOverloaded()
+        _pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(get_hash_executor(), func, *args)
+    finally:
+        with _pending_lock:
+            _pending -= 1
@@ -0,0 +1,155 @@
+"""
+Pooled, persistent SMTP connections for the e-mail outbox worker
+
+Every connection of the pool performs the TLS handshake and login once
+and is then reused for many messages. Connections that were dropped by
+the server are discarded and replaced transparently.
+"""
+import logging
+import queue
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.mail import get_connection
+
+logger = logging.getLogger(__name__)
+
+RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError)
+
+
+class SMTPConnectionPool:
+    """
+    Keeps up to `size` authenticated e-mail backend connections open and
+    spreads message batches across them
+    """
+
+    def __init__(self, size=None, max_idle=None, backend=None, **backend_kwargs):
+        self.size = size or settings.EMAIL_POOL_SIZE
+        self.max_idle = settings.EMAIL_POOL_MAX_IDLE if max_idle is None else max_idle
+        self.backend = backend
+        self.backend_kwargs = backend_kwargs
+        self._idle = queue.LifoQueue()
+
+    def _connect(self):
+        connection = get_connection(self.backend, fail_silently=False, **self.backend_kwargs)
+        connection.open()
+        return connection
+
+    def acquire(self):
+        """
+        Returns an idle connection or opens a new one. Connections that were
+        idle longer than max_idle are replaced, as servers drop them anyway.
+        """
+        while True:
+            try:
+                connection, idle_since = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if time.monotonic() - idle_since <= self.max_idle:
+                return connection
+            self.discard(connection)
+        return self._connect()
+
+    def release(self, connection):
+        self._idle.put((connection, time.monotonic()))
+
+    def discard(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def close(self):
+        """
+        Closes all idle connections
+        """
+        while True:
+            try:
+                connection, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self.discard(connection)
+
+    def _send_one(self, connection, message):
+        """
+        Sends a single message over the connection, reconnecting once if the
+        server dropped it. Returns the (possibly new) connection and the error.
+        """
+        for attempt in range(2):
+            try:
+                message.connection = connection
+                connection.send_messages([message])
+                return connection, None
+            except RECONNECT_ERRORS as e:
+                logger.warning(f"SMTP-Verbindung verloren, baue neu auf: {e}")
+                self.discard(connection)
+                try:
+                    connection = self.acquire()
+                except Exception as connect_error:
+                    return None, connect_error
+                if attempt == 1:
+                    return connection, e
+            except Exception as e:
+                return connection, e
+
+    def _send_chunk(self, messages):
+        try:
+            connection = self.acquire()
+        except Exception as e:
+            return [e] * len(messages)
+
+        errors = []
+        for index, message in enumerate(messages):
+            connection, error = self._send_one(connection, message)
+            errors.append(error)
+            if connection is None:
+                errors.extend([error] * (len(messages) - index - 1))
+                return errors
+        self.release(connection)
+        return errors
+
+    def send_batch(self, messages):
+        """
+        Sends the messages over up to `size` connections in parallel.
+        Returns one entry per message: None on success, otherwise the error.
+        """
+        if not messages:
+            return []
+        workers = min(self.size, len(messages))
+        chunks = [messages[index::workers] for index in range(workers)]
+        if workers == 1:
+            results = [self._send_chunk(chunks[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(self._send_chunk, chunks))
+
+        errors = [None] * len(messages)
+        for chunk_index, chunk_errors in enumerate(results):
+            for position, error in enumerate(chunk_errors):
+                errors[chunk_index + position * workers] = error
+        return errors
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_mail_pool():
+    """
+    Returns the process-wide connection pool
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = SMTPConnectionPool()
+        return _pool
+
+
+def close_mail_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
@@ -0,0 +1,54 @@
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from auth_app.models import CustomUser
+from core.benchmarking import format_summary, stopwatch, summarize
+
+CONFIGURATIONS = [
+    ('db sessions, ModelBackend', 'django.contrib.sessions.backends.db', 'django.contrib.auth.backends.ModelBackend'),
+    ('cached_db, ModelBackend', 'django.contrib.sessions.backends.cached_db', 'django.contrib.auth.backends.ModelBackend'),
+    ('cached_db, CachedModelBackend', 'django.contrib.sessions.backends.cached_db', 'auth_app.backends.CachedModelBackend'),
+    ('cache, CachedModelBackend', 'django.contrib.sessions.backends.cache', 'auth_app.backends.CachedModelBackend'),
+]
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Measures admin page latency and DB queries per request for the session store / auth backend combinations'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--path', default='/admin/')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                admin = CustomUser.objects.create_superuser(email='bench-admin@videoflix.local', password='benchmark')
+                for name, engine, backend in CONFIGURATIONS:
+                    with override_settings(SESSION_ENGINE=engine, AUTHENTICATION_BACKENDS=[backend], ALLOWED_HOSTS=['*']):
+                        self._run(name, admin, options['path'], options['requests'])
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+    def _run(self, name, admin, path, requests):
+        cache.clear()
+        client = Client()
+        client.force_login(admin, backend=None)
+        client.get(path)
+
+        samples = []
+        queries = 0
+        for _ in range(requests):
+            with CaptureQueriesContext(connection) as captured, stopwatch(samples):
+                response = client.get(path)
+            queries += len(captured)
+        if response.status_code != 200:
+            self.stderr.write(f'{name}: {path} answered {response.status_code}')
+
+        self.stdout.write(f'{format_summary(name, summarize(samples))} queries/request={queries / requests:.1f}')
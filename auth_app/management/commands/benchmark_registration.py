@@ -0,0 +1,78 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from auth_app.models import CustomUser
+
+FAST_HASHER = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Load test for username allocation: thousands of signups sharing one e-mail prefix'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--signups', type=int, default=2000)
+        parser.add_argument('--prefix', default='info')
+        parser.add_argument('--concurrency', type=int, default=1,
+                            help='Parallel registrations (>1 commits rows and deletes them afterwards)')
+
+    def handle(self, *args, **options):
+        with override_settings(PASSWORD_HASHERS=FAST_HASHER):
+            if options['concurrency'] > 1:
+                self._concurrent(options['signups'], options['prefix'], options['concurrency'])
+            else:
+                self._sequential(options['signups'], options['prefix'])
+
+    def _sequential(self, signups, prefix):
+        try:
+            with transaction.atomic():
+                started = time.perf_counter()
+                with CaptureQueriesContext(connection) as queries:
+                    for index in range(signups):
+                        CustomUser.objects.create_user_with_unique_username(
+                            email=f'{prefix}@bench-{index}.example.com', password='benchmark'
+                        )
+                elapsed = time.perf_counter() - started
+                last_username = CustomUser.objects.filter(email=f'{prefix}@bench-{signups - 1}.example.com').values_list('username', flat=True).first()
+                self.stdout.write(
+                    f'{signups} signups in {elapsed:.2f}s ({signups / elapsed:.0f}/s), '
+                    f'{len(queries) / signups:.1f} queries per signup, last username {last_username}'
+                )
+                raise _Rollback()
+        except _Rollback:
+            self.stdout.write('Benchmark users rolled back.')
+
+    def _concurrent(self, signups, prefix, concurrency):
+        domain = f'bench-{int(time.time())}.example.com'
+        errors = []
+        lock = threading.Lock()
+
+        def register(index):
+            try:
+                CustomUser.objects.create_user_with_unique_username(
+                    email=f'{prefix}@{index}.{domain}', password='benchmark'
+                )
+            except Exception as e:
+                with lock:
+                    errors.append(e)
+            finally:
+                close_old_connections()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(register, range(signups)))
+        elapsed = time.perf_counter() - started
+
+        created = CustomUser.objects.filter(email__endswith=domain)
+        usernames = list(created.values_list('username', flat=True))
+        self.stdout.write(
+            f'{signups} signups with {concurrency} threads in {elapsed:.2f}s ({signups / elapsed:.0f}/s), '
+            f'{len(usernames)} created, {len(set(usernames))} distinct usernames, {len(errors)} errors'
+        )
+        created.delete()
@@ -0,0 +1,104 @@
+import asyncio
+import socket
+import threading
+import time
+import warnings
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand, CommandError
+from auth_app.mail import SMTPConnectionPool
+
+SMTP_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_sink_server(port, handshake_delay):
+    """
+    Starts a local SMTP server that accepts and discards every message:
+    aiosmtpd if installed, otherwise the stdlib smtpd module (Python < 3.12).
+    Returns a callable that stops the server.
+    """
+    try:
+        from aiosmtpd.controller import Controller
+    except ImportError:
+        Controller = None
+
+    if Controller is not None:
+        class SinkHandler:
+            async def handle_EHLO(self, server, session, envelope, hostname, responses):
+                await asyncio.sleep(handshake_delay)
+                session.host_name = hostname
+                return responses
+
+            async def handle_DATA(self, server, session, envelope):
+                return '250 Message accepted'
+
+        controller = Controller(SinkHandler(), hostname='127.0.0.1', port=port)
+        controller.start()
+        return controller.stop
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', DeprecationWarning)
+        try:
+            import asyncore
+            import smtpd
+        except ImportError:
+            raise CommandError('Neither aiosmtpd nor smtpd is available, install aiosmtpd to run this benchmark.')
+
+    class SinkChannel(smtpd.SMTPChannel):
+        def smtp_EHLO(self, arg):
+            time.sleep(handshake_delay)
+            super().smtp_EHLO(arg)
+
+    class SinkServer(smtpd.SMTPServer):
+        channel_class = SinkChannel
+
+        def process_message(self, peer, mailfrom, rcpttos, data, **kwargs):
+            return None
+
+    server = SinkServer(('127.0.0.1', port), None)
+    thread = threading.Thread(target=asyncore.loop, kwargs={'timeout': 0.05}, daemon=True)
+    thread.start()
+    return server.close
+
+
+class Command(BaseCommand):
+    help = 'Compares one SMTP session per e-mail with the pooled delivery against a local sink server'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--messages', type=int, default=500)
+        parser.add_argument('--pool-size', type=int, default=4)
+        parser.add_argument('--handshake-delay', type=float, default=0.02,
+                            help='Seconds added to EHLO to stand in for TLS handshake and login')
+
+    def handle(self, *args, **options):
+        port = _free_port()
+        stop = start_sink_server(port, options['handshake_delay'])
+        backend_kwargs = {'host': '127.0.0.1', 'port': port, 'use_tls': False, 'use_ssl': False,
+                          'username': '', 'password': ''}
+        try:
+            messages = [
+                EmailMessage(f'Benchmark {index}', 'Body', 'bench@videoflix.local', ['user@example.com'])
+                for index in range(options['messages'])
+            ]
+            self._report('connection per e-mail', len(messages), lambda: self._unpooled(messages, backend_kwargs))
+            pool = SMTPConnectionPool(size=options['pool_size'], backend=SMTP_BACKEND, **backend_kwargs)
+            self._report(f"pool of {options['pool_size']}", len(messages), lambda: pool.send_batch(messages))
+            pool.close()
+        finally:
+            stop()
+
+    def _unpooled(self, messages, backend_kwargs):
+        for message in messages:
+            message.connection = get_connection(SMTP_BACKEND, fail_silently=False, **backend_kwargs)
+            message.send()
+
+    def _report(self, name, count, send):
+        started = time.perf_counter()
+        send()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f'{name:<24} {count} e-mails in {elapsed:.2f}s ({count / elapsed:.1f}/s)')
@@ -0,0 +1,55 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.test.utils import override_settings
+from rest_framework.test import APIRequestFactory
+from auth_app.api.views import LoginView
+
+
+class Command(BaseCommand):
+    help = 'Simulates a credential-stuffing burst against the login view and reports worker CPU with and without the rate limiter'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--attempts', type=int, default=200)
+        parser.add_argument('--ips', type=int, default=2, help='Number of attacking client IPs')
+        parser.add_argument('--threads', type=int, default=4)
+
+    def handle(self, *args, **options):
+        for enabled in (False, True):
+            with override_settings(THROTTLE_ENABLED=enabled):
+                self._attack(enabled, options['attempts'], options['ips'], options['threads'])
+
+    def _attack(self, enabled, attempts, ips, threads):
+        factory = APIRequestFactory()
+        view = LoginView.as_view()
+        network = random.randint(1, 254)
+        statuses = {}
+
+        def attempt(index):
+            request = factory.post(
+                '/api/login/',
+                {'email': f'victim{index}@example.com', 'password': 'guess'},
+                format='json',
+                REMOTE_ADDR=f'10.{network}.0.{index % ips + 1}',
+            )
+            try:
+                return view(request).status_code
+            finally:
+                close_old_connections()
+
+        cpu_started = time.process_time()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            for status_code in executor.map(attempt, range(attempts)):
+                statuses[status_code] = statuses.get(status_code, 0) + 1
+        elapsed = time.perf_counter() - started
+        cpu = time.process_time() - cpu_started
+
+        label = 'with limiter' if enabled else 'without limiter'
+        summary = ', '.join(f'{code}: {count}' for code, count in sorted(statuses.items()))
+        self.stdout.write(
+            f'{label:<16} {attempts} attempts in {elapsed:.2f}s, CPU {cpu:.2f}s '
+            f'({cpu / attempts * 1000:.1f} ms per attempt) [{summary}]'
+        )
@@ -0,0 +1,19 @@
+import time
+from django.core.management.base import BaseCommand
+from auth_app.cleanup import clear_expired_sessions
+
+
+class Command(BaseCommand):
+    help = 'Deletes expired sessions from the session table in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=int, default=0, help='Repeat every N seconds (0 = run once)')
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        while True:
+            deleted = clear_expired_sessions(options['batch_size'])
+            self.stdout.write(f'Deleted {deleted} expired sessions.')
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
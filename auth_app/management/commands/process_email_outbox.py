@@ -0,0 +1,27 @@
+import time
+from django.core.management.base import BaseCommand
+from auth_app.services import get_outbox_stats, process_outbox
+
+
+class Command(BaseCommand):
+    help = 'Delivers queued e-mails from the outbox with retries and backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=int, default=0, help='Poll every N seconds (0 = run once)')
+        parser.add_argument('--batch-size', type=int, default=None, help='E-mails per batch')
+        parser.add_argument('--stats', action='store_true', help='Only print queue depth and delivery latency')
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            for name, value in get_outbox_stats().items():
+                self.stdout.write(f'{name}: {value}')
+            return
+
+        while True:
+            sent = process_outbox(options['batch_size'])
+            if sent:
+                self.stdout.write(f'Sent {sent} e-mails.')
+                continue
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
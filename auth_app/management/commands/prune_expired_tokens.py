@@ -0,0 +1,23 @@
+import time
+from django.core.management.base import BaseCommand
+from auth_app.blacklist import prune_expired_tokens, rebuild_blacklist_cache
+
+
+class Command(BaseCommand):
+    help = 'Deletes expired outstanding/blacklisted refresh tokens in batches and reloads the Redis blacklist mirror'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=int, default=0, help='Repeat every N seconds (0 = run once)')
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        while True:
+            deleted = prune_expired_tokens(options['batch_size'])
+            mirrored = rebuild_blacklist_cache(options['batch_size'])
+            message = f'Deleted {deleted} expired tokens.'
+            if mirrored is not None:
+                message += f' Mirrored {mirrored} blacklisted tokens to Redis.'
+            self.stdout.write(message)
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
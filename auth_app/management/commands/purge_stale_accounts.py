@@ -0,0 +1,23 @@
+import time
+from django.core.management.base import BaseCommand
+from auth_app.cleanup import purge_stale_accounts
+
+
+class Command(BaseCommand):
+    help = 'Clears expired activation/reset tokens and deletes never-activated accounts in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=int, default=0, help='Repeat every N seconds (0 = run once)')
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        while True:
+            result = purge_stale_accounts(options['batch_size'])
+            self.stdout.write(
+                f"Cleared {result['reset_tokens_cleared']} reset tokens and "
+                f"{result['activation_tokens_cleared']} activation tokens, "
+                f"deleted {result['abandoned_accounts_deleted']} abandoned accounts."
+            )
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:02
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def deduplicate_usernames(apps, schema_editor):
+    """
+    Renames all but the oldest account of duplicated usernames to
+    <username>_<id> so that the unique constraint can be created
+    """
+    CustomUser = apps.get_model('auth_app', 'CustomUser')
+    duplicates = (
+        CustomUser.objects.exclude(username__isnull=True)
+        .values('username').annotate(total=Count('id')).filter(total__gt=1)
+        .values_list('username', flat=True)
+    )
+    for username in list(duplicates):
+        for user in CustomUser.objects.filter(username=username).order_by('id')[1:]:
+            user.username = f"{username}_{user.id}"
+            user.save(update_fields=['username'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('auth_app', '0003_outboundemail'),
+    ]
+
+    operations = [
+        migrations.RunPython(deduplicate_usernames, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='customuser',
+            constraint=models.UniqueConstraint(fields=('username',), name='unique_username'),
+        ),
+    ]
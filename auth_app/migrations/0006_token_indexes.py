@@ -0,0 +1,32 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('auth_app', '0005_customuser_token_version'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='customuser',
+            name='activation_token',
+            field=models.UUIDField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.AlterField(
+            model_name='customuser',
+            name='password_reset_token',
+            field=models.UUIDField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(condition=models.Q(('activation_token__isnull', False)), fields=['activation_token_created'], name='activation_token_created'),
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(condition=models.Q(('password_reset_token__isnull', False)), fields=['password_reset_token_created'], name='reset_token_created'),
+        ),
+    ]
@@ -1,15 +1,23 @@
 from django.contrib.auth.models import AbstractUser, BaseUserManager
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 from django.utils import timezone
+import re
 import uuid
 
+ACTIVATION_TOKEN_LIFETIME = timezone.timedelta(hours=24)
+PASSWORD_RESET_TOKEN_LIFETIME = timezone.timedelta(hours=1)
+
 class CustomUserManager(BaseUserManager):
-    def create_user(self, email, password=None, **extra_fields):
+    def create_user(self, email, password=None, password_hash=None, **extra_fields):
         if not email:
             raise ValueError('The email address is required.')
         email = self.normalize_email(email)
         user = self.model(email=email, **extra_fields)
-        if password:
+        if password_hash:
+            user.password = password_hash
+        elif password:
             user.set_password(password)
         user.save(using=self._db)
         return user
@@ -25,57 +33,213 @@ class CustomUserManager(BaseUserManager):
             raise ValueError('Superuser must have is_superuser=True.')
         
         return self.create_user(email, password, **extra_fields)
+    
+    def next_free_username(self, base):
+        """
+        Returns base or base<N> with the smallest free N, using a single query
+        for all usernames that start with base
+        """
+        pattern = re.compile(rf'^{re.escape(base)}(\d*)$')
+        taken = set()
+        for username in self.filter(username__startswith=base).values_list('username', flat=True):
+            match = pattern.match(username)
+            if match:
+                taken.add(int(match.group(1) or 0))
+        
+        suffix = 0
+        while suffix in taken:
+            suffix += 1
+        return f"{base}{suffix}" if suffix else base
+    
+    def create_user_with_unique_username(self, email, password=None, max_attempts=5, **extra_fields):
+        """
+        Creates a user whose username is derived from the e-mail address. The
+        unique constraint on username decides concurrent registrations; the
+        loser retries with the next free suffix.
+        """
+        base = email.split('@')[0]
+        for attempt in range(max_attempts):
+            username = self.next_free_username(base)
+            try:
+                with transaction.atomic():
+                    return self.create_user(email, password, username=username, **extra_fields)
+            except IntegrityError:
+                if not self.filter(username=username).exists():
+                    raise
+        raise IntegrityError(f'No free username for {base} after {max_attempts} attempts.')
 
 class CustomUser(AbstractUser):
     email = models.EmailField(unique=True)
     username = models.CharField(max_length=150, blank=True, null=True)
-    activation_token = models.UUIDField(null=True, blank=True, editable=False)
+    activation_token = models.UUIDField(null=True, blank=True, editable=False, db_index=True)
     activation_token_created = models.DateTimeField(null=True, blank=True)
-    password_reset_token = models.UUIDField(null=True, blank=True, editable=False)
+    password_reset_token = models.UUIDField(null=True, blank=True, editable=False, db_index=True)
     password_reset_token_created = models.DateTimeField(null=True, blank=True)
+    token_version = models.PositiveIntegerField(default=0)
     
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = []
     
     objects = CustomUserManager() 
     
+    class Meta(AbstractUser.Meta):
+        constraints = [
+            models.UniqueConstraint(fields=['username'], name='unique_username'),
+        ]
+        indexes = [
+            models.Index(fields=['activation_token_created'], name='activation_token_created',
+                         condition=models.Q(activation_token__isnull=False)),
+            models.Index(fields=['password_reset_token_created'], name='reset_token_created',
+                         condition=models.Q(password_reset_token__isnull=False)),
+        ]
+    
     def __str__(self):
         return self.email
     
+    def revoke_tokens(self):
+        """
+        Revokes all tokens issued before by bumping the token version; saved with
+        the next save(). Flows that change the password call this explicitly, as
+        set_password also runs when Django upgrades a hash during login.
+        """
+        self.token_version += 1
+    
+    def get_session_auth_hash(self):
+        """Uses the hash cached by CachedModelBackend while the password hash is not loaded"""
+        cached = getattr(self, 'cached_session_auth_hash', None)
+        if cached and 'password' in self.get_deferred_fields():
+            return cached
+        return super().get_session_auth_hash()
+    
+    @staticmethod
+    def new_activation_token():
+        """Field values of a fresh activation token, e.g. to set it in the INSERT"""
+        return {'activation_token': uuid.uuid4(), 'activation_token_created': timezone.now()}
+    
     def generate_activation_token(self):
         """Generates a new activation token"""
-        self.activation_token = uuid.uuid4()
-        self.activation_token_created = timezone.now()
-        self.save()
+        for field, value in self.new_activation_token().items():
+            setattr(self, field, value)
+        self.save(update_fields=['activation_token', 'activation_token_created'])
         return self.activation_token
     
     def is_activation_token_expired(self):
         """Checks if the activation token is expired (24 hours)"""
         if not self.activation_token_created:
             return True
-        return timezone.now() > self.activation_token_created + timezone.timedelta(hours=24)
+        return timezone.now() > self.activation_token_created + ACTIVATION_TOKEN_LIFETIME
     
     def clear_activation_token(self):
         """Clears the activation token"""
         self.activation_token = None
         self.activation_token_created = None
-        self.save()
+        self.save(update_fields=['activation_token', 'activation_token_created'])
+    
+    def activate(self, token):
+        """
+        Activates the account and clears the token in one conditional UPDATE.
+        Returns False if the token no longer matches (e.g. a concurrent activation won).
+        """
+        updated = CustomUser.objects.filter(pk=self.pk, activation_token=token, is_active=False).update(
+            is_active=True, activation_token=None, activation_token_created=None
+        )
+        if updated:
+            self.is_active = True
+            self.activation_token = None
+            self.activation_token_created = None
+            self.invalidate_cached_user()
+        return bool(updated)
     
     def generate_password_reset_token(self):
         """Generates a new password reset token"""
         self.password_reset_token = uuid.uuid4()
         self.password_reset_token_created = timezone.now()
-        self.save()
+        self.save(update_fields=['password_reset_token', 'password_reset_token_created'])
         return self.password_reset_token
     
     def is_password_reset_token_expired(self):
         """Checks if the password reset token is expired (1 hour)"""
         if not self.password_reset_token_created:
             return True
-        return timezone.now() > self.password_reset_token_created + timezone.timedelta(hours=1)
+        return timezone.now() > self.password_reset_token_created + PASSWORD_RESET_TOKEN_LIFETIME
     
     def clear_password_reset_token(self):
         """Clears the password reset token"""
         self.password_reset_token = None
         self.password_reset_token_created = None
-        self.save()
+        self.save(update_fields=['password_reset_token', 'password_reset_token_created'])
+    
+    def reset_password(self, token, raw_password):
+        """
+        Sets the new password, revokes issued tokens and consumes the reset token
+        in one conditional UPDATE. Returns False if the token was already used.
+        """
+        self.set_password(raw_password)
+        updated = CustomUser.objects.filter(pk=self.pk, password_reset_token=token).update(
+            password=self.password,
+            token_version=models.F('token_version') + 1,
+            password_reset_token=None,
+            password_reset_token_created=None,
+        )
+        if updated:
+            self.token_version += 1
+            self.password_reset_token = None
+            self.password_reset_token_created = None
+            self.invalidate_cached_user()
+        return bool(updated)
+    
+    def invalidate_cached_user(self):
+        """Drops the cached user for JWT (current and previous token version) and session authentication"""
+        from django.core.cache import cache
+        from .backends import get_session_user_cache_key
+        from .tokens import invalidate_user_cache
+        versions = [self.token_version]
+        if self.token_version:
+            versions.append(self.token_version - 1)
+        invalidate_user_cache(self.pk, *versions)
+        cache.delete(get_session_user_cache_key(self.pk))
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_user_cache_on_change(sender, instance, **kwargs):
+    """
+    Signal handler: Drops the cached user for JWT authentication, including the
+    entry of the previous token version after a password change
+    """
+    instance.invalidate_cached_user()
+
+
+class OutboundEmail(models.Model):
+    """Rendered e-mail waiting in the outbox for the delivery worker"""
+    STATUS_PENDING = 'pending'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENDING, 'Sending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    
+    subject = models.CharField(max_length=255)
+    to_email = models.EmailField()
+    from_email = models.CharField(max_length=255)
+    body_text = models.TextField()
+    body_html = models.TextField(blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['next_attempt_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due'),
+        ]
+    
+    def __str__(self):
+        return f"{self.subject} -> {self.to_email} ({self.status})"
@@ -1,92 +1,217 @@
-from django.core.mail import send_mail
+from django.core.mail import EmailMultiAlternatives
+from django.db import transaction
+from django.db.models import F, Min
 from django.template.loader import render_to_string
+from django.utils import timezone
 from django.utils.html import strip_tags
 from django.conf import settings
-import uuid
+from core.metrics import EMAIL_DELIVERY_LATENCY
+from .models import OutboundEmail
+from .mail import get_mail_pool
+import logging
+import random
+
+logger = logging.getLogger(__name__)
+
 
 def send_activation_email(user, request):
     """
-    Sendet eine Aktivierungs-E-Mail synchron an den Benutzer
-    """
-    import logging
-    logger = logging.getLogger(__name__)
-    
-    try:
-        logger.info(f"Starte synchronen E-Mail-Versand für Benutzer: {user.email}")
-        
-        backend_url = f"{request.scheme}://{request.get_host()}"
-        activation_url = f"{backend_url}/api/activate/{user.id}/{user.activation_token}/"
-        logger.info(f"Aktivierungs-URL: {activation_url}")
-        
-        html_message = render_to_string('video/activation_email.html', {
-            'user': user,
-            'activation_url': activation_url,
-        })
-        plain_message = strip_tags(html_message)
-        
-        logger.info(f"E-Mail-Konfiguration:")
-        logger.info(f"  EMAIL_HOST: {settings.EMAIL_HOST}")
-        logger.info(f"  EMAIL_PORT: {settings.EMAIL_PORT}")
-        logger.info(f"  EMAIL_USE_TLS: {settings.EMAIL_USE_TLS}")
-        logger.info(f"  EMAIL_HOST_USER: {settings.EMAIL_HOST_USER}")
-        logger.info(f"  DEFAULT_FROM_EMAIL: {settings.DEFAULT_FROM_EMAIL}")
-        logger.info(f"  Empfänger: {user.email}")
-        
-        result = send_mail(
-            subject='Videoflix - Aktivieren Sie Ihr Konto',
-            message=plain_message,
-            from_email=settings.DEFAULT_FROM_EMAIL or 'noreply@videoflix.com',
-            recipient_list=[user.email],
-            html_message=html_message,
-            fail_silently=False,
-            connection=None,  
-        )
-        
-        logger.info(f"E-Mail-Versand erfolgreich: {result}")
-        print(f"Aktivierungs-E-Mail erfolgreich an {user.email} gesendet")
-        
-    except Exception as e:
-        error_msg = f"E-Mail-Versand fehlgeschlagen für {user.email}: {e}"
-        logger.error(error_msg, exc_info=True)
-        print(error_msg)
-        raise e
+    Rendert die Aktivierungs-E-Mail und legt sie im Postausgang ab
+    """
+    backend_url = f"{request.scheme}://{request.get_host()}"
+    activation_url = f"{backend_url}/api/activate/{user.id}/{user.activation_token}/"
+    logger.info(f"Aktivierungs-URL: {activation_url}")
+
+    html_message = render_to_string('video/activation_email.html', {
+        'user': user,
+        'activation_url': activation_url,
+    })
+    return queue_email('Videoflix - Aktivieren Sie Ihr Konto', user.email, html_message)
+
 
 def send_password_reset_email(user, request):
     """
-    Sendet eine Passwort-Reset-E-Mail synchron an den Benutzer
-    """
-    import logging
-    logger = logging.getLogger(__name__)
-    
-    try:
-        logger.info(f"Starte synchronen Passwort-Reset-E-Mail-Versand für: {user.email}")
-        
-
-        frontend_url = "http://localhost:5500"  
-        reset_url = f"{frontend_url}/pages/auth/confirm_password.html?uid={user.id}&token={user.password_reset_token}"
-        logger.info(f"Reset-URL: {reset_url}")
-        
-        html_message = render_to_string('video/password_reset_email.html', {
-            'user': user,
-            'reset_url': reset_url,
-        })
-        plain_message = strip_tags(html_message)
-        
-        result = send_mail(
-            subject='Videoflix - Passwort zurücksetzen',
-            message=plain_message,
-            from_email=settings.DEFAULT_FROM_EMAIL or 'noreply@videoflix.com',
-            recipient_list=[user.email],
-            html_message=html_message,
-            fail_silently=False,
-            connection=None, 
+    Rendert die Passwort-Reset-E-Mail und legt sie im Postausgang ab
+    """
+    frontend_url = "http://localhost:5500"
+    reset_url = f"{frontend_url}/pages/auth/confirm_password.html?uid={user.id}&token={user.password_reset_token}"
+    logger.info(f"Reset-URL: {reset_url}")
+
+    html_message = render_to_string('video/password_reset_email.html', {
+        'user': user,
+        'reset_url': reset_url,
+    })
+    return queue_email('Videoflix - Passwort zurücksetzen', user.email, html_message)
+
+
+def queue_email(subject, to_email, html_message):
+    """
+    Schreibt eine gerenderte E-Mail in den Postausgang. Im Sofort-Modus
+    (EMAIL_OUTBOX_IMMEDIATE, z.B. mit Console-/Locmem-Backend) wird sie
+    nach dem Commit direkt zugestellt.
+    """
+    email = OutboundEmail.objects.create(
+        subject=subject,
+        to_email=to_email,
+        from_email=settings.DEFAULT_FROM_EMAIL or 'noreply@videoflix.com',
+        body_text=strip_tags(html_message),
+        body_html=html_message,
+    )
+    logger.info(f"E-Mail {email.id} für {to_email} in den Postausgang gelegt")
+
+    if settings.EMAIL_OUTBOX_IMMEDIATE:
+        transaction.on_commit(lambda: process_outbox(batch_size=1, ids=[email.id]))
+    return email
+
+
+def claim_due_emails(batch_size, ids=None):
+    """
+    Reserviert fällige E-Mails für diesen Worker. Die Reservierung läuft nach
+    EMAIL_OUTBOX_LEASE_SECONDS ab, damit abgestürzte Worker nichts blockieren.
+    Eine abgelaufene Reservierung zählt als Versuch, sodass eine E-Mail, die
+    den Worker jedes Mal abstürzen lässt, nach EMAIL_OUTBOX_MAX_ATTEMPTS aufgegeben wird.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        queryset = OutboundEmail.objects.filter(
+            status__in=[OutboundEmail.STATUS_PENDING, OutboundEmail.STATUS_SENDING],
+            next_attempt_at__lte=now,
+        )
+        if ids is not None:
+            queryset = queryset.filter(id__in=ids)
+        claimed = list(
+            queryset.select_for_update(skip_locked=True).order_by('next_attempt_at').values_list('id', 'status')[:batch_size]
+        )
+        claimed_ids = [email_id for email_id, _ in claimed]
+        reclaimed_ids = [email_id for email_id, status in claimed if status == OutboundEmail.STATUS_SENDING]
+        if reclaimed_ids:
+            expire_leases(reclaimed_ids, now)
+        OutboundEmail.objects.filter(id__in=claimed_ids, status__in=[
+            OutboundEmail.STATUS_PENDING, OutboundEmail.STATUS_SENDING,
+        ]).update(
+            status=OutboundEmail.STATUS_SENDING,
+            next_attempt_at=now + timezone.timedelta(seconds=settings.EMAIL_OUTBOX_LEASE_SECONDS),
         )
-        
-        logger.info(f"Passwort-Reset-E-Mail erfolgreich gesendet: {result}")
-        print(f"Passwort-Reset-E-Mail erfolgreich an {user.email} gesendet")
-        
-    except Exception as e:
-        error_msg = f"Passwort-Reset-E-Mail-Versand fehlgeschlagen für {user.email}: {e}"
-        logger.error(error_msg, exc_info=True)
-        print(error_msg)
-        raise e
+    return list(OutboundEmail.objects.filter(id__in=claimed_ids, status=OutboundEmail.STATUS_SENDING))
+
+
+def expire_leases(email_ids, now):
+    """
+    Zählt abgelaufene Reservierungen als fehlgeschlagenen Versuch und gibt
+    E-Mails auf, die damit EMAIL_OUTBOX_MAX_ATTEMPTS erreicht haben
+    """
+    OutboundEmail.objects.filter(id__in=email_ids).update(attempts=F('attempts') + 1)
+    exhausted = OutboundEmail.objects.filter(id__in=email_ids, attempts__gte=settings.EMAIL_OUTBOX_MAX_ATTEMPTS)
+    for email_id in exhausted.values_list('id', flat=True):
+        logger.error(f"E-Mail {email_id} endgültig fehlgeschlagen: Reservierung wiederholt abgelaufen")
+    exhausted.update(status=OutboundEmail.STATUS_FAILED, next_attempt_at=now, last_error='Worker lease expired')
+
+
+def build_message(email, connection=None):
+    """
+    Baut die Django-E-Mail-Nachricht für einen Postausgangs-Eintrag
+    """
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body_text,
+        from_email=email.from_email,
+        to=[email.to_email],
+        connection=connection,
+    )
+    if email.body_html:
+        message.attach_alternative(email.body_html, 'text/html')
+    return message
+
+
+def retry_delay(attempts):
+    """
+    Exponentielles Backoff mit Jitter: 30s, 60s, 120s, ... bis EMAIL_OUTBOX_MAX_BACKOFF
+    """
+    delay = min(settings.EMAIL_OUTBOX_BACKOFF_SECONDS * 2 ** (attempts - 1), settings.EMAIL_OUTBOX_MAX_BACKOFF)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def mark_sent(email):
+    sent_at = timezone.now()
+    OutboundEmail.objects.filter(id=email.id).update(
+        status=OutboundEmail.STATUS_SENT,
+        attempts=email.attempts + 1,
+        sent_at=sent_at,
+        last_error='',
+    )
+    EMAIL_DELIVERY_LATENCY.observe((sent_at - email.created_at).total_seconds())
+
+
+def mark_failed(email, error):
+    """
+    Plant einen neuen Versuch oder markiert die E-Mail endgültig als fehlgeschlagen
+    """
+    attempts = email.attempts + 1
+    if attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        status = OutboundEmail.STATUS_FAILED
+        next_attempt_at = timezone.now()
+        logger.error(f"E-Mail {email.id} an {email.to_email} endgültig fehlgeschlagen: {error}")
+    else:
+        status = OutboundEmail.STATUS_PENDING
+        next_attempt_at = timezone.now() + timezone.timedelta(seconds=retry_delay(attempts))
+        logger.warning(f"E-Mail {email.id} an {email.to_email} fehlgeschlagen (Versuch {attempts}): {error}")
+
+    OutboundEmail.objects.filter(id=email.id).update(
+        status=status,
+        attempts=attempts,
+        next_attempt_at=next_attempt_at,
+        last_error=str(error),
+    )
+
+
+def process_outbox(batch_size=None, ids=None):
+    """
+    Stellt fällige E-Mails über den SMTP-Verbindungspool zu.
+    Gibt die Anzahl erfolgreich versendeter E-Mails zurück.
+    """
+    emails = claim_due_emails(batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE, ids)
+    if not emails:
+        return 0
+
+    errors = get_mail_pool().send_batch([build_message(email) for email in emails])
+    sent = 0
+    for email, error in zip(emails, errors):
+        if error is None:
+            mark_sent(email)
+            sent += 1
+        else:
+            mark_failed(email, error)
+    return sent
+
+
+def get_outbox_stats():
+    """
+    Kennzahlen des Postausgangs: Warteschlangenlänge und Zustelllatenz
+    """
+    now = timezone.now()
+    queued = OutboundEmail.objects.filter(
+        status__in=[OutboundEmail.STATUS_PENDING, OutboundEmail.STATUS_SENDING]
+    )
+    oldest = queued.aggregate(oldest=Min('created_at'))['oldest']
+
+    latencies = sorted(
+        (sent_at - created_at).total_seconds()
+        for created_at, sent_at in OutboundEmail.objects.filter(
+            status=OutboundEmail.STATUS_SENT,
+            sent_at__gte=now - timezone.timedelta(hours=1),
+        ).values_list('created_at', 'sent_at')
+    )
+
+    def latency_percentile(pct):
+        if not latencies:
+            return None
+        return latencies[min(int(len(latencies) * pct / 100), len(latencies) - 1)]
+
+    return {
+        'queue_depth': queued.count(),
+        'failed': OutboundEmail.objects.filter(status=OutboundEmail.STATUS_FAILED).count(),
+        'oldest_queued_seconds': (now - oldest).total_seconds() if oldest else 0,
+        'sent_last_hour': len(latencies),
+        'delivery_latency_p50_seconds': latency_percentile(50),
+        'delivery_latency_p95_seconds': latency_percentile(95),
+    }
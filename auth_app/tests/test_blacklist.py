@@ -0,0 +1,165 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import TokenError
+from redis.exceptions import ConnectionError as RedisConnectionError
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from auth_app.blacklist import BLACKLIST_READY_KEY, BLACKLIST_SET_KEY, prune_expired_tokens, rebuild_blacklist_cache
+from auth_app.models import CustomUser
+from auth_app.tokens import VersionedRefreshToken
+
+
+class FakeRedis:
+    """Minimaler In-Memory-Ersatz für die genutzten Redis-Befehle"""
+
+    def __init__(self):
+        self.data = {}
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value):
+        self.data[key] = value
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def exists(self, key):
+        return int(key in self.data)
+
+    def rename(self, source, target):
+        self.data[target] = self.data.pop(source)
+
+    def setbit(self, key, offset, value):
+        bits = self.data.setdefault(key, set())
+        if value:
+            bits.add(offset)
+
+    def getbit(self, key, offset):
+        return int(offset in self.data.get(key, set()))
+
+    def zadd(self, key, mapping):
+        self.data.setdefault(key, {}).update(mapping)
+
+    def zscore(self, key, member):
+        return self.data.get(key, {}).get(member)
+
+    def zremrangebyscore(self, key, minimum, maximum):
+        members = self.data.get(key, {})
+        for member in [m for m, score in members.items() if score <= maximum]:
+            del members[member]
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.calls.append((name, args))
+
+    def execute(self):
+        calls, self.calls = self.calls, []
+        return [getattr(self.redis, name)(*args) for name, args in calls]
+
+
+@pytest.mark.django_db
+class TokenBlacklistTests(TestCase):
+    """Tests für den Redis-Spiegel der Token-Blacklist und das Aufräumen"""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email='blacklist@example.com', password='testpassword', is_active=True)
+        self.redis = FakeRedis()
+        self.patcher = patch('auth_app.blacklist.get_redis_connection', return_value=self.redis)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    def _assert_checks(self, queries):
+        blacklisted = VersionedRefreshToken.for_user(self.user)
+        blacklisted.blacklist()
+        valid = VersionedRefreshToken.for_user(self.user)
+        rebuild_blacklist_cache()
+
+        with self.assertNumQueries(queries), self.assertRaises(TokenError):
+            VersionedRefreshToken(str(blacklisted))
+        with self.assertNumQueries(0):
+            VersionedRefreshToken(str(valid))
+
+    def test_set_answers_without_database(self):
+        """Test: Mit geladenem Redis-Set kommt die Prüfung ohne Datenbankabfrage aus"""
+        self._assert_checks(queries=0)
+
+    @override_settings(TOKEN_BLACKLIST_BLOOM=True, TOKEN_BLACKLIST_BLOOM_BITS=4096)
+    def test_bloom_filter_confirms_hits_in_database(self):
+        """Test: Der Bloom-Filter verneint ohne Datenbank, Treffer werden in Postgres bestätigt"""
+        self._assert_checks(queries=1)
+
+    def test_falls_back_to_database_until_loaded(self):
+        """Test: Ohne geladenen Spiegel wird die Blacklist-Tabelle abgefragt"""
+        token = VersionedRefreshToken.for_user(self.user)
+        with self.assertNumQueries(1):
+            VersionedRefreshToken(str(token))
+
+    def test_redis_errors_fall_back_to_database(self):
+        """Test: Bei Redis-Fehlern wird die Blacklist-Tabelle geprüft statt 500 zu liefern"""
+        token = VersionedRefreshToken.for_user(self.user)
+        token.blacklist()
+        broken = MagicMock()
+        broken.pipeline.return_value.execute.side_effect = RedisConnectionError('down')
+
+        with patch('auth_app.blacklist.get_redis_connection', return_value=broken):
+            with self.assertRaises(TokenError):
+                VersionedRefreshToken(str(token))
+
+    def test_evicted_set_falls_back_to_database(self):
+        """Test: Fehlt das Set trotz Ready-Flag (Eviction), wird der Token trotzdem abgelehnt"""
+        token = VersionedRefreshToken.for_user(self.user)
+        token.blacklist()
+        rebuild_blacklist_cache()
+        self.redis.delete(BLACKLIST_SET_KEY)
+
+        with self.assertNumQueries(1), self.assertRaises(TokenError):
+            VersionedRefreshToken(str(token))
+
+    def test_empty_blacklist_keeps_mirror_loaded(self):
+        """Test: Auch ohne gesperrte Tokens antwortet der Spiegel ohne Datenbank"""
+        self.assertEqual(rebuild_blacklist_cache(), 0)
+        token = VersionedRefreshToken.for_user(self.user)
+
+        with self.assertNumQueries(0):
+            VersionedRefreshToken(str(token))
+
+    def test_failed_mirror_write_disables_mirror(self):
+        """Test: Scheitert das Spiegeln, gehen Prüfungen bis zum Rebuild an die Datenbank"""
+        rebuild_blacklist_cache()
+        token = VersionedRefreshToken.for_user(self.user)
+
+        with patch.object(FakePipeline, 'execute', side_effect=RedisConnectionError('down')):
+            token.blacklist()
+
+        self.assertIsNone(self.redis.get(BLACKLIST_READY_KEY))
+        with self.assertRaises(TokenError):
+            VersionedRefreshToken(str(token))
+
+    def test_prune_expired_tokens_in_batches(self):
+        """Test: Abgelaufene Tokens werden samt Blacklist-Eintrag in Batches gelöscht"""
+        expired = timezone.now() - timezone.timedelta(days=1)
+        for index in range(5):
+            outstanding = OutstandingToken.objects.create(
+                user=self.user, jti=f'expired-{index}', token='x', expires_at=expired
+            )
+            BlacklistedToken.objects.create(token=outstanding)
+        self.redis.zadd('token_blacklist:jtis', {'expired-0': expired.timestamp()})
+        live = VersionedRefreshToken.for_user(self.user)
+
+        self.assertEqual(prune_expired_tokens(batch_size=2), 5)
+        self.assertEqual(BlacklistedToken.objects.count(), 0)
+        self.assertEqual(list(OutstandingToken.objects.values_list('jti', flat=True)), [live['jti']])
+        self.assertIsNone(self.redis.zscore('token_blacklist:jtis', 'expired-0'))
@@ -1,6 +1,12 @@
 import pytest
+from unittest.mock import patch
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.core.exceptions import ValidationError
+from django.core.cache import cache
+from auth_app.admin import RevokingAdminPasswordChangeForm
+from auth_app.backends import CachedModelBackend, get_session_user_cache_key
 from auth_app.models import CustomUser
 
 
@@ -80,6 +86,100 @@ class CustomUserModelTests(TestCase):
         
         self.assertEqual(user.get_short_name(), 'Test')
     
+    def test_next_free_username_single_query(self):
+        """Test: Freier Benutzername wird mit einer Abfrage gefunden und füllt Lücken"""
+        for username in ['info', 'info1', 'info2', 'info4', 'infotech', 'info_7']:
+            CustomUser.objects.create_user(email=f'{username}@example.com', username=username)
+        
+        with self.assertNumQueries(1):
+            self.assertEqual(CustomUser.objects.next_free_username('info'), 'info3')
+        self.assertEqual(CustomUser.objects.next_free_username('support'), 'support')
+    
+    def test_unique_username_retries_on_conflict(self):
+        """Test: Gleichzeitig vergebener Benutzername führt zu neuem Versuch"""
+        CustomUser.objects.create_user(email='admin@example.com', username='admin')
+        
+        with patch.object(CustomUser.objects, 'next_free_username', side_effect=['admin', 'admin1']):
+            user = CustomUser.objects.create_user_with_unique_username(email='admin@other.com', password='testpass123')
+        
+        self.assertEqual(user.username, 'admin1')
+    
+    def test_token_updates_write_only_token_columns(self):
+        """Test: Token-Methoden schreiben nur ihre eigenen Spalten"""
+        user = CustomUser.objects.create_user(email='tokens@example.com', password='testpass123')
+        
+        for method in (user.generate_activation_token, user.clear_activation_token,
+                       user.generate_password_reset_token, user.clear_password_reset_token):
+            with CaptureQueriesContext(connection) as queries:
+                method()
+            self.assertEqual(len(queries), 1)
+            self.assertTrue(queries[0]['sql'].startswith('UPDATE'))
+            self.assertNotIn('"email"', queries[0]['sql'])
+    
+    def test_activation_is_single_conditional_update(self):
+        """Test: Aktivierung ist ein einzelnes bedingtes UPDATE, die zweite gleichzeitige verliert"""
+        user = CustomUser.objects.create_user(
+            email='activate@example.com', password='testpass123', is_active=False, **CustomUser.new_activation_token()
+        )
+        token = user.activation_token
+        concurrent = CustomUser.objects.get(pk=user.pk)
+        
+        with self.assertNumQueries(1):
+            self.assertTrue(user.activate(token))
+        with self.assertNumQueries(1):
+            self.assertFalse(concurrent.activate(token))
+        
+        user.refresh_from_db()
+        self.assertTrue(user.is_active)
+        self.assertIsNone(user.activation_token)
+    
+    def test_password_reset_consumes_token_once(self):
+        """Test: Passwort-Reset setzt Passwort, Token-Version und Token in einem UPDATE"""
+        user = CustomUser.objects.create_user(email='reset@example.com', password='testpass123')
+        token = user.generate_password_reset_token()
+        
+        with self.assertNumQueries(1):
+            self.assertTrue(user.reset_password(token, 'newpass456'))
+        self.assertFalse(CustomUser.objects.get(pk=user.pk).reset_password(token, 'other789'))
+        
+        user.refresh_from_db()
+        self.assertTrue(user.check_password('newpass456'))
+        self.assertEqual(user.token_version, 1)
+        self.assertIsNone(user.password_reset_token)
+    
+    def test_admin_password_change_revokes_tokens(self):
+        """Test: Passwortänderung im Admin erhöht die Token-Version"""
+        user = CustomUser.objects.create_user(email='admin-change@example.com', password='testpass123')
+        form = RevokingAdminPasswordChangeForm(user, {
+            'password1': 'Brand-new-pass-42', 'password2': 'Brand-new-pass-42', 'usable_password': 'true',
+        })
+        
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+        
+        user.refresh_from_db()
+        self.assertTrue(user.check_password('Brand-new-pass-42'))
+        self.assertEqual(user.token_version, 1)
+    
+    def test_cached_backend_get_user(self):
+        """Test: Session-Backend lädt den Benutzer aus dem Cache, bis er gespeichert wird"""
+        cache.clear()
+        user = CustomUser.objects.create_user(email='session@example.com', password='testpass123', is_active=True)
+        backend = CachedModelBackend()
+        
+        self.assertEqual(backend.get_user(user.pk), user)
+        with self.assertNumQueries(0):
+            cached = backend.get_user(user.pk)
+            self.assertEqual(cached.get_session_auth_hash(), user.get_session_auth_hash())
+        self.assertNotIn('password', cache.get(get_session_user_cache_key(user.pk)))
+        
+        cached.set_password('changed456')
+        self.assertNotEqual(cached.get_session_auth_hash(), user.get_session_auth_hash())
+        
+        user.is_active = False
+        user.save()
+        self.assertIsNone(backend.get_user(user.pk))
+    
     def tearDown(self):
         """Test-Daten aufräumen"""
         CustomUser.objects.all().delete()
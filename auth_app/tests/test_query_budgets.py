@@ -0,0 +1,102 @@
+import itertools
+import pytest
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from auth_app.models import CustomUser
+from core.testing import QueryBudgetMixin
+
+FAST_HASHER = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+@pytest.mark.django_db
+@pytest.mark.views
+@override_settings(PASSWORD_HASHERS=FAST_HASHER)
+class AuthQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    """Query-Budgets der Auth-Endpunkte bei wachsender Anzahl an Benutzern"""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            email='budget@example.com', password='budgetpassword', username='budget', is_active=True
+        )
+        self.counter = itertools.count()
+
+    def seed_users(self, size):
+        """Ergänzt weitere Benutzer bis zur Anzahl size"""
+        missing = size - CustomUser.objects.count()
+        CustomUser.objects.bulk_create(
+            CustomUser(email=f'other{CustomUser.objects.count() + index}@example.com',
+                       username=f'other{CustomUser.objects.count() + index}')
+            for index in range(missing)
+        )
+
+    def pending_users(self, generate_token):
+        """Ein Benutzer mit frischem Token pro Anfrage (Aufwärmen plus eine pro Größe)"""
+        users = []
+        for index in range(len(self.sizes) + 1):
+            user = CustomUser.objects.create_user(
+                email=f'pending{index}@example.com', password='budgetpassword', username=f'pending{index}',
+                is_active=False,
+            )
+            users.append((user, generate_token(user)))
+        return iter(users)
+
+    def login(self):
+        return self.client.post(reverse('login'), {'email': 'budget@example.com', 'password': 'budgetpassword'},
+                                format='json')
+
+    def test_register(self):
+        """Test: Die Registrierung prüft, legt an und stellt die E-Mail ein, unabhängig von N"""
+        def register():
+            email = f'new{next(self.counter)}@example.com'
+            return self.client.post(reverse('register'), {
+                'email': email, 'password': 'budgetpassword', 'confirmed_password': 'budgetpassword',
+            }, format='json')
+
+        self.assertQueryBudget(6, register, self.seed_users)
+
+    def test_login(self):
+        """Test: Login mit Benutzerabfrage und Token-Speicherung"""
+        self.assertQueryBudget(2, self.login, self.seed_users)
+
+    def test_logout(self):
+        """Test: Login plus Logout (Sperren des Refresh-Tokens) mit konstantem Aufwand"""
+        def logout():
+            self.login()
+            return self.client.post(reverse('logout'))
+
+        self.assertQueryBudget(9, logout, self.seed_users)
+
+    def test_token_refresh(self):
+        """Test: Token-Refresh ohne N+1"""
+        self.login()
+        self.assertQueryBudget(1, lambda: self.client.post(reverse('token_refresh')), self.seed_users)
+
+    def test_activate(self):
+        """Test: Aktivierung mit Lookup plus einem UPDATE"""
+        users = self.pending_users(lambda user: user.generate_activation_token())
+
+        def activate():
+            user, token = next(users)
+            return self.client.get(reverse('activate_account', args=[user.pk, token]))
+
+        self.assertQueryBudget(2, activate, self.seed_users)
+
+    def test_password_reset_single_user_lookup(self):
+        """Test: Passwort-Reset lädt den Benutzer nur einmal"""
+        self.assertQueryBudget(
+            3,
+            lambda: self.client.post(reverse('password_reset'), {'email': 'budget@example.com'}, format='json'),
+            self.seed_users,
+        )
+
+    def test_password_confirm(self):
+        """Test: Passwort setzen mit Lookup plus einem UPDATE"""
+        users = self.pending_users(lambda user: user.generate_password_reset_token())
+
+        def confirm():
+            user, token = next(users)
+            return self.client.post(reverse('password_confirm', args=[user.pk, token]),
+                                    {'new_password': 'Brand-new-pass-42'}, format='json')
+
+        self.assertQueryBudget(2, confirm, self.seed_users)
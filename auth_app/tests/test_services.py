@@ -0,0 +1,195 @@
+import pytest
+import smtplib
+from unittest.mock import MagicMock, patch
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from auth_app.models import CustomUser, OutboundEmail
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from auth_app.cleanup import clear_expired_sessions, purge_stale_accounts
+from auth_app.mail import SMTPConnectionPool
+from auth_app.services import get_outbox_stats, process_outbox, queue_email
+
+
+@pytest.mark.django_db
+@pytest.mark.services
+class EmailOutboxTests(APITestCase):
+    """Tests für den E-Mail-Postausgang"""
+
+    def test_registration_queues_activation_email(self):
+        """Test: Registrierung legt die E-Mail ab, statt sie zu senden"""
+        data = {'email': 'queued@example.com', 'password': 'newpass123', 'confirmed_password': 'newpass123'}
+
+        response = self.client.post(reverse('register'), data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(mail.outbox), 0)
+        email = OutboundEmail.objects.get(to_email='queued@example.com')
+        self.assertEqual(email.status, OutboundEmail.STATUS_PENDING)
+        self.assertIn(response.data['token'], email.body_html)
+
+    def test_worker_delivers_queued_email(self):
+        """Test: Worker stellt fällige E-Mails zu"""
+        queue_email('Betreff', 'user@example.com', '<p>Hallo</p>')
+
+        self.assertEqual(process_outbox(), 1)
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].body, 'Hallo')
+        email = OutboundEmail.objects.get()
+        self.assertEqual(email.status, OutboundEmail.STATUS_SENT)
+        self.assertIsNotNone(email.sent_at)
+
+    @override_settings(EMAIL_OUTBOX_MAX_ATTEMPTS=2, EMAIL_OUTBOX_BACKOFF_SECONDS=60)
+    def test_failed_delivery_backs_off_then_fails(self):
+        """Test: Fehlgeschlagene Zustellung wird verzögert wiederholt und dann aufgegeben"""
+        queue_email('Betreff', 'user@example.com', '<p>Hallo</p>')
+
+        with patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=OSError('relay down')):
+            self.assertEqual(process_outbox(), 0)
+            email = OutboundEmail.objects.get()
+            self.assertEqual((email.status, email.attempts), (OutboundEmail.STATUS_PENDING, 1))
+            self.assertGreater(email.next_attempt_at, timezone.now() + timezone.timedelta(seconds=40))
+
+            self.assertEqual(process_outbox(), 0)
+            OutboundEmail.objects.update(next_attempt_at=timezone.now())
+            self.assertEqual(process_outbox(), 0)
+
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), (OutboundEmail.STATUS_FAILED, 2))
+        self.assertEqual(email.last_error, 'relay down')
+
+    @override_settings(EMAIL_OUTBOX_MAX_ATTEMPTS=2)
+    def test_expired_lease_counts_as_attempt(self):
+        """Test: Abgelaufene Reservierungen (abgestürzter Worker) zählen als Versuch"""
+        queue_email('Betreff', 'user@example.com', '<p>Hallo</p>')
+        OutboundEmail.objects.update(status=OutboundEmail.STATUS_SENDING, next_attempt_at=timezone.now())
+
+        self.assertEqual(process_outbox(), 1)
+        email = OutboundEmail.objects.get()
+        self.assertEqual((email.status, email.attempts), (OutboundEmail.STATUS_SENT, 2))
+
+        OutboundEmail.objects.update(status=OutboundEmail.STATUS_SENDING, attempts=1, next_attempt_at=timezone.now())
+        self.assertEqual(process_outbox(), 0)
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), (OutboundEmail.STATUS_FAILED, 2))
+        self.assertEqual(len(mail.outbox), 1)
+
+    @override_settings(EMAIL_OUTBOX_IMMEDIATE=True)
+    def test_immediate_mode_delivers_on_commit(self):
+        """Test: Sofort-Modus stellt nach dem Commit zu"""
+        with self.captureOnCommitCallbacks(execute=True):
+            queue_email('Betreff', 'user@example.com', '<p>Hallo</p>')
+
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_outbox_stats(self):
+        """Test: Kennzahlen zu Warteschlange und Latenz"""
+        queue_email('Eins', 'one@example.com', '<p>1</p>')
+        queue_email('Zwei', 'two@example.com', '<p>2</p>')
+        process_outbox(batch_size=1)
+
+        stats = get_outbox_stats()
+
+        self.assertEqual(stats['queue_depth'], 1)
+        self.assertEqual(stats['sent_last_hour'], 1)
+        self.assertIsNotNone(stats['delivery_latency_p50_seconds'])
+
+
+@pytest.mark.services
+class SMTPConnectionPoolTests(TestCase):
+    """Tests für den SMTP-Verbindungspool"""
+
+    def _messages(self, count):
+        return [mail.EmailMessage(f'Betreff {i}', 'Text', 'from@example.com', ['to@example.com']) for i in range(count)]
+
+    def test_pool_reuses_connections(self):
+        """Test: Mehrere Batches nutzen dieselbe geöffnete Verbindung"""
+        connection = MagicMock()
+        with patch('auth_app.mail.get_connection', return_value=connection) as mock_get_connection:
+            pool = SMTPConnectionPool(size=1)
+            self.assertEqual(pool.send_batch(self._messages(3)), [None, None, None])
+            self.assertEqual(pool.send_batch(self._messages(2)), [None, None])
+
+        mock_get_connection.assert_called_once()
+        connection.open.assert_called_once()
+        self.assertEqual(connection.send_messages.call_count, 5)
+
+    def test_pool_reconnects_after_disconnect(self):
+        """Test: Abgebrochene Verbindung wird ersetzt und die Nachricht erneut gesendet"""
+        broken, fresh = MagicMock(), MagicMock()
+        broken.send_messages.side_effect = smtplib.SMTPServerDisconnected('gone')
+        with patch('auth_app.mail.get_connection', side_effect=[broken, fresh]):
+            pool = SMTPConnectionPool(size=1)
+            errors = pool.send_batch(self._messages(2))
+
+        self.assertEqual(errors, [None, None])
+        broken.close.assert_called_once()
+        self.assertEqual(fresh.send_messages.call_count, 2)
+
+    def test_pool_reports_per_message_errors(self):
+        """Test: Fehler einzelner Nachrichten werden pro Nachricht gemeldet"""
+        connection = MagicMock()
+        connection.send_messages.side_effect = [None, smtplib.SMTPRecipientsRefused({}), None]
+        with patch('auth_app.mail.get_connection', return_value=connection):
+            errors = SMTPConnectionPool(size=1).send_batch(self._messages(3))
+
+        self.assertIsNone(errors[0])
+        self.assertIsInstance(errors[1], smtplib.SMTPRecipientsRefused)
+        self.assertIsNone(errors[2])
+
+
+@pytest.mark.django_db
+@pytest.mark.services
+class AccountCleanupTests(TestCase):
+    """Tests für das Aufräumen abgelaufener Tokens und verwaister Registrierungen"""
+
+    def _user(self, email, is_active, token_age=None, reset_age=None):
+        user = CustomUser.objects.create_user(email=email, password='testpassword', is_active=is_active)
+        now = timezone.now()
+        if token_age is not None:
+            user.generate_activation_token()
+            user.activation_token_created = now - token_age
+            user.date_joined = now - token_age
+        if reset_age is not None:
+            user.generate_password_reset_token()
+            user.password_reset_token_created = now - reset_age
+        user.save()
+        return user
+
+    def test_purge_stale_accounts(self):
+        """Test: Abgelaufene Tokens werden geleert, nie aktivierte Konten gelöscht"""
+        abandoned = self._user('abandoned@example.com', False, token_age=timezone.timedelta(days=10))
+        pending = self._user('pending@example.com', False, token_age=timezone.timedelta(hours=2))
+        deactivated = self._user('deactivated@example.com', False)
+        reset = self._user('reset@example.com', True, reset_age=timezone.timedelta(hours=2))
+        activated = self._user('activated@example.com', True, token_age=timezone.timedelta(days=2))
+
+        result = purge_stale_accounts(batch_size=1)
+
+        self.assertEqual(result, {
+            'reset_tokens_cleared': 1,
+            'activation_tokens_cleared': 1,
+            'abandoned_accounts_deleted': 1,
+        })
+        self.assertFalse(CustomUser.objects.filter(pk=abandoned.pk).exists())
+        self.assertEqual(CustomUser.objects.filter(pk__in=[pending.pk, deactivated.pk]).count(), 2)
+        reset.refresh_from_db()
+        activated.refresh_from_db()
+        self.assertIsNone(reset.password_reset_token)
+        self.assertIsNone(activated.activation_token)
+
+    def test_clear_expired_sessions(self):
+        """Test: Abgelaufene Sessions werden in Batches gelöscht"""
+        for index in range(3):
+            session = SessionStore()
+            session.set_expiry(-60 if index else 3600)
+            session.create()
+
+        self.assertEqual(clear_expired_sessions(batch_size=1), 2)
+        self.assertEqual(Session.objects.count(), 1)
+
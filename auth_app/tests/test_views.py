@@ -1,9 +1,22 @@
+import json
 import pytest
-from django.test import TestCase
+from asgiref.sync import async_to_sync
+from unittest.mock import MagicMock, patch
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, TestCase, override_settings
 from django.urls import reverse
+from redis.exceptions import ConnectionError as RedisConnectionError, NoScriptError
 from rest_framework import status
-from rest_framework.test import APITestCase
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from auth_app.api.async_views import AsyncLoginView, AsyncRegisterView
+from auth_app.api.views import LoginView, RegisterView
+from auth_app.api.authentication import CustomJWTAuthentication, StatelessJWTAuthentication
 from auth_app.models import CustomUser
+from auth_app.tokens import VersionedRefreshToken, clear_local_user_cache
+from core.throttling import SLIDING_WINDOW_SCRIPT, SLIDING_WINDOW_SHA, hit
 
 
 @pytest.mark.django_db
@@ -76,6 +89,283 @@ class AuthViewTests(APITestCase):
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
     
+    def test_activation_looks_up_user_by_token(self):
+        """Test: Aktivierung sucht den Benutzer über den Token und prüft die ID"""
+        user = CustomUser.objects.create_user(email='inactive@example.com', password='testpassword', is_active=False)
+        token = user.generate_activation_token()
+        
+        response = self.client.get(reverse('activate_account', args=[self.user.pk, token]))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(reverse('activate_account', args=[user.pk, 'not-a-uuid']))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('activate_account', args=[user.pk, token]))
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        user.refresh_from_db()
+        self.assertTrue(user.is_active)
+    
     def tearDown(self):
         """Test-Daten aufräumen"""
         CustomUser.objects.all().delete()
+
+
+@pytest.mark.django_db
+@pytest.mark.views
+@override_settings(AUTH_USER_CACHE=True)
+class CachedJWTAuthenticationTests(TestCase):
+    """Tests für die Cache-gestützte Benutzerauflösung der JWT-Authentifizierung"""
+    
+    def setUp(self):
+        cache.clear()
+        clear_local_user_cache()
+        self.user = CustomUser.objects.create_user(
+            username='jwtuser',
+            email='jwt@example.com',
+            password='testpassword',
+            is_active=True
+        )
+        self.factory = APIRequestFactory()
+    
+    def _request(self, user=None):
+        token = VersionedRefreshToken.for_user(user or self.user).access_token
+        return self.factory.get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+    
+    def test_cached_user_without_query(self):
+        """Test: Ab dem zweiten Request wird der Benutzer ohne SELECT aufgelöst"""
+        request = self._request()
+        user, _ = CustomJWTAuthentication().authenticate(request)
+        self.assertEqual(user.pk, self.user.pk)
+        
+        clear_local_user_cache()
+        with self.assertNumQueries(0):
+            user, _ = CustomJWTAuthentication().authenticate(request)
+        self.assertEqual(user.email, 'jwt@example.com')
+    
+    def test_password_change_revokes_tokens(self):
+        """Test: Passwortänderung erhöht die Token-Version und widerruft alte Tokens"""
+        request = self._request()
+        CustomJWTAuthentication().authenticate(request)
+        
+        self.user.set_password('newpassword')
+        self.user.revoke_tokens()
+        self.user.save()
+        
+        with self.assertRaises(AuthenticationFailed):
+            CustomJWTAuthentication().authenticate(request)
+        with override_settings(AUTH_USER_CACHE=False), self.assertRaises(AuthenticationFailed):
+            CustomJWTAuthentication().authenticate(request)
+        
+        user, _ = CustomJWTAuthentication().authenticate(self._request())
+        self.assertEqual(user.token_version, 1)
+    
+    def test_hash_upgrade_on_login_keeps_tokens_valid(self):
+        """Test: Das Hash-Upgrade beim Login widerruft die neu ausgestellten Tokens nicht"""
+        legacy_hash = PBKDF2PasswordHasher().encode('legacypassword', 'legacysalt', iterations=1000)
+        CustomUser.objects.create_user(email='legacy@example.com', password_hash=legacy_hash, is_active=True)
+        
+        response = self.client.post(reverse('login'), {'email': 'legacy@example.com', 'password': 'legacypassword'},
+                                    content_type='application/json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        user = CustomUser.objects.get(email='legacy@example.com')
+        self.assertNotEqual(user.password, legacy_hash)
+        self.assertEqual(user.token_version, 0)
+        request = self.factory.get('/', HTTP_AUTHORIZATION=f"Bearer {response.cookies['access_token'].value}")
+        for user_cache in (True, False):
+            with override_settings(AUTH_USER_CACHE=user_cache):
+                authenticated, _ = CustomJWTAuthentication().authenticate(request)
+            self.assertEqual(authenticated.pk, user.pk)
+    
+    def test_deactivation_invalidates_cache(self):
+        """Test: Deaktivierte Benutzer werden trotz Cache abgelehnt"""
+        request = self._request()
+        CustomJWTAuthentication().authenticate(request)
+        
+        self.user.is_active = False
+        self.user.save()
+        
+        with self.assertRaises(AuthenticationFailed):
+            CustomJWTAuthentication().authenticate(request)
+    
+    def test_stateless_token_user(self):
+        """Test: Stateless-Authentifizierung liefert einen TokenUser ohne Datenbankzugriff"""
+        request = self._request()
+        with self.assertNumQueries(0):
+            user, _ = StatelessJWTAuthentication().authenticate(request)
+        self.assertIsInstance(user, TokenUser)
+        self.assertEqual(str(user.id), str(self.user.pk))
+
+
+@pytest.mark.django_db
+@pytest.mark.views
+@override_settings(THROTTLE_RATES={'login_ip': '100/min', 'login_email': '2/min', 'login_global': '100/min'})
+class AuthThrottleTests(APITestCase):
+    """Tests für die Sliding-Window-Ratenbegrenzung der Auth-Endpunkte"""
+    
+    def setUp(self):
+        cache.clear()
+    
+    def test_login_limited_per_email(self):
+        """Test: Zu viele Logins für dieselbe E-Mail werden mit 429 und Retry-After abgelehnt"""
+        data = {'email': 'Victim@example.com', 'password': 'wrong'}
+        for _ in range(2):
+            response = self.client.post(reverse('login'), data, format='json')
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        
+        response = self.client.post(reverse('login'), {'email': 'victim@example.com', 'password': 'x'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertTrue(1 <= int(response['Retry-After']) <= 60)
+        
+        response = self.client.post(reverse('login'), {'email': 'other@example.com', 'password': 'x'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    def test_redis_limiter_uses_lua_script(self):
+        """Test: Mit Redis entscheidet das Lua-Skript atomar über die Anfrage"""
+        redis = MagicMock()
+        redis.evalsha.side_effect = [0, 1500]
+        with patch('core.throttling.get_redis_connection', return_value=redis):
+            self.client.post(reverse('login'), {'email': 'a@example.com', 'password': 'x'}, format='json')
+            response = self.client.post(reverse('login'), {'email': 'a@example.com', 'password': 'x'}, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '2')
+        self.assertEqual(redis.evalsha.call_count, 2)
+        sha, key_count, *keys = redis.evalsha.call_args.args[:5]
+        self.assertEqual((sha, key_count), (SLIDING_WINDOW_SHA, 3))
+        self.assertEqual(keys, ['throttle:login:ip:127.0.0.1', keys[1], 'throttle:login:global:all'])
+        self.assertTrue(keys[1].startswith('throttle:login:email:'))
+    
+    @override_settings(THROTTLE_RATES={'login_ip': '2/min', 'login_email': '3/min', 'login_global': '5/min'})
+    def test_rejected_requests_not_recorded(self):
+        """Test: Vom IP-Limit abgelehnte Anfragen belasten weder E-Mail- noch globales Fenster"""
+        data = {'email': 'victim@example.com', 'password': 'wrong'}
+        statuses = [self.client.post(reverse('login'), data, format='json').status_code for _ in range(6)]
+        self.assertEqual(statuses, [401, 401, 429, 429, 429, 429])
+        
+        for email in ('victim@example.com', 'other@example.com'):
+            response = self.client.post(reverse('login'), {'email': email, 'password': 'wrong'},
+                                        format='json', REMOTE_ADDR='10.0.0.2')
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    def test_redis_limiter_loads_script_once(self):
+        """Test: Unbekanntes Skript wird per EVAL nachgeladen, ohne Skript-Objekte anzusammeln"""
+        redis = MagicMock()
+        redis.evalsha.side_effect = NoScriptError('NOSCRIPT')
+        redis.eval.return_value = 0
+        with patch('core.throttling.get_redis_connection', return_value=redis):
+            self.assertEqual(hit('throttle:test', 5, 60), 0)
+        
+        redis.eval.assert_called_once()
+        self.assertEqual(redis.eval.call_args.args[0], SLIDING_WINDOW_SCRIPT)
+    
+    def test_redis_errors_fall_back_to_cache(self):
+        """Test: Bei Redis-Ausfall begrenzt der Cache weiter, statt 500 zu liefern"""
+        redis = MagicMock()
+        redis.evalsha.side_effect = RedisConnectionError('down')
+        data = {'email': 'victim@example.com', 'password': 'wrong'}
+        with patch('core.throttling.get_redis_connection', return_value=redis):
+            statuses = [self.client.post(reverse('login'), data, format='json').status_code for _ in range(3)]
+        
+        self.assertEqual(statuses, [401, 401, 429])
+
+
+@pytest.mark.django_db
+@pytest.mark.views
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class AsyncAuthViewTests(TestCase):
+    """Tests für die async Login- und Registrierungs-Views"""
+    
+    def setUp(self):
+        cache.clear()
+        self.factory = AsyncRequestFactory()
+        self.user = CustomUser.objects.create_user(email='async@example.com', password='testpassword', is_active=True)
+    
+    def _post(self, view_class, data):
+        request = self.factory.post('/', data, content_type='application/json')
+        return view_class.as_view()(request)
+    
+    async def test_async_login(self):
+        """Test: Async-Login prüft das Passwort im Hash-Pool und setzt die Cookies"""
+        response = await self._post(AsyncLoginView, {'email': 'async@example.com', 'password': 'testpassword'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('access_token', response.cookies)
+        
+        response = await self._post(AsyncLoginView, {'email': 'async@example.com', 'password': 'wrong'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    async def test_async_register(self):
+        """Test: Async-Registrierung legt einen inaktiven Benutzer mit gehashtem Passwort an"""
+        response = await self._post(AsyncRegisterView, {
+            'email': 'async-new@example.com', 'password': 'newpass123', 'confirmed_password': 'newpass123'
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        
+        user = await CustomUser.objects.aget(email='async-new@example.com')
+        self.assertFalse(user.is_active)
+        self.assertTrue(user.check_password('newpass123'))
+        self.assertIsNotNone(user.activation_token)
+    
+    @override_settings(AUTH_HASH_MAX_PENDING=0)
+    async def test_hash_queue_limit(self):
+        """Test: Bei voller Hash-Warteschlange antwortet der Login mit 503"""
+        response = await self._post(AsyncLoginView, {'email': 'async@example.com', 'password': 'testpassword'})
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], '1')
+    
+    def _assert_same_response(self, sync_view, async_view, body):
+        sync_response = sync_view.as_view()(APIRequestFactory().post('/', body, content_type='application/json'))
+        sync_response.render()
+        cache.clear()
+        async_response = async_to_sync(async_view.as_view())(
+            self.factory.post('/', body, content_type='application/json')
+        )
+        cache.clear()
+        self.assertEqual(async_response.status_code, sync_response.status_code, body)
+        self.assertEqual(json.loads(async_response.content), json.loads(sync_response.content), body)
+    
+    def test_async_views_match_sync_responses(self):
+        """Test: Async-Views liefern dieselben Statuscodes und Bodies wie die sync Views"""
+        CustomUser.objects.create_user(email='inactive@example.com', password='testpassword', is_active=False)
+        login_cases = [
+            {'email': 'inactive@example.com', 'password': 'testpassword'},
+            {'email': 'inactive@example.com', 'password': 'wrong'},
+            {'email': 'async@example.com', 'password': 'wrong'},
+            {'email': 'missing@example.com', 'password': 'testpassword'},
+            {'email': 'not-an-email'},
+        ]
+        register_cases = [
+            {'email': 'async@example.com', 'password': 'newpass123', 'confirmed_password': 'newpass123'},
+            {'email': 'new@example.com', 'password': 'newpass123', 'confirmed_password': 'other123'},
+            {'email': 'not-an-email'},
+        ]
+        for data in login_cases:
+            self._assert_same_response(LoginView, AsyncLoginView, json.dumps(data))
+        for data in register_cases:
+            self._assert_same_response(RegisterView, AsyncRegisterView, json.dumps(data))
+        for body in ['{invalid', '[]']:
+            self._assert_same_response(LoginView, AsyncLoginView, body)
+            self._assert_same_response(RegisterView, AsyncRegisterView, body)
+        
+        response = async_to_sync(self._post)(AsyncLoginView, {'email': 'inactive@example.com', 'password': 'testpassword'})
+        self.assertEqual(json.loads(response.content)['error'], 'Konto ist nicht aktiviert. Bitte aktivieren Sie Ihr Konto zuerst.')
+    
+    @override_settings(THROTTLE_RATES={'login_ip': '1/min'})
+    def test_async_throttle_matches_sync_response(self):
+        """Test: Gedrosselte Async-Logins antworten wie die sync View"""
+        body = json.dumps({'email': 'async@example.com', 'password': 'wrong'})
+        responses = []
+        for view in [LoginView.as_view(), LoginView.as_view()]:
+            response = view(APIRequestFactory().post('/', body, content_type='application/json'))
+            response.render()
+            responses.append(response)
+        cache.clear()
+        for _ in range(2):
+            async_response = async_to_sync(AsyncLoginView.as_view())(
+                self.factory.post('/', body, content_type='application/json')
+            )
+        self.assertEqual(async_response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(async_response.status_code, responses[1].status_code)
+        self.assertEqual(json.loads(async_response.content), json.loads(responses[1].content))
+        self.assertEqual(async_response['Retry-After'], responses[1]['Retry-After'])
+
@@ -0,0 +1,106 @@
+"""
+Token versions and cached user resolution for JWT authentication
+
+Every token carries the user's token_version in the `ver` claim. Bumping the
+version (password change) revokes all tokens issued before. Resolved users
+are cached per process for a few seconds and in the shared cache for a few
+minutes, keyed by user id and token version.
+"""
+import threading
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from core.instrumentation import cache_get
+from .blacklist import add_to_blacklist, is_blacklisted
+from .models import CustomUser as User
+
+TOKEN_VERSION_CLAIM = 'ver'
+USER_CACHE_KEY = 'auth_user:{user_id}:{version}'
+USER_CACHE_FIELDS = ('id', 'email', 'username', 'is_active', 'is_staff', 'is_superuser', 'token_version')
+
+_local_cache = {}
+_local_lock = threading.Lock()
+
+
+class VersionedRefreshToken(RefreshToken):
+    """
+    Refresh token with the token version claim; access tokens derived from it
+    inherit the claim. Blacklist checks go through the Redis mirror.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token[TOKEN_VERSION_CLAIM] = user.token_version
+        return token
+
+    def check_blacklist(self):
+        if is_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError('Token is blacklisted')
+
+    def blacklist(self):
+        result = super().blacklist()
+        add_to_blacklist(self.payload[api_settings.JTI_CLAIM], self.payload['exp'])
+        return result
+
+
+def get_user_cache_key(user_id, version):
+    return USER_CACHE_KEY.format(user_id=user_id, version=version)
+
+
+def _build_user(values):
+    """
+    Builds a user instance from the cached field values; all other fields are deferred
+    """
+    field_names = [field.attname for field in User._meta.concrete_fields if field.attname in values]
+    return User.from_db(DEFAULT_DB_ALIAS, field_names, [values[name] for name in field_names])
+
+
+def _remember_locally(key, values):
+    with _local_lock:
+        if len(_local_cache) >= settings.AUTH_USER_LOCAL_CACHE_SIZE:
+            _local_cache.clear()
+        _local_cache[key] = (values, time.monotonic() + settings.AUTH_USER_LOCAL_CACHE_TIMEOUT)
+
+
+def get_cached_user(user_id, version):
+    """
+    Resolves the user of a token from the process cache, the shared cache or
+    the database (in that order). Returns None if the user does not exist or
+    the token version has been revoked.
+    """
+    key = get_user_cache_key(user_id, version)
+    entry = _local_cache.get(key)
+    if entry is not None and entry[1] > time.monotonic():
+        return _build_user(entry[0])
+
+    values = cache_get(key)
+    if values is None:
+        values = User.objects.filter(pk=user_id).values(*USER_CACHE_FIELDS).first()
+        if values is None or values['token_version'] != version:
+            return None
+        cache.set(key, values, settings.AUTH_USER_CACHE_TIMEOUT)
+
+    _remember_locally(key, values)
+    return _build_user(values)
+
+
+def invalidate_user_cache(user_id, *versions):
+    """
+    Drops the cached user for the given token versions. Other processes keep
+    their local copy for at most AUTH_USER_LOCAL_CACHE_TIMEOUT seconds.
+    """
+    keys = [get_user_cache_key(user_id, version) for version in versions]
+    with _local_lock:
+        for key in keys:
+            _local_cache.pop(key, None)
+    cache.delete_many(keys)
+
+
+def clear_local_user_cache():
+    with _local_lock:
+        _local_cache.clear()
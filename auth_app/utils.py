@@ -3,12 +3,14 @@ Helper functions for the Auth app
 """
 from rest_framework.response import Response
 from rest_framework import status
+from django.core.exceptions import ValidationError
 from django.http import HttpResponseRedirect
 from django.conf import settings
 from django.contrib.auth import authenticate
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
 from .models import CustomUser as User
+from .tokens import TOKEN_VERSION_CLAIM, VersionedRefreshToken, invalidate_user_cache
 
 
 def get_user_by_id(uidb64):
@@ -22,6 +24,38 @@ def get_user_by_id(uidb64):
         return Response({'error': 'Benutzer nicht gefunden.'}, status=status.HTTP_400_BAD_REQUEST)
 
 
+def get_user_by_token(uidb64, token, field):
+    """
+    Retrieves a user via the indexed activation/reset token field and checks
+    that the ID from the link matches
+    """
+    try:
+        user = User.objects.get(**{field: token})
+    except (ValidationError, User.DoesNotExist):
+        return None
+    return user if str(user.pk) == str(uidb64) else None
+
+
+def get_user_by_activation_token(uidb64, token):
+    """
+    Retrieves a user by activation token
+    """
+    user = get_user_by_token(uidb64, token, 'activation_token')
+    if user is None:
+        return Response({'error': 'Ungültiger Aktivierungstoken.'}, status=status.HTTP_400_BAD_REQUEST)
+    return user
+
+
+def get_user_by_password_reset_token(uidb64, token):
+    """
+    Retrieves a user by password reset token
+    """
+    user = get_user_by_token(uidb64, token, 'password_reset_token')
+    if user is None:
+        return Response({'error': 'Ungültiger Passwort-Reset-Token.'}, status=status.HTTP_400_BAD_REQUEST)
+    return user
+
+
 def validate_activation_token(user, token):
     """
     Validates the activation token
@@ -35,13 +69,11 @@ def validate_activation_token(user, token):
     return None
 
 
-def activate_user(user):
+def activate_user(user, token):
     """
-    Activates a user
+    Activates a user, returns False if a concurrent request already did
     """
-    user.is_active = True
-    user.clear_activation_token()
-    user.save()
+    return user.activate(token)
 
 
 def redirect_to_login(request):
@@ -54,6 +86,30 @@ def redirect_to_login(request):
     return HttpResponseRedirect(f"{frontend_url}/pages/auth/login.html?message=activation_success")
 
 
+LOGIN_INVALID_CREDENTIALS = 'Ungültige Anmeldedaten.'
+LOGIN_INACTIVE_ACCOUNT = 'Konto ist nicht aktiviert. Bitte aktivieren Sie Ihr Konto zuerst.'
+
+
+def get_login_error(user, password_valid):
+    """
+    Returns the error message of a failed login, or None if the user may log in
+    (shared by the sync and async login views)
+    """
+    if user is None or not password_valid:
+        return LOGIN_INVALID_CREDENTIALS
+    if not user.is_active:
+        return LOGIN_INACTIVE_ACCOUNT
+    return None
+
+
+def login_validation_error(errors):
+    return {'error': f'Login error: {errors}'}
+
+
+def registration_validation_error(errors):
+    return {'error': f'Registration error: {errors}'}
+
+
 def authenticate_user(serializer, request):
     """
     Authenticates a user
@@ -63,12 +119,15 @@ def authenticate_user(serializer, request):
     email = serializer.validated_data['email']
     password = serializer.validated_data['password']
     user = authenticate(request, email=email, password=password)
-    
+    password_valid = user is not None
     if user is None:
-        return Response({'error': 'Ungültige Anmeldedaten.'}, status=status.HTTP_401_UNAUTHORIZED)
+        # The backends reject inactive users, so check those separately to tell them apart
+        user = User.objects.filter(email=email, is_active=False).first()
+        password_valid = user is not None and user.check_password(password)
     
-    if not user.is_active:
-        return Response({'error': 'Konto ist nicht aktiviert. Bitte aktivieren Sie Ihr Konto zuerst.'}, status=status.HTTP_401_UNAUTHORIZED)
+    error = get_login_error(user, password_valid)
+    if error:
+        return Response({'error': error}, status=status.HTTP_401_UNAUTHORIZED)
     
     return user
 
@@ -124,15 +183,17 @@ def set_refresh_token_cookie(response, refresh):
 
 def blacklist_refresh_token(request):
     """
-    Blacklists the refresh token
+    Blacklists the refresh token and drops the cached user
     """
     refresh_token = request.COOKIES.get('refresh_token')
     if refresh_token:
         try:
-            token = RefreshToken(refresh_token)
+            token = VersionedRefreshToken(refresh_token)
             token.blacklist()
         except TokenError:
-            pass
+            return
+        if TOKEN_VERSION_CLAIM in token:
+            invalidate_user_cache(token[api_settings.USER_ID_CLAIM], token[TOKEN_VERSION_CLAIM])
 
 
 def create_logout_response():
@@ -183,10 +244,8 @@ def validate_password_reset_token(user, token):
     return None
 
 
-def reset_user_password(user, new_password):
+def reset_user_password(user, token, new_password):
     """
-    Sets a new password for the user
+    Sets a new password for the user, returns False if the token was already used
     """
-    user.set_password(new_password)
-    user.clear_password_reset_token()
-    user.save()
+    return user.reset_password(token, new_password)
@@ -15,8 +15,8 @@ echo "PostgreSQL ist bereit - fahre fort..."
 
 # Deine originalen Befehle (ohne wait_for_db)
 python manage.py collectstatic --noinput
-python manage.py makemigrations
-python manage.py migrate
+# Migrationen werden im Repository erzeugt und beim Start nur angewendet
+python manage.py migrate --noinput
 
 # Create a superuser using environment variables
 # (Dein Superuser-Erstellungs-Code bleibt gleich)
@@ -38,4 +38,9 @@ else:
     print(f"Superuser '{username}' already exists.")
 EOF
 
-exec gunicorn core.wsgi:application --bind 0.0.0.0:8000 --reload --timeout 120 --worker-class sync --workers 2
\ No newline at end of file
+# Prometheus: die Worker schreiben ihre Metriken in ein gemeinsames, beim Start geleertes Verzeichnis
+export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus}"
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
+exec gunicorn -c core/gunicorn_conf.py
\ No newline at end of file
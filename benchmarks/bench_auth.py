@@ -0,0 +1,20 @@
+import pytest
+from django.test import RequestFactory
+from auth_app.api.authentication import CustomJWTAuthentication
+from auth_app.models import CustomUser
+from auth_app.tokens import VersionedRefreshToken, clear_local_user_cache
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('user_cache', [False, True])
+def bench_jwt_authenticate(benchmark, settings, user_cache):
+    settings.AUTH_USER_CACHE = user_cache
+    clear_local_user_cache()
+    user = CustomUser.objects.create_user(email='bench@example.com', password='benchmark', username='bench')
+    access = str(VersionedRefreshToken.for_user(user).access_token)
+    request = RequestFactory().get('/api/video/', HTTP_AUTHORIZATION=f'Bearer {access}')
+    authentication = CustomJWTAuthentication()
+
+    authenticated, _ = benchmark(authentication.authenticate, request)
+
+    assert authenticated.pk == user.pk
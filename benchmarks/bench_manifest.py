@@ -0,0 +1,17 @@
+import pytest
+from video.utils import create_hls_manifest_content
+
+
+@pytest.mark.parametrize('segments', [1000, 20000])
+def bench_create_hls_manifest_content(benchmark, settings, tmp_path, segments):
+    settings.MEDIA_ROOT = str(tmp_path)
+    hls_dir = tmp_path / 'hls' / '1' / '720p'
+    hls_dir.mkdir(parents=True)
+    lines = ['#EXTM3U', '#EXT-X-VERSION:3', '#EXT-X-TARGETDURATION:10', '#EXT-X-PLAYLIST-TYPE:VOD']
+    for index in range(segments):
+        lines += ['#EXTINF:10.0,', f'segment_{index:05d}.ts']
+    (hls_dir / 'playlist.m3u8').write_text('\n'.join(lines + ['#EXT-X-ENDLIST']))
+
+    manifest = benchmark(create_hls_manifest_content, 1, '720p')
+
+    assert manifest.count('.ts') == segments
@@ -0,0 +1,34 @@
+import pytest
+from django.test import RequestFactory
+from video.api.views import HLSVideoSegmentView
+from video.utils import get_hls_segment_path, validate_hls_directory, validate_segment_file
+
+
+@pytest.fixture
+def segment(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    hls_dir = tmp_path / 'hls' / '1' / '720p'
+    hls_dir.mkdir(parents=True)
+    (hls_dir / 'segment_000.ts').write_bytes(b'\x47' * 188 * 1000)
+    return hls_dir
+
+
+def bench_segment_validation(benchmark, segment):
+    def validate():
+        path = get_hls_segment_path(1, '720p', 'segment_000.ts')
+        return validate_hls_directory(path.parent) or validate_segment_file(path)
+
+    assert benchmark(validate) is None
+
+
+@pytest.mark.django_db
+def bench_segment_view(benchmark, segment):
+    view = HLSVideoSegmentView.as_view()
+    request = RequestFactory().get('/api/video/1/720p/segment_000.ts')
+
+    def serve():
+        response = view(request, movie_id=1, resolution='720p', segment='segment_000.ts')
+        response.close()
+        return response
+
+    assert benchmark(serve).status_code == 200
@@ -0,0 +1,23 @@
+import pytest
+from django.utils import timezone
+from video.api.serializers import VideoSerializer
+from video.models import Video
+
+
+def make_videos(count):
+    now = timezone.now()
+    categories = [choice for choice, _ in Video.CATEGORY_CHOICES]
+    return [
+        Video(id=index, created_at=now, title=f'Video {index}', description='Benchmark description',
+              category=categories[index % len(categories)])
+        for index in range(1, count + 1)
+    ]
+
+
+@pytest.mark.parametrize('rows', [1000, 10000])
+def bench_video_serializer(benchmark, rows):
+    videos = make_videos(rows)
+
+    data = benchmark(lambda: VideoSerializer(videos, many=True).data)
+
+    assert len(data) == rows
@@ -0,0 +1,103 @@
+"""
+Benchmark fixture for the microbenchmark suite
+
+Run with `pytest benchmarks`. Every bench_* test times its hot spot with the
+`benchmark` fixture and fails if the median is more than BENCHMARK_THRESHOLD
+times (default 1.5) the median stored in baselines.json. BENCHMARK_SAVE=1
+writes the medians of the run as the new baselines; commit the file so
+performance changes show up in review. Baselines are machine-specific:
+regenerate them on the machine that runs the comparison.
+"""
+import json
+import os
+import platform
+import statistics
+import time
+from pathlib import Path
+import pytest
+
+BASELINES_FILE = Path(__file__).with_name('baselines.json')
+MIN_ROUNDS = 5
+MAX_ROUNDS = 200
+MIN_TIME = 0.5
+
+_results = {}
+
+
+def _load_baselines():
+    if BASELINES_FILE.exists():
+        return json.loads(BASELINES_FILE.read_text())
+    return {'machine': None, 'benchmarks': {}}
+
+
+class Benchmark:
+    """
+    Times a callable over several rounds and compares the median with the baseline
+    """
+
+    def __init__(self, name, baseline, threshold):
+        self.name = name
+        self.baseline = baseline
+        self.threshold = threshold
+
+    def __call__(self, func, *args, **kwargs):
+        result = func(*args, **kwargs)
+
+        samples = []
+        deadline = time.perf_counter() + MIN_TIME
+        while len(samples) < MIN_ROUNDS or (time.perf_counter() < deadline and len(samples) < MAX_ROUNDS):
+            started = time.perf_counter()
+            func(*args, **kwargs)
+            samples.append(time.perf_counter() - started)
+
+        stats = {
+            'rounds': len(samples),
+            'min': min(samples),
+            'median': statistics.median(samples),
+            'mean': statistics.mean(samples),
+        }
+        _results[self.name] = stats
+
+        if self.baseline and stats['median'] > self.baseline['median'] * self.threshold:
+            pytest.fail(
+                f"{self.name}: median {stats['median'] * 1000:.3f}ms is more than {self.threshold}x "
+                f"the baseline of {self.baseline['median'] * 1000:.3f}ms"
+            )
+        return result
+
+
+@pytest.fixture(scope='session')
+def baselines():
+    return _load_baselines()
+
+
+@pytest.fixture
+def benchmark(request, baselines):
+    saving = os.getenv('BENCHMARK_SAVE') == '1'
+    baseline = None if saving else baselines['benchmarks'].get(request.node.name)
+    return Benchmark(request.node.name, baseline, float(os.getenv('BENCHMARK_THRESHOLD', 1.5)))
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not _results:
+        return
+    baselines = _load_baselines()['benchmarks']
+    terminalreporter.section('benchmarks')
+    for name, stats in sorted(_results.items()):
+        baseline = baselines.get(name)
+        change = f"{stats['median'] / baseline['median']:6.2f}x" if baseline else '   new'
+        terminalreporter.write_line(
+            f"{name:<48} median={stats['median'] * 1000:10.3f}ms min={stats['min'] * 1000:10.3f}ms "
+            f"rounds={stats['rounds']:<4} vs baseline {change}"
+        )
+
+    if os.getenv('BENCHMARK_SAVE') == '1':
+        data = _load_baselines()
+        data['machine'] = f'{platform.machine()} {platform.python_implementation()} {platform.python_version()}'
+        data['benchmarks'].update({
+            name: {'median': round(stats['median'], 7), 'min': round(stats['min'], 7)}
+            for name, stats in _results.items()
+        })
+        data['benchmarks'] = dict(sorted(data['benchmarks'].items()))
+        BASELINES_FILE.write_text(json.dumps(data, indent=2) + '\n')
+        terminalreporter.write_line(f'Baselines written to {BASELINES_FILE}')
@@ -0,0 +1,52 @@
+"""
+Helper functions for the benchmark management commands
+"""
+import time
+from contextlib import contextmanager
+
+
+def percentile(samples, pct):
+    """
+    Returns the pct-th percentile of the samples (nearest-rank method)
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(int(round(pct / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def summarize(samples):
+    """
+    Summarizes latency samples given in seconds as milliseconds
+    """
+    count = len(samples)
+    return {
+        'count': count,
+        'mean_ms': (sum(samples) / count * 1000) if count else 0.0,
+        'p50_ms': percentile(samples, 50) * 1000,
+        'p95_ms': percentile(samples, 95) * 1000,
+        'p99_ms': percentile(samples, 99) * 1000,
+    }
+
+
+def format_summary(name, summary):
+    """
+    Formats a latency summary as a single report line
+    """
+    return (
+        f"{name:<32} n={summary['count']:<6} mean={summary['mean_ms']:8.2f}ms "
+        f"p50={summary['p50_ms']:8.2f}ms p95={summary['p95_ms']:8.2f}ms p99={summary['p99_ms']:8.2f}ms"
+    )
+
+
+@contextmanager
+def stopwatch(samples):
+    """
+    Appends the duration of the wrapped block in seconds to samples
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        samples.append(time.perf_counter() - started)
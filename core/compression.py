@@ -0,0 +1,130 @@
+"""
+Content-negotiated gzip/brotli compression for JSON and HLS manifest responses
+
+Only views that set `compress_response = True` are compressed: the public
+catalog, home and manifest documents. Responses that carry secrets next to
+reflected input (JWTs from login, refresh, registration) stay uncompressed,
+since compressing them would leak the secrets through the response length
+(BREACH).
+
+Views that serve cached documents attach precompressed variants to the
+response (response.precompressed = precompress(body)) so the middleware
+only has to pick one instead of compressing the same bytes again.
+"""
+import gzip
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_CONTENT_TYPES = ('application/json', 'application/vnd.apple.mpegurl')
+
+
+def available_encodings():
+    """
+    Returns the supported encodings in order of preference
+    """
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate_encoding(request):
+    """
+    Picks the preferred encoding accepted by the client, or None
+    """
+    accepted = set()
+    for part in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        coding, _, params = part.strip().partition(';')
+        if params.replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        accepted.add(coding.strip().lower())
+
+    for encoding in available_encodings():
+        if encoding in accepted or '*' in accepted:
+            return encoding
+    return None
+
+
+def compress(body, encoding):
+    """
+    Compresses a body with the given encoding
+    """
+    if encoding == 'br':
+        return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def precompress(body):
+    """
+    Returns the identity body together with all compressed variants, for caching
+    """
+    if isinstance(body, str):
+        body = body.encode()
+    variants = {'identity': body}
+    if len(body) >= settings.COMPRESSION_MIN_SIZE:
+        for encoding in available_encodings():
+            variants[encoding] = compress(body, encoding)
+    return variants
+
+
+def compresses_view(view_func):
+    """
+    Whether the (class-based) view opted in with `compress_response = True`
+    """
+    view_class = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+    return bool(getattr(view_class, 'compress_response', False))
+
+
+def is_compressible(response):
+    content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+    return content_type in COMPRESSIBLE_CONTENT_TYPES
+
+
+class CompressionMiddleware:
+    """
+    Compresses JSON and .m3u8 responses of opted-in views with brotli or gzip
+    depending on Accept-Encoding
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        return self.process_response(request, response)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.compress_response = compresses_view(view_func)
+
+    def process_response(self, request, response):
+        if not getattr(request, 'compress_response', False):
+            return response
+        if response.streaming or response.has_header('Content-Encoding') or not is_compressible(response):
+            return response
+
+        if len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = negotiate_encoding(request)
+        if encoding is None:
+            return response
+
+        variants = getattr(response, 'precompressed', None)
+        if variants and encoding in variants and variants['identity'] == response.content:
+            compressed = variants[encoding]
+        else:
+            compressed = compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
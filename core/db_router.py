@@ -0,0 +1,77 @@
+"""
+Read-replica routing for the catalog and streaming reads
+
+Reads of the models in DATABASE_REPLICA_MODELS go to a random replica from
+DATABASE_REPLICAS, everything else and all writes go to the primary. After
+a write, reads stay on the primary for the rest of the request and, via a
+cookie set by ReplicaPinningMiddleware, for DATABASE_REPLICA_PIN_SECONDS on
+the same client, so users always see their own writes.
+"""
+import random
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PIN_COOKIE = 'db_pin'
+
+_pinned = ContextVar('db_pinned', default=False)
+_wrote = ContextVar('db_wrote', default=False)
+
+
+def pin_to_primary():
+    """
+    Sends all further reads of the current request (or command) to the primary
+    """
+    _pinned.set(True)
+
+
+def is_pinned():
+    return _pinned.get() or connections[DEFAULT_DB_ALIAS].in_atomic_block
+
+
+class ReplicaRouter:
+    """
+    Database router: replica reads for the configured models, primary for the rest
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas or model._meta.label_lower not in settings.DATABASE_REPLICA_MODELS or is_pinned():
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        _wrote.set(True)
+        pin_to_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return False if db in settings.DATABASE_REPLICAS else None
+
+
+class ReplicaPinningMiddleware:
+    """
+    Pins reads to the primary while the client carries the pin cookie and
+    sets the cookie after requests that wrote to the database
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        pinned_token = _pinned.set(PIN_COOKIE in request.COOKIES)
+        wrote_token = _wrote.set(False)
+        try:
+            response = self.get_response(request)
+            if _wrote.get() and settings.DATABASE_REPLICAS:
+                response.set_cookie(
+                    PIN_COOKIE, '1', max_age=settings.DATABASE_REPLICA_PIN_SECONDS,
+                    httponly=True, samesite='Lax',
+                )
+            return response
+        finally:
+            _pinned.reset(pinned_token)
+            _wrote.reset(wrote_token)
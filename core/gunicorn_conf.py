@@ -0,0 +1,61 @@
+"""
+Gunicorn configuration for production
+
+Start with: gunicorn -c core/gunicorn_conf.py
+
+GUNICORN_WORKER_CLASS selects the serving model:
+- gthread (default): WSGI workers with a thread pool each. Segment and direct
+  video responses stream from threads, so a slow client only occupies one
+  thread instead of a whole worker.
+- uvicorn: ASGI workers for the async login/registration views
+  (AUTH_ASYNC_VIEWS); core.asgi is served instead of core.wsgi.
+
+Workers are sized from the CPUs available to the process (respecting
+container CPU sets). They are recycled after GUNICORN_MAX_REQUESTS requests
+(with jitter, so they do not all restart at once) to keep memory growth in
+check. At runtime the worker count can be changed with TTIN/TTOU signals.
+"""
+import multiprocessing
+import os
+
+
+def available_cpus():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return multiprocessing.cpu_count()
+
+
+WORKER_CLASSES = {
+    'gthread': ('gthread', 'core.wsgi:application'),
+    'uvicorn': ('uvicorn.workers.UvicornWorker', 'core.asgi:application'),
+}
+
+cpus = available_cpus()
+worker_class, wsgi_app = WORKER_CLASSES[os.getenv('GUNICORN_WORKER_CLASS', 'gthread')]
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+# gthread: I/O-bound threads share the CPUs, so fewer processes suffice; uvicorn: one event loop per CPU
+workers = int(os.getenv('GUNICORN_WORKERS', cpus + 1 if worker_class == 'gthread' else cpus))
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', max_requests // 10))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+# Worker heartbeat files in memory instead of the (possibly slow) container filesystem
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+reload = os.getenv('GUNICORN_RELOAD', 'False').lower() == 'true'
+accesslog = os.getenv('GUNICORN_ACCESS_LOG') or None
+
+
+def child_exit(server, worker):
+    """
+    Marks the Prometheus sample files of an exited worker as dead, so its
+    gauges drop out of the aggregated /metrics output
+    """
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
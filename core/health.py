@@ -0,0 +1,117 @@
+"""
+Liveness and readiness probes
+
+HealthCheckMiddleware answers /healthz and /readyz before the rest of the
+middleware stack runs, so probes skip sessions, authentication and host
+validation (orchestrators probe by pod IP). /healthz only shows that the
+process serves requests. /readyz checks the database, the Redis cache,
+the media volume and ffmpeg; its result is cached per process for
+READINESS_CACHE_SECONDS, so frequent probes do not add load to the
+dependencies. The probes are public, so failures are reported as a bare
+'error' per check; the exception itself only goes to the log.
+"""
+import logging
+import shutil
+import tempfile
+import threading
+import time
+from django.conf import settings
+from django.db import connection
+from django.http import JsonResponse
+from core.redis_client import get_redis_connection
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_cached = {'expires': 0.0, 'result': None}
+
+
+def check_database():
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+    return 'ok'
+
+
+def check_cache():
+    redis = get_redis_connection()
+    if redis is None:
+        return 'skipped (no Redis configured)'
+    redis.ping()
+    return 'ok'
+
+
+def check_media():
+    with tempfile.NamedTemporaryFile(dir=settings.MEDIA_ROOT, prefix='.readyz-'):
+        pass
+    return 'ok'
+
+
+def check_ffmpeg():
+    if shutil.which('ffmpeg') is None:
+        raise RuntimeError('ffmpeg not found on PATH')
+    return 'ok'
+
+
+CHECKS = {
+    'database': check_database,
+    'cache': check_cache,
+    'media': check_media,
+    'ffmpeg': check_ffmpeg,
+}
+
+
+def run_checks():
+    """
+    Runs all enabled checks, returns (ready, {name: {'status', 'duration_ms'}})
+    """
+    results = {}
+    ready = True
+    for name, check in CHECKS.items():
+        if name not in settings.READINESS_CHECKS:
+            continue
+        started = time.perf_counter()
+        try:
+            status = check()
+        except Exception:
+            logger.warning(f"Readiness check '{name}' failed", exc_info=True)
+            status = 'error'
+            ready = False
+        results[name] = {'status': status, 'duration_ms': round((time.perf_counter() - started) * 1000, 2)}
+    return ready, results
+
+
+def get_readiness():
+    """
+    Returns the cached readiness result, running the checks at most once per
+    READINESS_CACHE_SECONDS even when several probes arrive at the same time
+    """
+    with _lock:
+        if _cached['result'] is None or time.monotonic() >= _cached['expires']:
+            _cached['result'] = run_checks()
+            _cached['expires'] = time.monotonic() + settings.READINESS_CACHE_SECONDS
+        return _cached['result']
+
+
+def clear_readiness_cache():
+    with _lock:
+        _cached['result'] = None
+
+
+class HealthCheckMiddleware:
+    """
+    Serves /healthz and /readyz without running the rest of the stack
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.path == '/healthz':
+            return JsonResponse({'status': 'ok'})
+        if request.path == '/readyz':
+            ready, checks = get_readiness()
+            return JsonResponse(
+                {'status': 'ok' if ready else 'unavailable', 'checks': checks},
+                status=200 if ready else 503,
+            )
+        return self.get_response(request)
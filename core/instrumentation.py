@@ -0,0 +1,170 @@
+"""
+Per-request performance instrumentation
+
+ServerTimingMiddleware collects SQL query count and time, cache hits, misses
+and latency, file I/O time and subprocess time of every request and emits
+them as a Server-Timing header and a structured log line. Code outside the
+ORM reports its work through measure() and cache_get().
+
+The middleware is only installed when PERF_INSTRUMENTATION is on. Without it
+no request has a RequestMetrics object, and measure() and cache_get() cost a
+single ContextVar lookup.
+"""
+import logging
+import time
+from contextlib import ExitStack, nullcontext
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+SQL = 'db'
+CACHE = 'cache'
+FILE_IO = 'file'
+SUBPROCESS = 'subprocess'
+
+_current = ContextVar('perf_metrics', default=None)
+_noop = nullcontext()
+_missing = object()
+
+
+class RequestMetrics:
+    """
+    Durations (in seconds) and counts per category for one request
+    """
+
+    def __init__(self):
+        self.durations = {}
+        self.counts = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def add(self, name, duration, count=1):
+        self.durations[name] = self.durations.get(name, 0.0) + duration
+        self.counts[name] = self.counts.get(name, 0) + count
+
+    def sql_wrapper(self, execute, sql, params, many, context):
+        """
+        connection.execute_wrapper hook timing every query of the request
+        """
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.add(SQL, time.perf_counter() - start)
+
+    def as_dict(self, total):
+        data = {'total_ms': round(total * 1000, 2)}
+        for name, duration in self.durations.items():
+            data[f'{name}_ms'] = round(duration * 1000, 2)
+            data[f'{name}_count'] = self.counts[name]
+        if self.cache_hits or self.cache_misses:
+            data['cache_hits'] = self.cache_hits
+            data['cache_misses'] = self.cache_misses
+        return data
+
+    def server_timing(self, total):
+        """
+        Renders the Server-Timing header value
+        """
+        metrics = []
+        for name, duration in self.durations.items():
+            if name == CACHE:
+                desc = f'{self.cache_hits} hits, {self.cache_misses} misses'
+            else:
+                desc = f'{self.counts[name]} calls'
+            metrics.append(f'{name};dur={duration * 1000:.2f};desc="{desc}"')
+        metrics.append(f'total;dur={total * 1000:.2f}')
+        return ', '.join(metrics)
+
+
+class _Timer:
+    __slots__ = ('metrics', 'name', 'start')
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.add(self.name, time.perf_counter() - self.start)
+        return False
+
+
+def current_metrics():
+    """
+    Returns the RequestMetrics of the current request, or None
+    """
+    return _current.get()
+
+
+def measure(name):
+    """
+    Context manager adding the duration of its block to the given category
+    of the current request (a no-op outside instrumented requests)
+    """
+    metrics = _current.get()
+    if metrics is None:
+        return _noop
+    return _Timer(metrics, name)
+
+
+def cache_get(key, default=None):
+    """
+    cache.get() that records hit/miss and latency for the current request
+    """
+    metrics = _current.get()
+    if metrics is None:
+        return cache.get(key, default)
+
+    start = time.perf_counter()
+    value = cache.get(key, _missing)
+    metrics.add(CACHE, time.perf_counter() - start)
+    if value is _missing:
+        metrics.cache_misses += 1
+        return default
+    metrics.cache_hits += 1
+    return value
+
+
+class ServerTimingMiddleware:
+    """
+    Collects the metrics of each request, adds the Server-Timing header
+    (PERF_TIMING_HEADER) and logs one line per request (PERF_TIMING_LOG)
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics.sql_wrapper))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total = time.perf_counter() - start
+
+        if settings.PERF_TIMING_HEADER:
+            response['Server-Timing'] = metrics.server_timing(total)
+        if settings.PERF_TIMING_LOG:
+            timing = {
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                **metrics.as_dict(total),
+            }
+            logger.info(
+                'request_timing %s', ' '.join(f'{key}={value}' for key, value in timing.items()),
+                extra={'timing': timing},
+            )
+        return response
@@ -0,0 +1,118 @@
+"""
+Non-blocking JSON logging
+
+Loggers hand their records to NonBlockingHandler, which only puts them on an
+in-memory queue. A QueueListener thread per process formats them as JSON and
+writes them to stderr and the log file, so no request thread ever waits for
+the console or the disk. When the queue is full, records are dropped and
+counted instead of blocking.
+"""
+import atexit
+import copy
+import json
+import logging
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+RESERVED_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    One JSON object per line: timestamp, level, logger, message, process and
+    thread, plus every field passed via `extra`
+    """
+
+    def format(self, record):
+        entry = {
+            'timestamp': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'process': record.process,
+            'thread': record.thread,
+        }
+        for key, value in record.__dict__.items():
+            if key not in RESERVED_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class NonBlockingHandler(QueueHandler):
+    """
+    Queues records for a background listener that writes them to stderr and,
+    if a filename is given, to a file. The formatter configured for this
+    handler is used by the listener's handlers.
+    """
+
+    def __init__(self, filename=None, queue_size=10000):
+        super().__init__(queue.Queue(queue_size))
+        self.dropped = 0
+        handlers = [logging.StreamHandler(sys.stderr)]
+        if filename:
+            handlers.append(logging.FileHandler(filename, encoding='utf-8'))
+        self.listener = QueueListener(self.queue, *handlers, respect_handler_level=True)
+        self.listener.start()
+        self._listening = True
+        atexit.register(self.stop)
+
+    def setFormatter(self, fmt):
+        super().setFormatter(fmt)
+        for handler in self.listener.handlers:
+            handler.setFormatter(fmt)
+
+    def prepare(self, record):
+        """
+        Merges the arguments into the message and renders the traceback now,
+        as args and exc_info may not outlive the request; formatting to JSON
+        happens in the listener thread
+        """
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def stop(self):
+        """
+        Writes out the queued records and stops the listener thread
+        """
+        if self._listening:
+            self._listening = False
+            self.listener.stop()
+
+    def close(self):
+        self.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+        super().close()
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Lets through only a fraction (`rate`) of the INFO/DEBUG records of a
+    high-volume logger; warnings and errors always pass
+    """
+
+    def __init__(self, rate=1.0):
+        super().__init__()
+        self.rate = float(rate)
+
+    def filter(self, record):
+        return record.levelno >= logging.WARNING or random.random() < self.rate
@@ -0,0 +1,121 @@
+"""
+Prometheus metrics for the hot paths and the /metrics exposition endpoint
+
+Under gunicorn every worker writes its samples to PROMETHEUS_MULTIPROC_DIR
+and the endpoint aggregates all files, so whichever worker answers the
+scrape reports the totals of the whole server. core/gunicorn_conf.py marks
+the files of exited workers as dead. Without the variable (runserver, tests)
+the default in-process registry is exposed.
+
+The endpoint is off unless METRICS_ENABLED is set, and then only answers
+clients in METRICS_ALLOWED_IPS (loopback by default) or requests carrying
+`Authorization: Bearer <METRICS_TOKEN>`; every scrape runs a query and the
+output names internal views.
+"""
+import os
+import time
+from django.conf import settings
+from django.db.models import Count, Q
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Request latency per view',
+    ['view', 'method', 'status'],
+)
+SEGMENT_BYTES = Counter(
+    'hls_segment_bytes_served', 'Bytes of HLS segments served',
+    ['resolution'],
+)
+CACHE_LOOKUPS = Counter(
+    'cache_lookups', 'Lookups of the cached catalog and manifests',
+    ['cache', 'result'],
+)
+TRANSCODE_DURATION = Histogram(
+    'video_transcode_duration_seconds', 'Duration of ffmpeg HLS transcodes',
+    ['resolution', 'outcome'],
+    buckets=(1, 5, 10, 30, 60, 120, 300, 600),
+)
+EMAIL_DELIVERY_LATENCY = Histogram(
+    'email_delivery_latency_seconds', 'Time from queueing an e-mail until it was sent',
+    buckets=(0.5, 1, 5, 15, 30, 60, 300, 900, 3600),
+)
+
+
+def record_cache_lookup(cache_name, hit):
+    CACHE_LOOKUPS.labels(cache=cache_name, result='hit' if hit else 'miss').inc()
+
+
+class QueueDepthCollector:
+    """
+    Reads the queue depths from the database at scrape time, so they are
+    correct no matter which process changed them
+    """
+
+    def collect(self):
+        from auth_app.models import OutboundEmail
+
+        counts = OutboundEmail.objects.aggregate(
+            queued=Count('id', filter=Q(status__in=[OutboundEmail.STATUS_PENDING, OutboundEmail.STATUS_SENDING])),
+            failed=Count('id', filter=Q(status=OutboundEmail.STATUS_FAILED)),
+        )
+        depth = GaugeMetricFamily('email_outbox_queue_depth', 'E-mails in the outbox', labels=['status'])
+        depth.add_metric(['queued'], counts['queued'])
+        depth.add_metric(['failed'], counts['failed'])
+        yield depth
+
+
+def render_metrics():
+    """
+    Returns the exposition text of this process, or of all workers in multiprocess mode
+    """
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    queues = CollectorRegistry()
+    queues.register(QueueDepthCollector())
+    return generate_latest(registry) + generate_latest(queues)
+
+
+def is_metrics_client(request):
+    """
+    Whether the caller is allowed to scrape: an allowlisted address or the bearer token
+    """
+    if request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS:
+        return True
+    token = settings.METRICS_TOKEN
+    scheme, _, credentials = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+    return bool(token) and scheme.lower() == 'bearer' and constant_time_compare(credentials.strip(), token)
+
+
+def metrics_view(request):
+    if not settings.METRICS_ENABLED:
+        raise Http404
+    if not is_metrics_client(request):
+        return HttpResponseForbidden()
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE_LATEST)
+
+
+class PrometheusMiddleware:
+    """
+    Observes the latency of every request, labelled with the URL name of its view
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        response = self.get_response(request)
+        match = request.resolver_match
+        view = (match.view_name or match.route) if match else 'unmatched'
+        REQUEST_LATENCY.labels(view=view, method=request.method, status=response.status_code).observe(
+            time.perf_counter() - start
+        )
+        return response
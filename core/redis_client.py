@@ -0,0 +1,16 @@
+"""
+Access to the raw Redis client behind the Django cache
+"""
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+
+
+def get_redis_connection(alias='default'):
+    """
+    Returns the redis-py client of a RedisCache alias, or None if the cache
+    is not Redis-backed (local memory in development)
+    """
+    backend = caches[alias]
+    if not isinstance(backend, RedisCache):
+        return None
+    return backend._cache.get_client(write=True)
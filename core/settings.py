@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 from pathlib import Path
+import copy
 import os
 from dotenv import load_dotenv
 
@@ -41,6 +42,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework_simplejwt',
     'rest_framework_simplejwt.token_blacklist',
@@ -50,9 +52,12 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.health.HealthCheckMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.compression.CompressionMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  
+    'core.db_router.ReplicaPinningMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',  
@@ -100,6 +105,21 @@ if os.getenv('DB_HOST') and os.getenv('DB_HOST') != 'localhost':
             },
         }
     }
+    if os.getenv('DB_POOL', 'False').lower() == 'true':
+        # Connection pool per process (psycopg_pool); Django requires CONN_MAX_AGE = 0 here
+        from psycopg_pool import ConnectionPool
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.getenv('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.getenv('DB_POOL_MAX_SIZE', 10)),
+            'max_lifetime': float(os.getenv('DB_POOL_MAX_LIFETIME', 1800)),
+            'max_idle': float(os.getenv('DB_POOL_MAX_IDLE', 300)),
+            'timeout': float(os.getenv('DB_POOL_TIMEOUT', 10)),
+            'check': ConnectionPool.check_connection,
+        }
+    else:
+        # Persistent connections per worker thread, verified before reuse
+        DATABASES['default']['CONN_MAX_AGE'] = int(os.getenv('DB_CONN_MAX_AGE', 60))
+        DATABASES['default']['CONN_HEALTH_CHECKS'] = True
 else:
     # Development: SQLite
     DATABASES = {
@@ -109,6 +129,15 @@ else:
         }
     }
 
+# Read replicas: DB_REPLICA_HOSTS=host1,host2 adds the aliases replica_1, replica_2, ... with the
+# primary's credentials. Reads of DB_REPLICA_MODELS go there unless the client wrote recently.
+DATABASE_REPLICAS = []
+for index, host in enumerate(filter(None, os.getenv('DB_REPLICA_HOSTS', '').split(',')), start=1):
+    DATABASES[f'replica_{index}'] = {**copy.deepcopy(DATABASES['default']), 'HOST': host.strip(), 'TEST': {'MIRROR': 'default'}}
+    DATABASE_REPLICAS.append(f'replica_{index}')
+DATABASE_ROUTERS = ['core.db_router.ReplicaRouter']
+DATABASE_REPLICA_MODELS = os.getenv('DB_REPLICA_MODELS', 'video.video').lower().split(',')
+DATABASE_REPLICA_PIN_SECONDS = int(os.getenv('DB_REPLICA_PIN_SECONDS', 5))
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -172,8 +201,19 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.FastJSONRenderer'
+        if os.getenv('API_FAST_JSON', 'False').lower() == 'true'
+        else 'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
+# Response compression (JSON and HLS manifests)
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 512))
+COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', 6))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 5))
+
 from datetime import timedelta
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
@@ -286,7 +326,7 @@ SESSION_COOKIE_SAMESITE = 'Lax'
 CSRF_COOKIE_HTTPONLY = False  
 SESSION_COOKIE_HTTPONLY = True
 
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
 EMAIL_HOST = os.getenv('EMAIL_HOST', 'smtp.gmail.com')
 EMAIL_PORT = int(os.getenv('EMAIL_PORT', 587))
 EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'True').lower() == 'true'
@@ -295,40 +335,67 @@ EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', 'developertest181@gmail.com')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', 'qqbofjugcyzysoqf')
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'noreply@videoflix.com')
 
+# E-Mail-Postausgang: Zustellung durch process_email_outbox mit Retries und Backoff.
+# EMAIL_OUTBOX_IMMEDIATE stellt direkt nach dem Commit zu (z.B. mit Console-Backend in der Entwicklung).
+EMAIL_OUTBOX_IMMEDIATE = os.getenv('EMAIL_OUTBOX_IMMEDIATE', 'False').lower() == 'true'
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', 50))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', 6))
+EMAIL_OUTBOX_BACKOFF_SECONDS = int(os.getenv('EMAIL_OUTBOX_BACKOFF_SECONDS', 30))
+EMAIL_OUTBOX_MAX_BACKOFF = int(os.getenv('EMAIL_OUTBOX_MAX_BACKOFF', 3600))
+EMAIL_OUTBOX_LEASE_SECONDS = int(os.getenv('EMAIL_OUTBOX_LEASE_SECONDS', 300))
+# SMTP-Verbindungspool des Workers: offene Verbindungen und maximale Leerlaufzeit in Sekunden
+EMAIL_POOL_SIZE = int(os.getenv('EMAIL_POOL_SIZE', 4))
+EMAIL_POOL_MAX_IDLE = int(os.getenv('EMAIL_POOL_MAX_IDLE', 60))
+
 AUTH_USER_MODEL = 'auth_app.CustomUser'
 
-# Logging-Konfiguration
+# Logging-Konfiguration: JSON-Zeilen über eine Queue, geschrieben von einem Hintergrund-Thread
+# (LOG_FORMAT=text für lesbare Ausgabe, LOG_FILE leer = nur stderr)
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')
+LOG_FILE = os.getenv('LOG_FILE', 'django.log')
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))
+LOG_SEGMENT_SAMPLE_RATE = float(os.getenv('LOG_SEGMENT_SAMPLE_RATE', 0.01))
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
     'formatters': {
-        'verbose': {
-            'format': '{levelname} {asctime} {module} {process:d} {thread:d} {message}',
-            'style': '{',
+        'json': {
+            '()': 'core.log.JSONFormatter',
         },
-        'simple': {
-            'format': '{levelname} {message}',
+        'text': {
+            'format': '{levelname} {asctime} {name} {process:d} {thread:d} {message}',
             'style': '{',
         },
     },
-    'handlers': {
-        'file': {
-            'level': 'INFO',
-            'class': 'logging.FileHandler',
-            'filename': 'django.log',
-            'formatter': 'verbose',
+    'filters': {
+        'segment_sampling': {
+            '()': 'core.log.SamplingFilter',
+            'rate': LOG_SEGMENT_SAMPLE_RATE,
         },
-        'console': {
-            'level': 'INFO',
-            'class': 'logging.StreamHandler',
-            'formatter': 'simple',
+    },
+    'handlers': {
+        'queue': {
+            '()': 'core.log.NonBlockingHandler',
+            'filename': LOG_FILE,
+            'queue_size': LOG_QUEUE_SIZE,
+            'formatter': LOG_FORMAT,
         },
     },
     'loggers': {
-        'auth_app.services': {
-            'handlers': ['file', 'console'],
-            'level': 'INFO',
-            'propagate': True,
+        app: {
+            'handlers': ['queue'],
+            'level': LOG_LEVEL,
+            'propagate': False,
+        }
+        for app in ('core', 'video', 'auth_app')
+    } | {
+        'video.segments': {
+            'handlers': ['queue'],
+            'filters': ['segment_sampling'],
+            'level': LOG_LEVEL,
+            'propagate': False,
         },
     },
 }
@@ -339,15 +406,112 @@ REDIS_PORT = int(os.getenv('REDIS_PORT', 6379))
 REDIS_DB = int(os.getenv('REDIS_DB', 0))
 REDIS_PASSWORD = os.getenv('REDIS_PASSWORD', None)
 
-# Cache Configuration
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
-        'LOCATION': f'redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}',
+# Cache Configuration - Redis for Docker, local memory for development
+if os.getenv('REDIS_HOST'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': f'redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'videoflix-local',
+        }
     }
+
+# Home screen: number of videos per category row and lifetime of the cached document
+VIDEO_HOME_ROW_LIMIT = int(os.getenv('VIDEO_HOME_ROW_LIMIT', 10))
+VIDEO_HOME_CACHE_TIMEOUT = int(os.getenv('VIDEO_HOME_CACHE_TIMEOUT', 3600))
+
+# Full-text search: PostgreSQL text search configuration and maximum page size
+VIDEO_SEARCH_CONFIG = os.getenv('VIDEO_SEARCH_CONFIG', 'english')
+VIDEO_SEARCH_MAX_RESULTS = int(os.getenv('VIDEO_SEARCH_MAX_RESULTS', 50))
+
+# Watch progress: lifetime of the per-user Redis buffer and rows per bulk upsert
+WATCH_PROGRESS_BUFFER_TTL = int(os.getenv('WATCH_PROGRESS_BUFFER_TTL', 7 * 24 * 3600))
+WATCH_PROGRESS_FLUSH_BATCH_SIZE = int(os.getenv('WATCH_PROGRESS_FLUSH_BATCH_SIZE', 500))
+
+# View counting and trending: bucket size, Redis retention and time decay
+VIDEO_VIEW_BUCKET_SECONDS = int(os.getenv('VIDEO_VIEW_BUCKET_SECONDS', 3600))
+VIDEO_VIEW_RETENTION_SECONDS = int(os.getenv('VIDEO_VIEW_RETENTION_SECONDS', 48 * 3600))
+TRENDING_WINDOW_HOURS = int(os.getenv('TRENDING_WINDOW_HOURS', 48))
+TRENDING_HALF_LIFE_HOURS = float(os.getenv('TRENDING_HALF_LIFE_HOURS', 12))
+TRENDING_LIMIT = int(os.getenv('TRENDING_LIMIT', 20))
+TRENDING_CACHE_TIMEOUT = int(os.getenv('TRENDING_CACHE_TIMEOUT', 300))
+
+# Cached catalog and HLS manifests (stored together with their compressed variants)
+VIDEO_LIST_CACHE_TIMEOUT = int(os.getenv('VIDEO_LIST_CACHE_TIMEOUT', 3600))
+HLS_MANIFEST_CACHE_TIMEOUT = int(os.getenv('HLS_MANIFEST_CACHE_TIMEOUT', 3600))
+
+# JWT user resolution: per-process and shared cache instead of one SELECT per request
+AUTH_USER_CACHE = os.getenv('AUTH_USER_CACHE', 'False').lower() == 'true'
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv('AUTH_USER_CACHE_TIMEOUT', 300))
+AUTH_USER_LOCAL_CACHE_TIMEOUT = int(os.getenv('AUTH_USER_LOCAL_CACHE_TIMEOUT', 5))
+AUTH_USER_LOCAL_CACHE_SIZE = int(os.getenv('AUTH_USER_LOCAL_CACHE_SIZE', 10000))
+
+# Refresh token blacklist: Redis mirror (sorted set, or fixed-size Bloom filter) and pruning batch size
+TOKEN_BLACKLIST_BLOOM = os.getenv('TOKEN_BLACKLIST_BLOOM', 'False').lower() == 'true'
+TOKEN_BLACKLIST_BLOOM_BITS = int(os.getenv('TOKEN_BLACKLIST_BLOOM_BITS', 2 ** 23))
+TOKEN_BLACKLIST_BLOOM_HASHES = int(os.getenv('TOKEN_BLACKLIST_BLOOM_HASHES', 7))
+TOKEN_BLACKLIST_PRUNE_BATCH_SIZE = int(os.getenv('TOKEN_BLACKLIST_PRUNE_BATCH_SIZE', 1000))
+
+# Account cleanup: grace period for never-activated registrations and rows per batch
+ACCOUNT_ABANDONED_DAYS = int(os.getenv('ACCOUNT_ABANDONED_DAYS', 7))
+ACCOUNT_CLEANUP_BATCH_SIZE = int(os.getenv('ACCOUNT_CLEANUP_BATCH_SIZE', 500))
+
+# Sliding-window rate limits for the password-hashing and e-mail sending endpoints ('<scope>_<kind>')
+THROTTLE_ENABLED = os.getenv('THROTTLE_ENABLED', 'True').lower() == 'true'
+THROTTLE_RATES = {
+    'login_ip': os.getenv('THROTTLE_LOGIN_IP', '20/min'),
+    'login_email': os.getenv('THROTTLE_LOGIN_EMAIL', '10/min'),
+    'login_global': os.getenv('THROTTLE_LOGIN_GLOBAL', '600/min'),
+    'register_ip': os.getenv('THROTTLE_REGISTER_IP', '10/min'),
+    'register_email': os.getenv('THROTTLE_REGISTER_EMAIL', '5/hour'),
+    'register_global': os.getenv('THROTTLE_REGISTER_GLOBAL', '300/min'),
+    'password_reset_ip': os.getenv('THROTTLE_PASSWORD_RESET_IP', '10/min'),
+    'password_reset_email': os.getenv('THROTTLE_PASSWORD_RESET_EMAIL', '5/hour'),
+    'password_reset_global': os.getenv('THROTTLE_PASSWORD_RESET_GLOBAL', '300/min'),
 }
 
-# Session Configuration (optional - using Redis for sessions)
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'  # Fallback auf Datenbank
+# Async login/registration (serve via ASGI): hashing threads per process and maximum queued hashes
+AUTH_ASYNC_VIEWS = os.getenv('AUTH_ASYNC_VIEWS', 'False').lower() == 'true'
+AUTH_HASH_WORKERS = int(os.getenv('AUTH_HASH_WORKERS', os.cpu_count() or 2))
+AUTH_HASH_MAX_PENDING = int(os.getenv('AUTH_HASH_MAX_PENDING', 32))
+
+# Session Configuration: 'cached_db' (Redis in front of the session table, default with Redis),
+# 'cache' (Redis only, sessions are lost when Redis is flushed) or 'db' (fallback without Redis)
+SESSION_STORE = os.getenv('SESSION_STORE', 'cached_db' if os.getenv('REDIS_HOST') else 'db')
+SESSION_ENGINE = f'django.contrib.sessions.backends.{SESSION_STORE}'
 SESSION_CACHE_ALIAS = 'default'
+SESSION_CLEANUP_BATCH_SIZE = int(os.getenv('SESSION_CLEANUP_BATCH_SIZE', 1000))
+
+# Session-authenticated requests (admin) load the user from the cache instead of one SELECT each.
+# Switching the backend logs out existing sessions, as they store the backend path.
+AUTH_SESSION_USER_CACHE = os.getenv('AUTH_SESSION_USER_CACHE', 'False').lower() == 'true'
+AUTHENTICATION_BACKENDS = [
+    'auth_app.backends.CachedModelBackend' if AUTH_SESSION_USER_CACHE
+    else 'django.contrib.auth.backends.ModelBackend'
+]
+
 
+# Per-request instrumentation: Server-Timing header and one 'request_timing' log line per request
+PERF_INSTRUMENTATION = os.getenv('PERF_INSTRUMENTATION', 'False').lower() == 'true'
+PERF_TIMING_HEADER = os.getenv('PERF_TIMING_HEADER', 'True').lower() == 'true'
+PERF_TIMING_LOG = os.getenv('PERF_TIMING_LOG', 'True').lower() == 'true'
+if PERF_INSTRUMENTATION:
+    MIDDLEWARE.insert(1, 'core.instrumentation.ServerTimingMiddleware')  # after HealthCheckMiddleware
+
+# Prometheus metrics at /metrics (set PROMETHEUS_MULTIPROC_DIR when running several worker processes).
+# Only allowlisted addresses or requests with the bearer token may scrape.
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'False').lower() == 'true'
+METRICS_ALLOWED_IPS = [ip.strip() for ip in os.getenv('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',') if ip.strip()]
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+if METRICS_ENABLED:
+    MIDDLEWARE.insert(1, 'core.metrics.PrometheusMiddleware')  # after HealthCheckMiddleware
+
+# Readiness probe (/readyz): enabled dependency checks and per-process result cache in seconds
+READINESS_CHECKS = os.getenv('READINESS_CHECKS', 'database,cache,media,ffmpeg').split(',')
+READINESS_CACHE_SECONDS = float(os.getenv('READINESS_CACHE_SECONDS', 5))
@@ -0,0 +1,38 @@
+"""
+Test helpers shared by the app test suites
+"""
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """
+    TestCase mixin guarding endpoints against N+1 queries: the request is
+    repeated after growing the fixture data to each of `sizes` and must issue
+    the same number of queries every time, at most the declared budget
+    """
+    sizes = (1, 10, 50)
+
+    def assertQueryBudget(self, budget, request, seed=None):
+        """
+        `seed(n)` grows the fixture data to n rows, `request()` performs the
+        request and returns the response. The cache is cleared before every
+        request so the uncached path is measured. One unmeasured request runs
+        first, so one-off work (e.g. creating a counter row) is not counted.
+        """
+        request()
+        counts = {}
+        for size in self.sizes:
+            if seed is not None:
+                seed(size)
+            cache.clear()
+            with CaptureQueriesContext(connection) as captured:
+                response = request()
+            self.assertLess(response.status_code, 500, f'Request failed with {response.status_code}')
+            counts[size] = len(captured)
+
+        queries = '\n'.join(query['sql'] for query in captured.captured_queries)
+        self.assertEqual(len(set(counts.values())), 1, f'Query count grows with the data: {counts}\n{queries}')
+        self.assertLessEqual(counts[size], budget, f'{counts[size]} queries exceed the budget of {budget}:\n{queries}')
+        return counts[size]
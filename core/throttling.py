@@ -0,0 +1,226 @@
+"""
+Sliding-window rate limiting in Redis, usable as DRF throttle classes
+
+Each limiter keeps the timestamps of the requests inside the window in a
+sorted set. Trimming, counting and recording happen in one Lua script, so
+concurrent workers can never overshoot the limit. The script checks all
+limits of a request first and records it only if every one admits it. The script is sent by its
+SHA1 (EVALSHA) and only loaded when Redis does not know it yet. Without Redis
+(local development) or while Redis is failing, the timestamps are kept in the
+Django cache instead; if that fails as well, the request is let through.
+
+Views set `throttle_scope` and list the throttles; the rates come from
+THROTTLE_RATES, keyed by '<scope>_<kind>' (e.g. 'login_ip': '10/min').
+A scope without a rate is not limited.
+"""
+import hashlib
+import logging
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+from django.conf import settings
+from django.core.cache import cache
+from redis.exceptions import NoScriptError, RedisError
+from rest_framework.throttling import BaseThrottle
+from .redis_client import get_redis_connection
+
+logger = logging.getLogger(__name__)
+
+SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local window = tonumber(ARGV[2 * i + 1])
+    local limit = tonumber(ARGV[2 * i + 2])
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    if redis.call('ZCARD', key) >= limit then
+        local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+        local retry = oldest[2] and tonumber(oldest[2]) + window - now or window
+        wait = math.max(wait, retry, 1)
+    end
+end
+if wait > 0 then
+    return wait
+end
+for i, key in ipairs(KEYS) do
+    redis.call('ZADD', key, now, ARGV[2])
+    redis.call('PEXPIRE', key, tonumber(ARGV[2 * i + 1]))
+end
+return 0
+"""
+SLIDING_WINDOW_SHA = hashlib.sha1(SLIDING_WINDOW_SCRIPT.encode()).hexdigest()
+
+DURATIONS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+_fallback_lock = threading.Lock()
+
+
+def parse_rate(rate):
+    """
+    Parses '<requests>/<period>' (s, min, hour, day) into (requests, window seconds)
+    """
+    num, period = rate.split('/')
+    return int(num), DURATIONS[period[0]]
+
+
+def _redis_hit(redis, limits, now_ms):
+    keys = [key for key, _, _ in limits]
+    args = [now_ms, f'{now_ms}:{uuid.uuid4().hex[:8]}']
+    for _, limit, window_ms in limits:
+        args += [window_ms, limit]
+    try:
+        return int(redis.evalsha(SLIDING_WINDOW_SHA, len(keys), *keys, *args))
+    except NoScriptError:
+        return int(redis.eval(SLIDING_WINDOW_SCRIPT, len(keys), *keys, *args))
+
+
+def _cache_hit(limits, now_ms):
+    with _fallback_lock:
+        histories = []
+        wait = 0
+        for key, limit, window_ms in limits:
+            history = [stamp for stamp in cache.get(key, []) if stamp > now_ms - window_ms]
+            histories.append(history)
+            if len(history) >= limit:
+                wait = max(wait, history[0] + window_ms - now_ms if history else window_ms, 1)
+        if wait:
+            return wait
+        for (key, _, window_ms), history in zip(limits, histories):
+            cache.set(key, history + [now_ms], window_ms // 1000)
+        return 0
+
+
+def hit_all(limits):
+    """
+    Checks a request against several (key, limit, window seconds) limits and
+    records it in all of them only if every limit admits it, so rejected
+    requests do not use up the other windows. Returns 0 if the request is
+    allowed, otherwise the seconds until all limits have a free slot.
+    """
+    now_ms = int(time.time() * 1000)
+    limits = [(key, limit, window * 1000) for key, limit, window in limits]
+    redis = get_redis_connection()
+    if redis is not None:
+        try:
+            return _redis_hit(redis, limits, now_ms) / 1000
+        except RedisError as e:
+            logger.warning(f"Rate limiter unavailable, using the cache: {e}")
+    try:
+        return _cache_hit(limits, now_ms) / 1000
+    except RedisError as e:
+        # The cache lives in the same Redis; rather admit than fail the auth endpoints
+        logger.error(f"Rate limiter cache unavailable, request not limited: {e}")
+        return 0
+
+
+def hit(key, limit, window):
+    """
+    Records one request for the key if it is within the limit. Returns 0 if
+    the request is allowed, otherwise the seconds until a slot frees up.
+    """
+    return hit_all([(key, limit, window)])
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """
+    Base class: subclasses define `kind` and the identifier of the caller
+    """
+    kind = None
+
+    def get_identifier(self, request):
+        raise NotImplementedError
+
+    def get_limits(self, request, view):
+        """
+        Returns the (key, limit, window) limits that apply to the request
+        """
+        scope = getattr(view, 'throttle_scope', None)
+        rate = settings.THROTTLE_RATES.get(f'{scope}_{self.kind}') if scope else None
+        if not rate:
+            return []
+        identifier = self.get_identifier(request)
+        if identifier is None:
+            return []
+        limit, window = parse_rate(rate)
+        return [(f'throttle:{scope}:{self.kind}:{identifier}', limit, window)]
+
+    def allow_request(self, request, view):
+        self.retry_after = None
+        if not settings.THROTTLE_ENABLED:
+            return True
+        limits = self.get_limits(request, view)
+        if not limits:
+            return True
+
+        wait = hit_all(limits)
+        if wait > 0:
+            self.retry_after = wait
+            return False
+        return True
+
+    def wait(self):
+        return self.retry_after
+
+
+class IPSlidingWindowThrottle(SlidingWindowThrottle):
+    """Limits requests per client IP"""
+    kind = 'ip'
+
+    def get_identifier(self, request):
+        return self.get_ident(request)
+
+
+class EmailSlidingWindowThrottle(SlidingWindowThrottle):
+    """Limits requests per submitted e-mail address (hashed, so no addresses end up in Redis)"""
+    kind = 'email'
+
+    def get_identifier(self, request):
+        email = request.data.get('email') if hasattr(request.data, 'get') else None
+        if not isinstance(email, str) or not email.strip():
+            return None
+        return hashlib.sha256(email.strip().lower().encode()).hexdigest()[:32]
+
+
+class GlobalSlidingWindowThrottle(SlidingWindowThrottle):
+    """Limits the total request rate of the scope across all clients"""
+    kind = 'global'
+
+    def get_identifier(self, request):
+        return 'all'
+
+
+class AuthSlidingWindowThrottle(SlidingWindowThrottle):
+    """
+    Applies the per-IP, per-e-mail and global limits as one check. DRF runs
+    every throttle class even after a rejection, so separate classes would
+    let a blocked IP fill the e-mail and global windows for everyone else.
+    """
+    throttle_classes = (IPSlidingWindowThrottle, EmailSlidingWindowThrottle, GlobalSlidingWindowThrottle)
+
+    def get_limits(self, request, view):
+        return [limit for throttle_class in self.throttle_classes for limit in throttle_class().get_limits(request, view)]
+
+
+AUTH_THROTTLE_CLASSES = [AuthSlidingWindowThrottle]
+
+
+class _ThrottleRequest:
+    def __init__(self, request, data):
+        self.META = request.META
+        self.data = data
+
+
+def get_throttle_wait(request, data, scope, throttle_classes=None):
+    """
+    Applies the throttles to a plain Django view (e.g. the async auth views).
+    Returns None if the request is allowed, otherwise the seconds to wait.
+    """
+    throttle_request = _ThrottleRequest(request, data)
+    view = SimpleNamespace(throttle_scope=scope)
+    waits = []
+    for throttle_class in throttle_classes or AUTH_THROTTLE_CLASSES:
+        throttle = throttle_class()
+        if not throttle.allow_request(throttle_request, view):
+            waits.append(throttle.wait())
+    return max(waits) if waits else None
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Video
+from .models import Video, VideoViewRollup
 
 @admin.register(Video)
 class VideoAdmin(admin.ModelAdmin):
@@ -29,6 +29,16 @@ class VideoAdmin(admin.ModelAdmin):
     
     
     
+    def get_search_results(self, request, queryset, search_term):
+        """Nutzt den Volltext-Index statt icontains-Scans"""
+        if not search_term:
+            return super().get_search_results(request, queryset, search_term)
+        
+        from .search import search_video_ids
+        
+        ids = search_video_ids(search_term, active_only=False)
+        return queryset.filter(pk__in=ids), False
+    
     def delete_selected_videos(self, request, queryset):
         """Löscht ausgewählte Videos und leert den Cache"""
         from django.core.cache import cache
@@ -47,8 +57,16 @@ class VideoAdmin(admin.ModelAdmin):
         from django.core.cache import cache
         
         cache.delete('video_list_public')
+        cache.delete('video_home_document')
         self.message_user(request, "Video-Cache wurde geleert.")
     
     clear_video_cache.short_description = "Video-Cache leeren"
 
 
+@admin.register(VideoViewRollup)
+class VideoViewRollupAdmin(admin.ModelAdmin):
+    list_display = ['video', 'bucket_start', 'views', 'unique_viewers']
+    list_filter = ['bucket_start']
+    list_select_related = ['video']
+    ordering = ['-bucket_start']
+    readonly_fields = ['video', 'bucket_start', 'views', 'unique_viewers']
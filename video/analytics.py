@@ -0,0 +1,204 @@
+"""
+View counting and trending
+
+Every manifest fetch increments a Redis counter and adds the viewer to a
+HyperLogLog, both per video and time bucket. flush_view_counts copies the
+bucket totals into VideoViewRollup; the trending list is computed from the
+buckets with an exponential time decay and cached.
+"""
+import hashlib
+import logging
+import math
+import time
+from datetime import datetime, timezone as dt_timezone
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from redis.exceptions import RedisError
+from core.instrumentation import cache_get
+from core.redis_client import get_redis_connection
+from .models import Video, VideoViewRollup
+
+logger = logging.getLogger(__name__)
+
+BUCKETS_KEY = 'video_views:buckets'
+BUCKET_VIDEOS_KEY = 'video_views:{bucket}:videos'
+VIEWS_KEY = 'video_views:{bucket}:{video_id}'
+UNIQUES_KEY = 'video_uniques:{bucket}:{video_id}'
+TRENDING_CACHE_KEY = 'video_trending'
+
+
+def current_bucket(now=None):
+    """
+    Returns the start of the current time bucket as a unix timestamp
+    """
+    now = time.time() if now is None else now
+    size = settings.VIDEO_VIEW_BUCKET_SECONDS
+    return int(now // size * size)
+
+
+def get_viewer_key(request):
+    """
+    Identifies the viewer for unique counting: the user id or a hash of IP and user agent
+    """
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return f"user:{user.id}"
+    fingerprint = f"{request.META.get('REMOTE_ADDR', '')}|{request.META.get('HTTP_USER_AGENT', '')}"
+    return f"anon:{hashlib.sha1(fingerprint.encode()).hexdigest()}"
+
+
+def record_view(video_id, viewer_key):
+    """
+    Counts a playback start in the current bucket with a single Redis round trip
+    """
+    redis = get_redis_connection()
+    bucket = current_bucket()
+    if redis is None:
+        _record_view_in_database(video_id, bucket)
+        return
+
+    ttl = settings.VIDEO_VIEW_RETENTION_SECONDS + settings.VIDEO_VIEW_BUCKET_SECONDS
+    views_key = VIEWS_KEY.format(bucket=bucket, video_id=video_id)
+    uniques_key = UNIQUES_KEY.format(bucket=bucket, video_id=video_id)
+    videos_key = BUCKET_VIDEOS_KEY.format(bucket=bucket)
+    try:
+        pipe = redis.pipeline(transaction=False)
+        pipe.incr(views_key)
+        pipe.pfadd(uniques_key, viewer_key)
+        pipe.sadd(videos_key, video_id)
+        pipe.zadd(BUCKETS_KEY, {bucket: bucket})
+        for key in (views_key, uniques_key, videos_key):
+            pipe.expire(key, ttl)
+        pipe.execute()
+    except RedisError as e:
+        logger.warning(f"View counter unavailable: {e}")
+
+
+def _record_view_in_database(video_id, bucket):
+    """
+    Development fallback without Redis: counts views directly in the rollup table
+    """
+    bucket_start = datetime.fromtimestamp(bucket, tz=dt_timezone.utc)
+    rollup, created = VideoViewRollup.objects.get_or_create(
+        video_id=video_id, bucket_start=bucket_start, defaults={'views': 1, 'unique_viewers': 1}
+    )
+    if not created:
+        VideoViewRollup.objects.filter(pk=rollup.pk).update(views=F('views') + 1)
+
+
+def _read_buckets(redis, buckets):
+    """
+    Returns {(bucket, video_id): (views, unique_viewers)} for the given buckets
+    """
+    pipe = redis.pipeline(transaction=False)
+    for bucket in buckets:
+        pipe.smembers(BUCKET_VIDEOS_KEY.format(bucket=bucket))
+    members = pipe.execute()
+
+    keys = [(bucket, int(video_id)) for bucket, video_ids in zip(buckets, members) for video_id in video_ids]
+    pipe = redis.pipeline(transaction=False)
+    for bucket, video_id in keys:
+        pipe.get(VIEWS_KEY.format(bucket=bucket, video_id=video_id))
+        pipe.pfcount(UNIQUES_KEY.format(bucket=bucket, video_id=video_id))
+    values = pipe.execute()
+
+    return {
+        key: (int(values[index * 2] or 0), int(values[index * 2 + 1] or 0))
+        for index, key in enumerate(keys)
+    }
+
+
+def flush_view_counts():
+    """
+    Upserts the Redis bucket totals into VideoViewRollup. Totals are absolute,
+    so repeated flushes of the open bucket are idempotent. Returns the number of rows.
+    """
+    redis = get_redis_connection()
+    if redis is None:
+        return 0
+
+    buckets = [int(float(bucket)) for bucket in redis.zrange(BUCKETS_KEY, 0, -1)]
+    if not buckets:
+        return 0
+
+    counts = _read_buckets(redis, buckets)
+    existing_videos = set(Video.objects.filter(
+        id__in={video_id for _, video_id in counts}
+    ).values_list('id', flat=True))
+    rows = [
+        VideoViewRollup(
+            video_id=video_id,
+            bucket_start=datetime.fromtimestamp(bucket, tz=dt_timezone.utc),
+            views=views,
+            unique_viewers=uniques,
+        )
+        for (bucket, video_id), (views, uniques) in counts.items()
+        if video_id in existing_videos
+    ]
+    VideoViewRollup.objects.bulk_create(
+        rows,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['video', 'bucket_start'],
+        update_fields=['views', 'unique_viewers'],
+    )
+
+    expired_before = current_bucket() - settings.VIDEO_VIEW_RETENTION_SECONDS
+    redis.zremrangebyscore(BUCKETS_KEY, '-inf', f'({expired_before}')
+    return len(rows)
+
+
+def _bucket_views_in_window(now):
+    """
+    Returns {(bucket, video_id): views} for the trending window, from Redis
+    if available, otherwise from the rollup table
+    """
+    window_start = now - settings.TRENDING_WINDOW_HOURS * 3600
+    redis = get_redis_connection()
+    if redis is not None:
+        try:
+            buckets = [int(float(bucket)) for bucket in redis.zrangebyscore(BUCKETS_KEY, window_start, '+inf')]
+            return {key: views for key, (views, _) in _read_buckets(redis, buckets).items()}
+        except RedisError as e:
+            logger.warning(f"View buckets unavailable, using rollups: {e}")
+
+    rollups = VideoViewRollup.objects.filter(
+        bucket_start__gte=datetime.fromtimestamp(window_start, tz=dt_timezone.utc)
+    ).values_list('bucket_start', 'video_id', 'views')
+    return {(int(bucket_start.timestamp()), video_id): views for bucket_start, video_id, views in rollups}
+
+
+def compute_trending_scores(now=None):
+    """
+    Sums the views per video, halving their weight every TRENDING_HALF_LIFE_HOURS
+    """
+    now = time.time() if now is None else now
+    half_life = settings.TRENDING_HALF_LIFE_HOURS * 3600
+    bucket_middle = settings.VIDEO_VIEW_BUCKET_SECONDS / 2
+
+    scores = {}
+    for (bucket, video_id), views in _bucket_views_in_window(now).items():
+        age = max(now - (bucket + bucket_middle), 0)
+        scores[video_id] = scores.get(video_id, 0.0) + views * math.pow(0.5, age / half_life)
+    return scores
+
+
+def get_trending_videos():
+    """
+    Returns the serialized trending list, cached for TRENDING_CACHE_TIMEOUT seconds
+    """
+    trending = cache_get(TRENDING_CACHE_KEY)
+    if trending is not None:
+        return trending
+
+    from .api.serializers import VideoSerializer
+
+    scores = compute_trending_scores()
+    ranked_ids = sorted(scores, key=scores.get, reverse=True)
+    videos = Video.objects.filter(is_active=True).in_bulk(ranked_ids[:settings.TRENDING_LIMIT * 2])
+    ranked = [videos[video_id] for video_id in ranked_ids if video_id in videos][:settings.TRENDING_LIMIT]
+
+    trending = list(VideoSerializer(ranked, many=True).data)
+    cache.set(TRENDING_CACHE_KEY, trending, settings.TRENDING_CACHE_TIMEOUT)
+    return trending
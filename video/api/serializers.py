@@ -79,3 +79,19 @@ class VideoSerializer(serializers.ModelSerializer):
         
         thumbnail_file = category_thumbnails.get(category, 'default.svg')
         return f"{base_url}/static/images/default_thumbnails/{thumbnail_file}"
+
+
+class WatchProgressSerializer(serializers.Serializer):
+    """
+    Player heartbeat with the current playback position in seconds
+    """
+    position = serializers.IntegerField(min_value=0)
+
+
+class ContinueWatchingSerializer(serializers.Serializer):
+    """
+    A partially watched video together with the resume position
+    """
+    video = VideoSerializer()
+    position = serializers.IntegerField()
+    updated_at = serializers.DateTimeField()
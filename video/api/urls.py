@@ -3,6 +3,11 @@ from . import views
 
 urlpatterns = [
     path('', views.VideoListView.as_view(), name='video_list'),
+    path('home/', views.VideoHomeView.as_view(), name='video_home'),
+    path('search/', views.VideoSearchView.as_view(), name='video_search'),
+    path('trending/', views.TrendingVideoView.as_view(), name='video_trending'),
+    path('continue-watching/', views.ContinueWatchingView.as_view(), name='continue_watching'),
+    path('<int:video_id>/progress/', views.WatchProgressView.as_view(), name='watch_progress'),
     path('<int:movie_id>/<str:resolution>/index.m3u8', views.HLSManifestView.as_view(), name='hls_manifest'),
     path('<int:movie_id>/<str:resolution>/<str:segment>', views.HLSVideoSegmentView.as_view(), name='hls_segment'),
     path('<int:video_id>/direct/', views.DirectVideoView.as_view(), name='direct_video'),
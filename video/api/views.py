@@ -1,52 +1,117 @@
+import logging
 from rest_framework import generics, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
-from .serializers import VideoSerializer
+from django.conf import settings
+from auth_app.api.authentication import CustomJWTAuthentication, StatelessJWTAuthentication
+from .serializers import VideoSerializer, WatchProgressSerializer, ContinueWatchingSerializer
 from ..models import Video
+from ..search import search_videos
+from ..progress import record_progress, get_continue_watching
+from ..analytics import record_view, get_viewer_key, get_trending_videos
 from ..utils import (
-    get_video_list, create_hls_manifest_content, create_external_video_manifest,
     create_empty_manifest, get_hls_segment_path, validate_hls_directory,
     validate_segment_file, create_segment_response, get_active_video,
     create_direct_video_response, create_redirect_response,
     create_video_not_found_response, create_video_error_response,
-    create_segment_error_response
+    create_segment_error_response, get_home_document, get_cached_catalog,
+    get_manifest_variants
 )
 
+logger = logging.getLogger(__name__)
+
+
 class VideoListView(generics.ListAPIView):
     """
     Returns a list of all available videos
     """
     queryset = Video.objects.all().order_by('-created_at')
     serializer_class = VideoSerializer
+    compress_response = True
     permission_classes = [AllowAny] 
 
     def get(self, request, *args, **kwargs):
         try:
-            videos = get_video_list()
-            serializer = VideoSerializer(videos, many=True, context={'request': request})
-            return Response(serializer.data)
+            catalog = get_cached_catalog()
+            response = Response(catalog['data'])
+            response.precompressed = catalog['variants']
+            return response
+        except Exception as e:
+            return Response([], status=200)
+
+
+class VideoHomeView(APIView):
+    """
+    Returns the newest videos grouped by category for the home screen
+    """
+    compress_response = True
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        try:
+            return Response(get_home_document())
+        except Exception as e:
+            return Response([], status=200)
+
+
+class TrendingVideoView(APIView):
+    """
+    Videos ranked by time-decayed view counts
+    """
+    compress_response = True
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        try:
+            return Response(get_trending_videos())
         except Exception as e:
             return Response([], status=200)
 
 
+class VideoSearchView(APIView):
+    """
+    Full-text search over video titles and descriptions, best match first
+    """
+    compress_response = True
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response([])
+        
+        try:
+            limit = min(int(request.query_params.get('limit', 20)), settings.VIDEO_SEARCH_MAX_RESULTS)
+        except ValueError:
+            return Response({'error': 'Invalid limit.'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        videos = search_videos(query, limit=max(limit, 1))
+        serializer = VideoSerializer(videos, many=True, context={'request': request})
+        return Response(serializer.data)
+
+
 class HLSManifestView(generics.GenericAPIView):
     """
     HLS manifest for a specific movie and selected resolution
     """
+    compress_response = True
     permission_classes = [AllowAny]
     
     def get(self, request, movie_id, resolution):
         try:
             video = get_object_or_404(Video, id=movie_id)
+            record_view(video.id, get_viewer_key(request))
             
-            manifest_content = create_hls_manifest_content(movie_id, resolution)
-            return HttpResponse(manifest_content, content_type='application/vnd.apple.mpegurl')
+            variants = get_manifest_variants(video, resolution)
+            response = HttpResponse(variants['identity'], content_type='application/vnd.apple.mpegurl')
+            response.precompressed = variants
+            return response
                 
-        except Exception as e:
-            print(f"HLS Manifest Error: {e}")
+        except Exception:
+            logger.exception('HLS manifest error for video %s (%s)', movie_id, resolution)
             manifest_content = create_empty_manifest()
             return HttpResponse(manifest_content, content_type='application/vnd.apple.mpegurl')
 
@@ -98,3 +163,32 @@ class DirectVideoView(APIView):
                 
         except Exception as e:
             return create_video_error_response(str(e))
+
+
+class WatchProgressView(APIView):
+    """
+    Player heartbeat: stores the playback position in the write-behind buffer
+    """
+    authentication_classes = [CustomJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request, video_id):
+        serializer = WatchProgressSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        video = get_active_video(video_id)
+        
+        record_progress(request.user.id, video.id, serializer.validated_data['position'])
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ContinueWatchingView(APIView):
+    """
+    Unfinished videos of the current user with their resume positions
+    """
+    authentication_classes = [StatelessJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        items = get_continue_watching(request.user.id)
+        serializer = ContinueWatchingSerializer(items, many=True, context={'request': request})
+        return Response(serializer.data)
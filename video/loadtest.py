@@ -0,0 +1,196 @@
+"""
+HTTP load generator for the streaming API
+
+Simulates viewer sessions against a running server: login, catalog fetch,
+manifest fetch, segment pulls at (accelerated) playback rate and a seek
+through the direct video endpoint. Synthetic fixture videos with small HLS
+segments are written to MEDIA_ROOT, so the test needs neither ffmpeg nor
+network access beyond the server itself.
+"""
+import json
+import random
+import shutil
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import CookieJar
+from pathlib import Path
+from urllib.error import HTTPError, URLError
+from urllib.request import HTTPCookieProcessor, Request, build_opener
+from django.conf import settings
+from django.core.cache import cache
+from auth_app.models import CustomUser
+from core.benchmarking import summarize
+from .models import Video
+from .utils import CATALOG_CACHE_KEY, HOME_DOCUMENT_CACHE_KEY
+
+FIXTURE_TITLE_PREFIX = '[loadtest]'
+FIXTURE_EMAIL = 'loadtest@videoflix.local'
+FIXTURE_PASSWORD = 'loadtest-password'
+FIXTURE_RESOLUTION = '720p'
+SEGMENT_SECONDS = 10
+TS_PACKET = b'\x47' + b'\xff' * 187
+
+
+def create_fixtures(videos=5, segments=30, segment_kb=256):
+    """
+    Creates an active load test user and `videos` active videos, each with an
+    HLS playlist of `segments` synthetic segments and a direct video file.
+    bulk_create skips the post_save signals, so no ffmpeg run is triggered.
+    """
+    delete_fixtures()
+    user = CustomUser.objects.create_user(
+        email=FIXTURE_EMAIL, password=FIXTURE_PASSWORD, username='loadtest', is_active=True
+    )
+
+    media_root = Path(settings.MEDIA_ROOT)
+    (media_root / 'videos').mkdir(parents=True, exist_ok=True)
+    created = Video.objects.bulk_create(
+        Video(title=f'{FIXTURE_TITLE_PREFIX} Video {index}', description='Synthetic load test video',
+              category='documentary', is_active=True)
+        for index in range(videos)
+    )
+    if any(video.pk is None for video in created):
+        created = list(Video.objects.filter(title__startswith=FIXTURE_TITLE_PREFIX).order_by('id'))
+
+    segment = TS_PACKET * max(segment_kb * 1024 // len(TS_PACKET), 1)
+    for video in created:
+        hls_dir = media_root / 'hls' / str(video.id) / FIXTURE_RESOLUTION
+        hls_dir.mkdir(parents=True, exist_ok=True)
+        playlist = ['#EXTM3U', '#EXT-X-VERSION:3', f'#EXT-X-TARGETDURATION:{SEGMENT_SECONDS}',
+                    '#EXT-X-MEDIA-SEQUENCE:0', '#EXT-X-PLAYLIST-TYPE:VOD']
+        for index in range(segments):
+            name = f'segment_{index:03d}.ts'
+            (hls_dir / name).write_bytes(segment)
+            playlist += [f'#EXTINF:{SEGMENT_SECONDS}.0,', name]
+        playlist.append('#EXT-X-ENDLIST')
+        (hls_dir / 'playlist.m3u8').write_text('\n'.join(playlist) + '\n')
+
+        video_name = f'videos/loadtest_{video.id}.mp4'
+        (media_root / video_name).write_bytes(segment * 4)
+        video.video_file.name = video_name
+
+    Video.objects.bulk_update(created, ['video_file'])
+    cache.delete_many([CATALOG_CACHE_KEY, HOME_DOCUMENT_CACHE_KEY])
+    return user, created
+
+
+def delete_fixtures():
+    """
+    Removes the load test user, the fixture videos and their files
+    """
+    media_root = Path(settings.MEDIA_ROOT)
+    videos = list(Video.objects.filter(title__startswith=FIXTURE_TITLE_PREFIX))
+    for video in videos:
+        shutil.rmtree(media_root / 'hls' / str(video.id), ignore_errors=True)
+        if video.video_file:
+            (media_root / video.video_file.name).unlink(missing_ok=True)
+    Video.objects.filter(id__in=[video.id for video in videos]).delete()
+    CustomUser.objects.filter(email=FIXTURE_EMAIL).delete()
+
+
+class LoadTestResults:
+    """
+    Thread-safe collection of latencies and errors per endpoint
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def record(self, endpoint, duration, status):
+        with self.lock:
+            self.samples[endpoint].append(duration)
+            self.statuses[endpoint][status] += 1
+            if not 200 <= status < 400:
+                self.errors[endpoint] += 1
+
+    def report(self, elapsed):
+        """
+        Returns one row per endpoint: latency summary, throughput and error rate
+        """
+        rows = {}
+        for endpoint, samples in self.samples.items():
+            rows[endpoint] = {
+                **summarize(samples),
+                'throughput_rps': len(samples) / elapsed if elapsed else 0.0,
+                'errors': self.errors[endpoint],
+                'error_rate': self.errors[endpoint] / len(samples),
+                'statuses': dict(self.statuses[endpoint]),
+            }
+        return rows
+
+
+class ViewerSession:
+    """
+    One simulated viewer with its own cookie jar
+    """
+
+    def __init__(self, base_url, results, segments, speed, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.results = results
+        self.segments = segments
+        self.speed = speed
+        self.timeout = timeout
+        self.opener = build_opener(HTTPCookieProcessor(CookieJar()))
+
+    def request(self, endpoint, path, data=None, headers=None):
+        """
+        Performs a request, records it under `endpoint` and returns the body
+        (None on errors)
+        """
+        body = json.dumps(data).encode() if data is not None else None
+        request = Request(self.base_url + path, data=body, headers=headers or {})
+        if body is not None:
+            request.add_header('Content-Type', 'application/json')
+
+        started = time.perf_counter()
+        try:
+            with self.opener.open(request, timeout=self.timeout) as response:
+                content = response.read()
+                status = response.status
+        except HTTPError as e:
+            content, status = None, e.code
+        except (URLError, OSError):
+            content, status = None, 0
+        self.results.record(endpoint, time.perf_counter() - started, status)
+        return content if 200 <= status < 400 else None
+
+    def run(self, video_ids):
+        self.request('login', '/api/login/', {'email': FIXTURE_EMAIL, 'password': FIXTURE_PASSWORD})
+        self.request('catalog', '/api/video/')
+
+        video_id = random.choice(video_ids)
+        manifest = self.request('manifest', f'/api/video/{video_id}/{FIXTURE_RESOLUTION}/index.m3u8')
+        segment_names = [
+            line.rsplit('/', 1)[-1] for line in (manifest or b'').decode().splitlines() if line.endswith('.ts')
+        ]
+
+        interval = SEGMENT_SECONDS / self.speed
+        for name in segment_names[:self.segments]:
+            started = time.monotonic()
+            self.request('segment', f'/api/video/{video_id}/{FIXTURE_RESOLUTION}/{name}')
+            time.sleep(max(interval - (time.monotonic() - started), 0))
+
+        self.request('seek', f'/api/video/{video_id}/direct/', headers={'Range': 'bytes=1024-'})
+
+
+def run_load_test(base_url, video_ids, sessions=20, concurrency=5, segments=6, speed=10.0):
+    """
+    Runs `sessions` viewer sessions with up to `concurrency` in parallel.
+    Returns the per-endpoint report and the elapsed wall time in seconds.
+    """
+    results = LoadTestResults()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [
+            executor.submit(ViewerSession(base_url, results, segments, speed).run, video_ids)
+            for _ in range(sessions)
+        ]
+        for future in futures:
+            future.result()
+    elapsed = time.perf_counter() - started
+    return results.report(elapsed), elapsed
@@ -0,0 +1,81 @@
+import random
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from core.benchmarking import format_summary, stopwatch, summarize
+from core.compression import available_encodings, compress, precompress
+from core.renderers import FastJSONRenderer, orjson
+from rest_framework.renderers import JSONRenderer
+from video.api.serializers import VideoSerializer
+from video.models import Video
+
+
+class Command(BaseCommand):
+    help = 'Measures payload sizes and render/compression latency for the catalog and HLS manifests'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--videos', type=int, default=1000, help='Videos in the synthetic catalog')
+        parser.add_argument('--segments', type=int, default=1000, help='Segments in the synthetic manifest')
+        parser.add_argument('--iterations', type=int, default=50)
+
+    def handle(self, *args, **options):
+        catalog = self._catalog(options['videos'])
+        manifest = self._manifest(options['segments']).encode()
+        iterations = options['iterations']
+
+        self.stdout.write(f"Encodings available: {', '.join(available_encodings())}")
+        self._render(catalog, iterations)
+        for name, body in (('catalog', JSONRenderer().render(catalog)), ('manifest', manifest)):
+            self._compress(name, body, iterations)
+
+    def _catalog(self, count):
+        rng = random.Random(1)
+        categories = [value for value, _ in Video.CATEGORY_CHOICES]
+        videos = [
+            Video(
+                id=index + 1,
+                title=f'Synthetic Video {index}',
+                description=' '.join(rng.choices(['lorem', 'ipsum', 'dolor', 'sit', 'amet', 'video'], k=30)),
+                category=rng.choice(categories),
+                created_at=timezone.now(),
+            )
+            for index in range(count)
+        ]
+        return list(VideoSerializer(videos, many=True).data)
+
+    def _manifest(self, segments):
+        base_url = f'{settings.SITE_URL}/api/video/1/720p/'
+        lines = ['#EXTM3U', '#EXT-X-VERSION:3', '#EXT-X-TARGETDURATION:10', '#EXT-X-MEDIA-SEQUENCE:0', '#EXT-X-PLAYLIST-TYPE:VOD']
+        for index in range(segments):
+            lines += ['#EXTINF:10.000000,', f'{base_url}segment_{index:03d}.ts']
+        lines.append('#EXT-X-ENDLIST')
+        return '\n'.join(lines)
+
+    def _render(self, data, iterations):
+        renderers = [('render json (stdlib)', JSONRenderer())]
+        if orjson is not None:
+            renderers.append(('render json (orjson)', FastJSONRenderer()))
+        for name, renderer in renderers:
+            samples = []
+            for _ in range(iterations):
+                with stopwatch(samples):
+                    renderer.render(data)
+            self.stdout.write(format_summary(name, summarize(samples)))
+
+    def _compress(self, name, body, iterations):
+        self.stdout.write(f'{name}: identity {len(body)} bytes')
+        for encoding in available_encodings():
+            samples = []
+            for _ in range(iterations):
+                with stopwatch(samples):
+                    compressed = compress(body, encoding)
+            saving = 100 - len(compressed) / len(body) * 100
+            self.stdout.write(f'  {encoding}: {len(compressed)} bytes ({saving:.1f}% smaller)')
+            self.stdout.write('  ' + format_summary(f'{name} {encoding} on the fly', summarize(samples)))
+
+        variants = precompress(body)
+        samples = []
+        for _ in range(iterations):
+            with stopwatch(samples):
+                variants.get(available_encodings()[0])
+        self.stdout.write('  ' + format_summary(f'{name} precompressed lookup', summarize(samples)))
@@ -0,0 +1,63 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from core.benchmarking import format_summary, stopwatch, summarize
+
+FAST_HASHER = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures connection setup overhead and endpoint latency for the current DATABASES settings; '
+        'run it with DB_POOL=False and DB_POOL=True to compare'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--connections', type=int, default=200, help='Connection open/close cycles')
+        parser.add_argument('--requests', type=int, default=500, help='Requests per endpoint')
+        parser.add_argument('--threads', type=int, default=8)
+
+    def handle(self, *args, **options):
+        db = settings.DATABASES['default']
+        mode = 'pool' if db.get('OPTIONS', {}).get('pool') else f"CONN_MAX_AGE={db.get('CONN_MAX_AGE', 0)}"
+        self.stdout.write(f"{connection.vendor}, {mode}")
+
+        samples = []
+        for _ in range(options['connections']):
+            connection.close()
+            with stopwatch(samples):
+                connection.ensure_connection()
+        connection.close()
+        self.stdout.write(format_summary('connection setup', summarize(samples)))
+
+        logging.getLogger('django.request').setLevel(logging.ERROR)
+        with override_settings(ALLOWED_HOSTS=['*'], PASSWORD_HASHERS=FAST_HASHER, THROTTLE_ENABLED=False):
+            self._endpoint('GET video list', options, lambda client: client.get(reverse('video_list')))
+            self._endpoint('POST login', options, lambda client: client.post(
+                reverse('login'), {'email': 'nobody@example.com', 'password': 'wrong'}, content_type='application/json'
+            ))
+
+    def _endpoint(self, name, options, send):
+        local = threading.local()
+        samples = []
+        lock = threading.Lock()
+
+        def request(_):
+            client = getattr(local, 'client', None)
+            if client is None:
+                client = local.client = Client()
+            duration = []
+            with stopwatch(duration):
+                send(client)
+            with lock:
+                samples.extend(duration)
+
+        with ThreadPoolExecutor(max_workers=options['threads']) as executor:
+            list(executor.map(request, range(options['requests'])))
+        self.stdout.write(format_summary(name, summarize(samples)))
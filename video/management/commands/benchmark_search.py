@@ -0,0 +1,86 @@
+import random
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from core.benchmarking import format_summary, stopwatch, summarize
+from video.models import Video
+from video.search import rebuild_search_index, search_video_ids
+
+WORDS = [
+    'adventure', 'alien', 'battle', 'brother', 'castle', 'chase', 'city', 'comet', 'dragon', 'dream',
+    'empire', 'escape', 'family', 'forest', 'friend', 'galaxy', 'ghost', 'harbor', 'hunter', 'island',
+    'journey', 'kingdom', 'legend', 'machine', 'midnight', 'mountain', 'mystery', 'night', 'ocean', 'planet',
+    'prison', 'queen', 'rebel', 'river', 'robot', 'secret', 'shadow', 'soldier', 'storm', 'summer',
+    'thunder', 'treasure', 'valley', 'village', 'voyage', 'warrior', 'winter', 'witness', 'wizard', 'zombie',
+]
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the full-text video search against icontains scans on synthetic videos (rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--videos', type=int, default=100_000, help='Number of synthetic videos')
+        parser.add_argument('--queries', type=int, default=200, help='Queries per scenario')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        try:
+            with transaction.atomic():
+                self._create_videos(rng, options['videos'])
+                self._run(rng, options['queries'])
+                raise _Rollback()
+        except _Rollback:
+            self.stdout.write('Synthetic videos rolled back.')
+
+    def _create_videos(self, rng, count):
+        self.stdout.write(f'Creating {count} synthetic videos...')
+        categories = [value for value, _ in Video.CATEGORY_CHOICES]
+        batch = []
+        for index in range(count):
+            batch.append(Video(
+                title=' '.join(rng.sample(WORDS, 3)).title(),
+                description=' '.join(rng.choices(WORDS, k=25)),
+                category=rng.choice(categories),
+            ))
+            if len(batch) == 5000:
+                Video.objects.bulk_create(batch)
+                batch = []
+        Video.objects.bulk_create(batch)
+
+        samples = []
+        with stopwatch(samples):
+            rebuild_search_index()
+        self.stdout.write(f'Index rebuilt in {samples[0]:.2f}s')
+
+    def _run(self, rng, queries):
+        scenarios = {
+            'exact': lambda: f'{rng.choice(WORDS)} {rng.choice(WORDS)}',
+            'prefix': lambda: rng.choice(WORDS)[:4],
+            'typo': lambda: self._misspell(rng, rng.choice(WORDS)),
+        }
+        for name, make_query in scenarios.items():
+            terms = [make_query() for _ in range(queries)]
+            indexed, scanned = [], []
+            for term in terms:
+                with stopwatch(indexed):
+                    search_video_ids(term, limit=20)
+            for term in terms[:max(queries // 10, 1)]:
+                with stopwatch(scanned):
+                    self._icontains(term)
+            self.stdout.write(format_summary(f'{name} (index)', summarize(indexed)))
+            self.stdout.write(format_summary(f'{name} (icontains)', summarize(scanned)))
+
+    def _misspell(self, rng, word):
+        position = rng.randrange(1, len(word))
+        return word[:position] + word[position + 1:]
+
+    def _icontains(self, term):
+        queryset = Video.objects.filter(is_active=True)
+        for word in term.split():
+            queryset = queryset.filter(Q(title__icontains=word) | Q(description__icontains=word))
+        return list(queryset.values_list('id', flat=True)[:20])
@@ -0,0 +1,97 @@
+import importlib.util
+import os
+import socket
+import subprocess
+import sys
+import time
+from urllib.error import URLError
+from urllib.request import urlopen
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from core.benchmarking import format_summary
+from video.loadtest import create_fixtures, delete_fixtures, run_load_test
+
+PROFILES = {
+    # the previous entrypoint: two sync workers
+    'legacy-sync': ['core.wsgi:application', '--worker-class', 'sync', '--workers', '2', '--timeout', '120'],
+    'gthread': ['-c', 'core/gunicorn_conf.py'],
+    'uvicorn': ['-c', 'core/gunicorn_conf.py'],
+}
+PROFILE_ENV = {
+    'gthread': {'GUNICORN_WORKER_CLASS': 'gthread'},
+    'uvicorn': {'GUNICORN_WORKER_CLASS': 'uvicorn'},
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class Command(BaseCommand):
+    help = 'Starts gunicorn with each serving profile and compares them under the same load test'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', nargs='+', default=list(PROFILES), choices=list(PROFILES))
+        parser.add_argument('--sessions', type=int, default=60)
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument('--segments', type=int, default=6)
+        parser.add_argument('--speed', type=float, default=20.0)
+
+    def handle(self, *args, **options):
+        _, videos = create_fixtures(videos=5, segments=options['segments'])
+        video_ids = [video.id for video in videos]
+        rows = {}
+        try:
+            for profile in options['profiles']:
+                if profile == 'uvicorn' and importlib.util.find_spec('uvicorn') is None:
+                    self.stderr.write('uvicorn is not installed, skipping the uvicorn profile')
+                    continue
+                rows[profile] = self._run(profile, video_ids, options)
+        finally:
+            delete_fixtures()
+
+        self.stdout.write('')
+        for profile, (report, elapsed) in rows.items():
+            total = sum(row['count'] for row in report.values())
+            errors = sum(row['errors'] for row in report.values())
+            segment = report.get('segment', {'count': 0, 'mean_ms': 0, 'p50_ms': 0, 'p95_ms': 0, 'p99_ms': 0})
+            self.stdout.write(
+                f"{format_summary(f'{profile} segments', segment)} "
+                f"total={total / elapsed:7.1f} req/s errors={errors / max(total, 1):.1%}"
+            )
+
+    def _run(self, profile, video_ids, options):
+        port = free_port()
+        env = {
+            **os.environ,
+            **PROFILE_ENV.get(profile, {}),
+            'THROTTLE_ENABLED': 'False',
+            'LOG_FILE': '',
+            'PERF_INSTRUMENTATION': 'False',
+        }
+        env.pop('PROMETHEUS_MULTIPROC_DIR', None)
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', *PROFILES[profile], '--bind', f'127.0.0.1:{port}'],
+            cwd=settings.BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        base_url = f'http://127.0.0.1:{port}'
+        try:
+            self._wait_until_ready(base_url)
+            self.stdout.write(f'{profile}: running load test on {base_url}')
+            return run_load_test(base_url, video_ids, options['sessions'], options['concurrency'],
+                                 options['segments'], options['speed'])
+        finally:
+            server.terminate()
+            server.wait(timeout=60)
+
+    def _wait_until_ready(self, base_url, timeout=60):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                with urlopen(f'{base_url}/api/video/', timeout=2):
+                    return
+            except (URLError, OSError):
+                time.sleep(0.5)
+        raise RuntimeError(f'Server at {base_url} did not start within {timeout}s')
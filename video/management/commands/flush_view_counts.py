@@ -0,0 +1,18 @@
+import time
+from django.core.management.base import BaseCommand
+from video.analytics import flush_view_counts
+
+
+class Command(BaseCommand):
+    help = 'Flushes bucketed view counters from Redis into the rollup table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=int, default=0, help='Repeat every N seconds (0 = run once)')
+
+    def handle(self, *args, **options):
+        while True:
+            flushed = flush_view_counts()
+            self.stdout.write(f'Flushed {flushed} view rollups.')
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,19 @@
+import time
+from django.core.management.base import BaseCommand
+from video.progress import flush_progress
+
+
+class Command(BaseCommand):
+    help = 'Flushes buffered watch progress from Redis into the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=int, default=0, help='Repeat every N seconds (0 = run once)')
+        parser.add_argument('--batch-size', type=int, default=None, help='Users per batch')
+
+    def handle(self, *args, **options):
+        while True:
+            flushed = flush_progress(options['batch_size'])
+            self.stdout.write(f'Flushed {flushed} watch progress entries.')
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from core.benchmarking import format_summary
+from video.loadtest import FIXTURE_TITLE_PREFIX, create_fixtures, delete_fixtures, run_load_test
+from video.models import Video
+
+ENDPOINTS = ('login', 'catalog', 'manifest', 'segment', 'seek')
+
+
+class Command(BaseCommand):
+    help = (
+        'Simulates viewer sessions (login, catalog, manifest, segments at playback rate, seek) '
+        'against a running server and reports latency, throughput and error rate per endpoint'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://localhost:8000')
+        parser.add_argument('--sessions', type=int, default=20)
+        parser.add_argument('--concurrency', type=int, default=5)
+        parser.add_argument('--segments', type=int, default=6, help='Segments pulled per session')
+        parser.add_argument('--speed', type=float, default=10.0,
+                            help='Playback speed-up: 1 pulls a 10s segment every 10s, 10 every second')
+        parser.add_argument('--videos', type=int, default=5, help='Number of synthetic fixture videos')
+        parser.add_argument('--segment-kb', type=int, default=256)
+        parser.add_argument('--keep-fixtures', action='store_true', help='Reuse existing fixtures and keep them')
+
+    def handle(self, *args, **options):
+        video_ids = list(Video.objects.filter(title__startswith=FIXTURE_TITLE_PREFIX).values_list('id', flat=True))
+        if not (options['keep_fixtures'] and video_ids):
+            _, videos = create_fixtures(options['videos'], max(options['segments'], 1), options['segment_kb'])
+            video_ids = [video.id for video in videos]
+
+        try:
+            report, elapsed = run_load_test(
+                options['base_url'], video_ids, options['sessions'], options['concurrency'],
+                options['segments'], options['speed'],
+            )
+        finally:
+            if not options['keep_fixtures']:
+                delete_fixtures()
+
+        total = sum(row['count'] for row in report.values())
+        self.stdout.write(f'{total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s)')
+        for endpoint in ENDPOINTS:
+            if endpoint not in report:
+                continue
+            row = report[endpoint]
+            self.stdout.write(
+                f"{format_summary(endpoint, row)} rps={row['throughput_rps']:7.1f} "
+                f"errors={row['error_rate']:.1%} statuses={row['statuses']}"
+            )
+        if report.get('login', {}).get('statuses', {}).get(429):
+            self.stderr.write('Logins were throttled; start the server with THROTTLE_ENABLED=False for load tests.')
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.5 on 2026-10-19 09:12
+
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+def create_search_indexes(apps, schema_editor):
+    """
+    Creates the database-native search indexes for the active backend
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS video_video_search_vector_gin "
+            "ON video_video USING gin (search_vector)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS video_video_title_trgm "
+            "ON video_video USING gin (title gin_trgm_ops)"
+        )
+        schema_editor.execute(
+            "UPDATE video_video SET search_vector = "
+            "setweight(to_tsvector(%s::regconfig, coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector(%s::regconfig, coalesce(description, '')), 'B')",
+            [settings.VIDEO_SEARCH_CONFIG, settings.VIDEO_SEARCH_CONFIG],
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS video_video_fts "
+            "USING fts5(title, description, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS video_video_fts_vocab "
+            "USING fts5vocab(video_video_fts, 'row')"
+        )
+        schema_editor.execute(
+            "INSERT INTO video_video_fts (rowid, title, description) "
+            "SELECT id, title, description FROM video_video"
+        )
+
+
+def drop_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS video_video_title_trgm")
+        schema_editor.execute("DROP INDEX IF EXISTS video_video_search_vector_gin")
+    elif vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS video_video_fts_vocab")
+        schema_editor.execute("DROP TABLE IF EXISTS video_video_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('video', '0003_alter_video_background_alter_video_poster_and_more'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='video',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-19 10:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('video', '0005_watchprogress'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VideoViewRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket_start', models.DateTimeField()),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('unique_viewers', models.PositiveIntegerField(default=0)),
+                ('video', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='view_rollups', to='video.video')),
+            ],
+            options={
+                'ordering': ['-bucket_start'],
+                'indexes': [models.Index(fields=['bucket_start'], name='view_rollup_bucket_start')],
+                'constraints': [models.UniqueConstraint(fields=('video', 'bucket_start'), name='unique_view_rollup_per_bucket')],
+            },
+        ),
+    ]
@@ -1,7 +1,14 @@
 from django.db import models
+from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
+from django.utils import timezone
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.core.cache import cache
+import logging
+
+logger = logging.getLogger(__name__)
+
 
 class Video(models.Model):
     """Video model for the Videoflix application"""
@@ -31,6 +38,7 @@ class Video(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
+    search_vector = SearchVectorField(null=True, editable=False)
     
     class Meta:
         ordering = ['-created_at']
@@ -67,6 +75,46 @@ class Video(models.Model):
         return None
 
 
+class WatchProgress(models.Model):
+    """Last playback position of a user in a video (flushed from the Redis buffer)"""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='watch_progress')
+    video = models.ForeignKey(Video, on_delete=models.CASCADE, related_name='watch_progress')
+    position = models.PositiveIntegerField(help_text='Playback position in seconds')
+    updated_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        ordering = ['-updated_at']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'video'], name='unique_watch_progress_per_user_video'),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-updated_at'], name='watch_progress_user_recent'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user_id} - {self.video_id} @ {self.position}s"
+
+
+class VideoViewRollup(models.Model):
+    """Views and approximate unique viewers of a video per time bucket (flushed from Redis)"""
+    video = models.ForeignKey(Video, on_delete=models.CASCADE, related_name='view_rollups')
+    bucket_start = models.DateTimeField()
+    views = models.PositiveIntegerField(default=0)
+    unique_viewers = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        ordering = ['-bucket_start']
+        constraints = [
+            models.UniqueConstraint(fields=['video', 'bucket_start'], name='unique_view_rollup_per_bucket'),
+        ]
+        indexes = [
+            models.Index(fields=['bucket_start'], name='view_rollup_bucket_start'),
+        ]
+    
+    def __str__(self):
+        return f"{self.video_id} @ {self.bucket_start}: {self.views} views"
+
+
 @receiver(post_save, sender=Video)
 def create_hls_segments_on_video_save(sender, instance, created, **kwargs):
     """
@@ -84,33 +132,33 @@ def create_hls_segments_on_video_save(sender, instance, created, **kwargs):
                 for resolution in resolutions:
                     result = create_hls_stream(video_path, instance.id, resolution)
                     if result.get('success'):
-                        print(f"HLS segments for video {instance.id} ({resolution}) created successfully")
+                        logger.info('HLS segments for video %s (%s) created', instance.id, resolution, extra={'video_id': instance.id, 'resolution': resolution})
                     else:
-                        print(f"Error creating HLS segments for video {instance.id} ({resolution}): {result.get('error')}")
+                        logger.error('Error creating HLS segments for video %s (%s): %s', instance.id, resolution, result.get('error'), extra={'video_id': instance.id, 'resolution': resolution})
                 
                 if created and (not instance.thumbnail and not instance.thumbnail_url):
                     thumbnail_result = extract_video_thumbnail(video_path, instance.id)
                     if thumbnail_result.get('success'):
                         instance.thumbnail = thumbnail_result['thumbnail_path']
                         instance.save(update_fields=['thumbnail'])
-                        print(f"Thumbnail for video {instance.id} created successfully: {thumbnail_result['thumbnail_path']}")
+                        logger.info('Thumbnail for video %s created: %s', instance.id, thumbnail_result['thumbnail_path'], extra={'video_id': instance.id})
                     else:
-                        print(f"Error creating thumbnail for video {instance.id}: {thumbnail_result.get('error')}")
+                        logger.error('Error creating thumbnail for video %s: %s', instance.id, thumbnail_result.get('error'), extra={'video_id': instance.id})
                 elif not created and (not instance.thumbnail and not instance.thumbnail_url):
                     thumbnail_result = extract_video_thumbnail(video_path, instance.id)
                     if thumbnail_result.get('success'):
                         instance.thumbnail = thumbnail_result['thumbnail_path']
                         instance.save(update_fields=['thumbnail'])
-                        print(f"Thumbnail for video {instance.id} created successfully: {thumbnail_result['thumbnail_path']}")
+                        logger.info('Thumbnail for video %s created: %s', instance.id, thumbnail_result['thumbnail_path'], extra={'video_id': instance.id})
                     else:
-                        print(f"Error creating thumbnail for video {instance.id}: {thumbnail_result.get('error')}")
+                        logger.error('Error creating thumbnail for video %s: %s', instance.id, thumbnail_result.get('error'), extra={'video_id': instance.id})
                 
                 cache.delete('video_list_public')
             else:
-                print(f"Video file not found: {video_path}")
+                logger.warning('Video file not found: %s', video_path, extra={'video_id': instance.id})
             
-        except Exception as e:
-            print(f"Error in signal handler for video {instance.id}: {str(e)}")
+        except Exception:
+            logger.exception('Error in signal handler for video %s', instance.id, extra={'video_id': instance.id})
 
 
 @receiver(post_delete, sender=Video)
@@ -120,6 +168,53 @@ def clear_cache_on_video_delete(sender, instance, **kwargs):
     """
     try:
         cache.delete('video_list_public')
-        print(f"Cache cleared after deletion of video {instance.id}")
-    except Exception as e:
-        print(f"Error clearing cache after video deletion: {str(e)}")
+        logger.info('Cache cleared after deletion of video %s', instance.id, extra={'video_id': instance.id})
+    except Exception:
+        logger.exception('Error clearing cache after video deletion')
+
+
+@receiver(post_save, sender=Video)
+@receiver(post_delete, sender=Video)
+def clear_catalog_cache_on_video_change(sender, instance, **kwargs):
+    """
+    Signal handler: Drops the cached video list (and its compressed variants) on every change
+    """
+    try:
+        cache.delete('video_list_public')
+    except Exception:
+        logger.exception('Error clearing video list cache for video %s', instance.id, extra={'video_id': instance.id})
+
+
+@receiver(post_save, sender=Video)
+@receiver(post_delete, sender=Video)
+def refresh_home_document_on_video_change(sender, instance, **kwargs):
+    """
+    Signal handler: Rebuilds the affected category rows of the cached home screen document
+    """
+    try:
+        from .utils import refresh_home_document
+        refresh_home_document(instance)
+    except Exception:
+        logger.exception('Error refreshing home document for video %s', instance.id, extra={'video_id': instance.id})
+
+
+@receiver(post_save, sender=Video)
+def update_search_index_on_video_save(sender, instance, update_fields=None, **kwargs):
+    """
+    Signal handler: Keeps the full-text search index in sync with title and description
+    """
+    from .search import SEARCH_INDEXED_FIELDS, update_search_index
+    
+    if update_fields is not None and not SEARCH_INDEXED_FIELDS.intersection(update_fields):
+        return
+    update_search_index(instance)
+
+
+@receiver(post_delete, sender=Video)
+def remove_search_index_on_video_delete(sender, instance, **kwargs):
+    """
+    Signal handler: Removes a deleted video from the search index
+    """
+    from .search import remove_from_search_index
+    
+    remove_from_search_index(instance.id)
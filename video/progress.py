@@ -0,0 +1,191 @@
+"""
+Watch progress with write-behind buffering
+
+Player heartbeats are written to one Redis hash per user
+(video_id -> "position:timestamp") and the user is marked dirty. The
+flush_watch_progress command bulk-upserts dirty hashes into WatchProgress
+and then removes the flushed fields that have not changed in the meantime.
+Without Redis (local memory cache) heartbeats are written directly.
+"""
+import logging
+from datetime import datetime, timezone as dt_timezone
+from django.conf import settings
+from django.utils import timezone
+from redis.exceptions import RedisError
+from core.redis_client import get_redis_connection
+from .models import Video, WatchProgress
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_KEY = 'watch_progress:{user_id}'
+DIRTY_KEY = 'watch_progress:dirty'
+
+# HDEL only fields whose value is still the flushed one (ARGV: field, value, field, value, ...)
+TRIM_FLUSHED_SCRIPT = """
+local removed = 0
+for i = 1, #ARGV, 2 do
+    if redis.call('HGET', KEYS[1], ARGV[i]) == ARGV[i + 1] then
+        removed = removed + redis.call('HDEL', KEYS[1], ARGV[i])
+    end
+end
+return removed
+"""
+
+
+def _progress_key(user_id):
+    return PROGRESS_KEY.format(user_id=user_id)
+
+
+def _decode(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _parse_entry(value):
+    """
+    Parses a buffered "position:timestamp" entry
+    """
+    position, timestamp = _decode(value).split(':', 1)
+    return int(position), datetime.fromtimestamp(float(timestamp), tz=dt_timezone.utc)
+
+
+def record_progress(user_id, video_id, position):
+    """
+    Records a heartbeat in the Redis buffer, or directly in the database
+    if no Redis is available
+    """
+    now = timezone.now()
+    redis = get_redis_connection()
+    if redis is not None:
+        try:
+            key = _progress_key(user_id)
+            pipe = redis.pipeline(transaction=False)
+            pipe.hset(key, video_id, f"{position}:{now.timestamp()}")
+            pipe.expire(key, settings.WATCH_PROGRESS_BUFFER_TTL)
+            pipe.sadd(DIRTY_KEY, user_id)
+            pipe.execute()
+            return
+        except RedisError as e:
+            logger.warning(f"Watch progress buffer unavailable, writing through: {e}")
+
+    WatchProgress.objects.update_or_create(
+        user_id=user_id, video_id=video_id,
+        defaults={'position': position, 'updated_at': now},
+    )
+
+
+def get_buffered_progress(user_id):
+    """
+    Returns {video_id: (position, updated_at)} from the Redis buffer
+    """
+    redis = get_redis_connection()
+    if redis is None:
+        return {}
+    try:
+        entries = redis.hgetall(_progress_key(user_id))
+    except RedisError:
+        return {}
+    return {int(_decode(video_id)): _parse_entry(value) for video_id, value in entries.items()}
+
+
+def flush_progress(batch_size=None):
+    """
+    Moves dirty users' buffered progress into the database with one bulk
+    upsert per batch. Returns the number of upserted rows.
+    """
+    redis = get_redis_connection()
+    if redis is None:
+        return 0
+
+    batch_size = batch_size or settings.WATCH_PROGRESS_FLUSH_BATCH_SIZE
+    total = 0
+    while True:
+        user_ids = [int(_decode(user_id)) for user_id in redis.spop(DIRTY_KEY, batch_size) or []]
+        if not user_ids:
+            break
+
+        pipe = redis.pipeline(transaction=False)
+        for user_id in user_ids:
+            pipe.hgetall(_progress_key(user_id))
+        buffers = pipe.execute()
+
+        try:
+            total += _upsert_progress(user_ids, buffers, batch_size)
+        except Exception:
+            redis.sadd(DIRTY_KEY, *user_ids)
+            raise
+        _trim_flushed(redis, user_ids, buffers)
+    return total
+
+
+def _trim_flushed(redis, user_ids, buffers):
+    """
+    Removes the flushed entries from the users' buffers, so later flushes only
+    carry new heartbeats. Entries updated since they were read stay buffered.
+    """
+    pipe = redis.pipeline(transaction=False)
+    for user_id, buffer in zip(user_ids, buffers):
+        if buffer:
+            args = [item for field_value in buffer.items() for item in field_value]
+            pipe.eval(TRIM_FLUSHED_SCRIPT, 1, _progress_key(user_id), *args)
+    pipe.execute()
+
+
+def _upsert_progress(user_ids, buffers, batch_size):
+    """
+    Bulk-upserts the buffered entries, skipping videos deleted in the meantime
+    """
+    entries = {}
+    for user_id, buffer in zip(user_ids, buffers):
+        for video_id, value in buffer.items():
+            entries[(user_id, int(_decode(video_id)))] = _parse_entry(value)
+    if not entries:
+        return 0
+
+    existing_videos = set(Video.objects.filter(
+        id__in={video_id for _, video_id in entries}
+    ).values_list('id', flat=True))
+    rows = [
+        WatchProgress(user_id=user_id, video_id=video_id, position=position, updated_at=updated_at)
+        for (user_id, video_id), (position, updated_at) in entries.items()
+        if video_id in existing_videos
+    ]
+    WatchProgress.objects.bulk_create(
+        rows,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=['user', 'video'],
+        update_fields=['position', 'updated_at'],
+    )
+    return len(rows)
+
+
+def get_continue_watching(user_id, limit=20):
+    """
+    Returns the user's unfinished videos, most recently watched first.
+    Buffered positions win over (possibly stale) database rows.
+    """
+    progress = {
+        row.video_id: (row.position, row.updated_at)
+        for row in WatchProgress.objects.filter(user_id=user_id)[:limit]
+    }
+    for video_id, (position, updated_at) in get_buffered_progress(user_id).items():
+        if video_id not in progress or progress[video_id][1] <= updated_at:
+            progress[video_id] = (position, updated_at)
+
+    videos = Video.objects.filter(is_active=True).in_bulk(list(progress))
+    items = []
+    for video_id, (position, updated_at) in progress.items():
+        video = videos.get(video_id)
+        if video is None or _is_finished(video, position):
+            continue
+        items.append({'video': video, 'position': position, 'updated_at': updated_at})
+
+    items.sort(key=lambda item: item['updated_at'], reverse=True)
+    return items[:limit]
+
+
+def _is_finished(video, position):
+    """
+    Treats the last 5% of a video (credits) as watched to the end
+    """
+    return bool(video.duration) and position >= video.duration * 0.95
@@ -0,0 +1,197 @@
+"""
+Full-text search over video titles and descriptions
+
+PostgreSQL uses the tsvector column Video.search_vector (GIN index) plus a
+trigram index on the title for typo tolerance. SQLite uses the FTS5 table
+video_video_fts and its fts5vocab companion for spelling correction.
+"""
+import difflib
+import re
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, Q
+from .models import Video
+
+FTS_TABLE = 'video_video_fts'
+FTS_VOCAB_TABLE = 'video_video_fts_vocab'
+SEARCH_INDEXED_FIELDS = {'title', 'description'}
+
+
+def get_search_vector():
+    """
+    Returns the weighted tsvector expression (title ranks above description)
+    """
+    from django.contrib.postgres.search import SearchVector
+
+    config = settings.VIDEO_SEARCH_CONFIG
+    return SearchVector('title', weight='A', config=config) + SearchVector('description', weight='B', config=config)
+
+
+def tokenize_query(query):
+    """
+    Splits a user query into lowercase word terms, dropping operators and punctuation
+    """
+    return re.findall(r'\w+', query.lower())[:10]
+
+
+def update_search_index(video):
+    """
+    Updates the search index entry of a single video
+    """
+    if connection.vendor == 'postgresql':
+        Video.objects.filter(pk=video.pk).update(search_vector=get_search_vector())
+    elif connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [video.pk])
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, description) VALUES (%s, %s, %s)",
+                [video.pk, video.title, video.description]
+            )
+
+
+def remove_from_search_index(video_id):
+    """
+    Removes a deleted video from the SQLite FTS table (PostgreSQL drops the row itself)
+    """
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [video_id])
+
+
+def rebuild_search_index():
+    """
+    Rebuilds the whole search index, e.g. after bulk imports that bypass signals
+    """
+    if connection.vendor == 'postgresql':
+        Video.objects.update(search_vector=get_search_vector())
+    elif connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, description) "
+                f"SELECT id, title, description FROM video_video"
+            )
+
+
+def search_video_ids(query, limit=None, active_only=True):
+    """
+    Returns the ids of matching videos, best match first
+    """
+    terms = tokenize_query(query)
+    if not terms:
+        return []
+
+    if connection.vendor == 'postgresql':
+        return _search_postgres(query, terms, limit, active_only)
+    if connection.vendor == 'sqlite':
+        ids = _search_sqlite(_fts_match_expression(terms), limit, active_only)
+        if not ids:
+            corrected = _fts_typo_expression(terms)
+            if corrected:
+                ids = _search_sqlite(corrected, limit, active_only)
+        return ids
+    return _search_fallback(terms, limit, active_only)
+
+
+def search_videos(query, limit=20):
+    """
+    Returns matching active videos ordered by relevance
+    """
+    ids = search_video_ids(query, limit=limit)
+    videos = Video.objects.in_bulk(ids)
+    return [videos[video_id] for video_id in ids if video_id in videos]
+
+
+def _search_postgres(query, terms, limit, active_only):
+    """
+    Ranks prefix matches on the tsvector column and adds trigram matches on
+    the title so that misspelled queries still find results
+    """
+    from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+
+    search_query = SearchQuery(
+        ' & '.join(f"{term}:*" for term in terms),
+        search_type='raw',
+        config=settings.VIDEO_SEARCH_CONFIG,
+    )
+    queryset = Video.objects.all()
+    if active_only:
+        queryset = queryset.filter(is_active=True)
+
+    queryset = queryset.filter(
+        Q(search_vector=search_query) | Q(title__trigram_word_similar=query)
+    ).annotate(
+        rank=SearchRank(F('search_vector'), search_query),
+        similarity=TrigramWordSimilarity(query, 'title'),
+    ).order_by('-rank', '-similarity', '-created_at').values_list('id', flat=True)
+
+    if limit:
+        queryset = queryset[:limit]
+    return list(queryset)
+
+
+def _fts_match_expression(terms):
+    """
+    Builds an FTS5 expression that requires every term as a prefix
+    """
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def _fts_typo_expression(terms):
+    """
+    Builds an FTS5 expression where every term may also match close
+    spellings from the index vocabulary. Returns None if nothing is close.
+    """
+    groups = []
+    changed = False
+    with connection.cursor() as cursor:
+        for term in terms:
+            cursor.execute(
+                f"SELECT term FROM {FTS_VOCAB_TABLE} "
+                f"WHERE substr(term, 1, 1) = %s AND length(term) BETWEEN %s AND %s",
+                [term[0], max(len(term) - 2, 1), len(term) + 2]
+            )
+            candidates = [row[0] for row in cursor.fetchall()]
+            matches = difflib.get_close_matches(term, candidates, n=3, cutoff=0.75)
+            changed = changed or any(match != term for match in matches)
+            alternatives = [f'"{term}"*'] + [f'"{match}"' for match in matches if match != term]
+            groups.append(f"({' OR '.join(alternatives)})")
+
+    return ' AND '.join(groups) if changed else None
+
+
+def _search_sqlite(match_expression, limit, active_only):
+    """
+    Runs an FTS5 MATCH query ranked by bm25 with the title weighted higher
+    """
+    sql = (
+        f"SELECT f.rowid FROM {FTS_TABLE} f "
+        f"JOIN video_video v ON v.id = f.rowid "
+        f"WHERE {FTS_TABLE} MATCH %s"
+    )
+    if active_only:
+        sql += " AND v.is_active"
+    sql += f" ORDER BY bm25({FTS_TABLE}, 10.0, 1.0), v.created_at DESC"
+    params = [match_expression]
+    if limit:
+        sql += " LIMIT %s"
+        params.append(limit)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _search_fallback(terms, limit, active_only):
+    """
+    Unindexed substring search for database backends without full-text support
+    """
+    queryset = Video.objects.all()
+    if active_only:
+        queryset = queryset.filter(is_active=True)
+    for term in terms:
+        queryset = queryset.filter(Q(title__icontains=term) | Q(description__icontains=term))
+    queryset = queryset.values_list('id', flat=True)
+    if limit:
+        queryset = queryset[:limit]
+    return list(queryset)
@@ -1,8 +1,11 @@
 import os
 import subprocess
+import time
 import json
 from pathlib import Path
 from django.conf import settings
+from core.instrumentation import FILE_IO, SUBPROCESS, measure
+from core.metrics import TRANSCODE_DURATION
 from .models import Video
 
 def create_hls_stream(video_file_path, video_id, resolution='720p'):
@@ -42,12 +45,17 @@ def create_hls_stream(video_file_path, video_id, resolution='720p'):
             str(hls_output)
         ]
         
-        result = subprocess.run(
-            ffmpeg_cmd,
-            capture_output=True,
-            text=True,
-            timeout=300  
-        )
+        start = time.perf_counter()
+        with measure(SUBPROCESS):
+            result = subprocess.run(
+                ffmpeg_cmd,
+                capture_output=True,
+                text=True,
+                timeout=300
+            )
+        TRANSCODE_DURATION.labels(
+            resolution=resolution, outcome='success' if result.returncode == 0 else 'error'
+        ).observe(time.perf_counter() - start)
         
         if result.returncode == 0:
             return {
@@ -75,16 +83,17 @@ def get_hls_segments(video_id, resolution='720p'):
     try:
         hls_dir = Path(settings.MEDIA_ROOT) / 'hls' / str(video_id) / resolution
         
-        if not hls_dir.exists():
-            return None
+        with measure(FILE_IO):
+            if not hls_dir.exists():
+                return None
 
-        playlist_files = list(hls_dir.glob('*.m3u8'))
-        if not playlist_files:
-            return None
+            playlist_files = list(hls_dir.glob('*.m3u8'))
+            if not playlist_files:
+                return None
+                
+            playlist_path = playlist_files[0]
             
-        playlist_path = playlist_files[0]
-        
-        segment_files = sorted(hls_dir.glob('*.ts'))
+            segment_files = sorted(hls_dir.glob('*.ts'))
         
         return {
             'success': True,
@@ -130,12 +139,13 @@ def extract_video_thumbnail(video_file_path, video_id, timestamp='00:00:01'):
             str(thumbnail_path)
         ]
         
-        result = subprocess.run(
-            ffmpeg_cmd,
-            capture_output=True,
-            text=True,
-            timeout=60 
-        )
+        with measure(SUBPROCESS):
+            result = subprocess.run(
+                ffmpeg_cmd,
+                capture_output=True,
+                text=True,
+                timeout=60
+            )
         
         if result.returncode == 0 and thumbnail_path.exists():
             relative_path = f"thumbnails/{thumbnail_filename}"
@@ -0,0 +1,106 @@
+import time
+import pytest
+from datetime import datetime, timezone as dt_timezone
+from unittest.mock import MagicMock, patch
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from video.analytics import compute_trending_scores, current_bucket, flush_view_counts, record_view
+from video.models import Video, VideoViewRollup
+
+
+@pytest.mark.django_db
+@pytest.mark.services
+@override_settings(VIDEO_VIEW_BUCKET_SECONDS=3600, TRENDING_HALF_LIFE_HOURS=12, TRENDING_WINDOW_HOURS=48)
+class VideoAnalyticsTests(TestCase):
+    """Tests für Aufrufzähler und Trending-Berechnung"""
+
+    def setUp(self):
+        cache.clear()
+        self.video = Video.objects.create(title="Popular", description="Popular")
+        self.old_hit = Video.objects.create(title="Old Hit", description="Old")
+
+    def _rollup(self, video, hours_ago, views):
+        bucket = current_bucket(time.time() - hours_ago * 3600)
+        VideoViewRollup.objects.create(
+            video=video, bucket_start=datetime.fromtimestamp(bucket, tz=dt_timezone.utc), views=views
+        )
+
+    def test_record_view_uses_single_pipeline(self):
+        """Test: Ein Aufruf erzeugt genau einen Redis-Roundtrip"""
+        redis = MagicMock()
+        with patch('video.analytics.get_redis_connection', return_value=redis):
+            record_view(self.video.id, 'user:1')
+
+        pipe = redis.pipeline.return_value
+        pipe.incr.assert_called_once()
+        pipe.pfadd.assert_called_once()
+        pipe.execute.assert_called_once()
+        self.assertFalse(VideoViewRollup.objects.exists())
+
+    def test_record_view_without_redis_counts_in_rollup(self):
+        """Test: Ohne Redis werden Aufrufe direkt im Rollup gezählt"""
+        record_view(self.video.id, 'user:1')
+        record_view(self.video.id, 'user:2')
+
+        self.assertEqual(VideoViewRollup.objects.get(video=self.video).views, 2)
+
+    def test_flush_upserts_bucket_totals(self):
+        """Test: Flusher übernimmt absolute Bucket-Werte idempotent"""
+        bucket = current_bucket()
+        redis = MagicMock()
+        redis.zrange.return_value = [str(bucket).encode()]
+        redis.pipeline.return_value.execute.side_effect = [
+            [{str(self.video.id).encode()}],
+            [b'7', 5],
+            [{str(self.video.id).encode()}],
+            [b'9', 6],
+        ]
+
+        with patch('video.analytics.get_redis_connection', return_value=redis):
+            self.assertEqual(flush_view_counts(), 1)
+            self.assertEqual(flush_view_counts(), 1)
+
+        rollup = VideoViewRollup.objects.get(video=self.video)
+        self.assertEqual((rollup.views, rollup.unique_viewers), (9, 6))
+
+    def test_trending_decays_older_views(self):
+        """Test: Ältere Aufrufe zählen weniger als aktuelle"""
+        self._rollup(self.video, hours_ago=1, views=60)
+        self._rollup(self.old_hit, hours_ago=30, views=150)
+
+        scores = compute_trending_scores()
+
+        self.assertGreater(scores[self.video.id], scores[self.old_hit.id])
+
+    def tearDown(self):
+        Video.objects.all().delete()
+        cache.clear()
+
+
+@pytest.mark.django_db
+@pytest.mark.views
+class TrendingVideoViewTests(APITestCase):
+    """Tests für die TrendingVideoView"""
+
+    def setUp(self):
+        cache.clear()
+        self.video = Video.objects.create(title="Trending", description="Trending")
+        Video.objects.create(title="Unseen", description="Unseen")
+
+    def test_trending_list_is_cached(self):
+        """Test: Trending-Liste enthält nur aufgerufene Videos und wird gecacht"""
+        record_view(self.video.id, 'user:1')
+
+        response = self.client.get(reverse('video_trending'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([video['title'] for video in response.data], ["Trending"])
+
+        with self.assertNumQueries(0):
+            self.client.get(reverse('video_trending'))
+
+    def tearDown(self):
+        Video.objects.all().delete()
+        cache.clear()
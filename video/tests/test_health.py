@@ -0,0 +1,56 @@
+import pytest
+import tempfile
+from unittest.mock import MagicMock, patch
+from django.test import TestCase, override_settings
+from core.health import clear_readiness_cache
+
+
+@pytest.mark.django_db
+@override_settings(MEDIA_ROOT=tempfile.gettempdir(), READINESS_CACHE_SECONDS=60)
+class HealthCheckTests(TestCase):
+    """Tests für die Liveness- und Readiness-Endpunkte"""
+
+    def setUp(self):
+        clear_readiness_cache()
+        self.addCleanup(clear_readiness_cache)
+
+    def test_healthz_without_queries(self):
+        """Test: /healthz antwortet ohne Datenbankzugriff, auch mit fremdem Host"""
+        with self.assertNumQueries(0):
+            response = self.client.get('/healthz', HTTP_HOST='10.0.0.7:8000')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'status': 'ok'})
+
+    @patch('core.health.shutil.which', return_value='/usr/bin/ffmpeg')
+    def test_readyz_checks_dependencies(self, which):
+        """Test: /readyz prüft Datenbank, Cache, Media-Volume und ffmpeg"""
+        redis = MagicMock()
+        with patch('core.health.get_redis_connection', return_value=redis):
+            response = self.client.get('/readyz')
+
+        self.assertEqual(response.status_code, 200)
+        checks = response.json()['checks']
+        self.assertEqual({name: check['status'] for name, check in checks.items()},
+                         {'database': 'ok', 'cache': 'ok', 'media': 'ok', 'ffmpeg': 'ok'})
+        redis.ping.assert_called_once()
+
+    @patch('core.health.shutil.which', return_value=None)
+    def test_readyz_unavailable_without_ffmpeg(self, which):
+        """Test: Fehlt ffmpeg, meldet /readyz 503 ohne Fehlerdetails (nur im Log)"""
+        with self.assertLogs('core.health', level='WARNING') as logs:
+            response = self.client.get('/readyz')
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()['checks']['ffmpeg']['status'], 'error')
+        self.assertNotIn('not found', response.content.decode())
+        self.assertIn('ffmpeg not found', '\n'.join(logs.output))
+
+    @patch('core.health.shutil.which', return_value='/usr/bin/ffmpeg')
+    def test_readyz_result_is_cached(self, which):
+        """Test: Häufige Proben führen die Prüfungen nur einmal aus"""
+        self.client.get('/readyz')
+        with self.assertNumQueries(0):
+            response = self.client.get('/readyz')
+
+        self.assertEqual(response.status_code, 200)
+        which.assert_called_once()
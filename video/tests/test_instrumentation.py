@@ -0,0 +1,75 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from core.instrumentation import (
+    CACHE, SUBPROCESS, ServerTimingMiddleware, cache_get, current_metrics, measure,
+)
+from video.models import Video
+from video.services import extract_video_thumbnail
+
+
+@pytest.mark.django_db
+class ServerTimingMiddlewareTests(TestCase):
+    """Tests für die Server-Timing-Instrumentierung"""
+
+    def setUp(self):
+        cache.clear()
+        self.video = Video.objects.create(title='Timed Video', description='Timing', category='drama')
+
+    def _run(self, view):
+        return ServerTimingMiddleware(view)(RequestFactory().get('/api/video/'))
+
+    def test_records_queries_and_cache(self):
+        """Test: SQL-Abfragen und Cache-Treffer erscheinen im Header"""
+        cache.set('timed', 'value')
+
+        def view(request):
+            list(Video.objects.all())
+            Video.objects.count()
+            cache_get('timed')
+            cache_get('missing')
+            return HttpResponse()
+
+        response = self._run(view)
+        header = response['Server-Timing']
+        self.assertIn('db;dur=', header)
+        self.assertIn('desc="2 calls"', header)
+        self.assertIn('cache;dur=', header)
+        self.assertIn('desc="1 hits, 1 misses"', header)
+        self.assertIn('total;dur=', header)
+
+    def test_records_subprocess_time(self):
+        """Test: ffmpeg-Aufrufe in video.services werden als subprocess erfasst"""
+        seen = {}
+
+        def view(request):
+            with patch('video.services.subprocess.run', return_value=MagicMock(returncode=1)):
+                extract_video_thumbnail('/tmp/missing.mp4', self.video.id)
+            seen.update(current_metrics().counts)
+            return HttpResponse()
+
+        self._run(view)
+        self.assertEqual(seen[SUBPROCESS], 1)
+
+    def test_logs_structured_line(self):
+        """Test: Pro Anfrage wird eine request_timing-Zeile mit den Werten geloggt"""
+        with self.assertLogs('core.instrumentation', level='INFO') as logs:
+            self._run(lambda request: HttpResponse(status=204))
+        self.assertIn('request_timing method=GET path=/api/video/ status=204', logs.output[0])
+        self.assertEqual(logs.records[0].timing['status'], 204)
+
+    @override_settings(PERF_TIMING_HEADER=False, PERF_TIMING_LOG=False)
+    def test_header_and_log_switchable(self):
+        """Test: Header und Log lassen sich einzeln abschalten"""
+        with self.assertNoLogs('core.instrumentation'):
+            response = self._run(lambda request: HttpResponse())
+        self.assertNotIn('Server-Timing', response)
+
+    def test_helpers_are_noops_outside_requests(self):
+        """Test: Ohne Middleware messen measure() und cache_get() nichts"""
+        cache.set('timed', 'value')
+        with measure(CACHE):
+            self.assertEqual(cache_get('timed'), 'value')
+        self.assertIsNone(current_metrics())
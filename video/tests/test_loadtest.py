@@ -0,0 +1,32 @@
+import pytest
+from django.test import LiveServerTestCase, override_settings
+from video.loadtest import FIXTURE_TITLE_PREFIX, create_fixtures, delete_fixtures, run_load_test
+from video.models import Video
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(THROTTLE_ENABLED=False)
+class LoadTestHarnessTests(LiveServerTestCase):
+    """Tests für den Lastgenerator gegen einen laufenden Server"""
+
+    def setUp(self):
+        _, videos = create_fixtures(videos=2, segments=3, segment_kb=4)
+        self.video_ids = [video.id for video in videos]
+        self.addCleanup(delete_fixtures)
+
+    def test_sessions_hit_every_endpoint_without_errors(self):
+        """Test: Jede Sitzung durchläuft Login, Katalog, Manifest, Segmente und Sprung"""
+        # The live server shares one in-memory SQLite connection, so sessions run one at a time
+        report, elapsed = run_load_test(self.live_server_url, self.video_ids, sessions=2, concurrency=1,
+                                        segments=3, speed=1000)
+
+        self.assertEqual(report['login']['count'], 2)
+        self.assertEqual(report['segment']['count'], 6)
+        for endpoint in ('login', 'catalog', 'manifest', 'segment', 'seek'):
+            self.assertEqual(report[endpoint]['errors'], 0, (endpoint, report[endpoint]['statuses']))
+        self.assertGreater(elapsed, 0)
+
+    def test_fixtures_are_removed(self):
+        """Test: delete_fixtures entfernt Videos und HLS-Dateien"""
+        delete_fixtures()
+        self.assertFalse(Video.objects.filter(title__startswith=FIXTURE_TITLE_PREFIX).exists())
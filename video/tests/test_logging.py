@@ -0,0 +1,66 @@
+import json
+import logging
+import os
+import sys
+import tempfile
+from django.test import SimpleTestCase
+from core.log import JSONFormatter, NonBlockingHandler, SamplingFilter
+
+
+def make_record(level=logging.INFO, msg='segment %s', args=('a.ts',), **extra):
+    record = logging.LogRecord('video.test', level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class StructuredLoggingTests(SimpleTestCase):
+    """Tests für die nicht blockierende JSON-Logging-Pipeline"""
+
+    def test_json_formatter_includes_extra_fields(self):
+        """Test: Der JSON-Formatter schreibt Nachricht, Logger und extra-Felder"""
+        entry = json.loads(JSONFormatter().format(make_record(video_id=7)))
+
+        self.assertEqual(entry['message'], 'segment a.ts')
+        self.assertEqual(entry['logger'], 'video.test')
+        self.assertEqual(entry['level'], 'INFO')
+        self.assertEqual(entry['video_id'], 7)
+
+    def test_handler_writes_from_listener_thread(self):
+        """Test: Einträge landen über die Queue als JSON-Zeilen in der Datei"""
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        handler = NonBlockingHandler(filename=path)
+        handler.setFormatter(JSONFormatter())
+        handler.listener.handlers = handler.listener.handlers[1:]
+
+        try:
+            raise ValueError('kaputt')
+        except ValueError:
+            record = make_record(level=logging.ERROR, msg='failed', args=())
+            record.exc_info = sys.exc_info()
+            handler.handle(record)
+        handler.close()
+
+        with open(path) as f:
+            entry = json.loads(f.readline())
+        self.assertEqual(entry['message'], 'failed')
+        self.assertIn('ValueError: kaputt', entry['exception'])
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        """Test: Bei voller Queue werden Einträge verworfen statt zu blockieren"""
+        handler = NonBlockingHandler(queue_size=1)
+        handler.stop()
+
+        handler.handle(make_record())
+        handler.handle(make_record())
+
+        self.assertEqual(handler.dropped, 1)
+        handler.close()
+
+    def test_sampling_filter(self):
+        """Test: Sampling verwirft Info-Einträge, Warnungen kommen immer durch"""
+        sampling = SamplingFilter(rate=0)
+
+        self.assertFalse(sampling.filter(make_record()))
+        self.assertTrue(sampling.filter(make_record(level=logging.WARNING)))
@@ -0,0 +1,85 @@
+import pytest
+import shutil
+import tempfile
+from pathlib import Path
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from prometheus_client import REGISTRY
+from auth_app.models import OutboundEmail
+from auth_app.services import process_outbox, queue_email
+from video.models import Video
+from video.utils import create_segment_response, get_cached_catalog
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@pytest.mark.django_db
+@override_settings(METRICS_ENABLED=True, MIDDLEWARE=[*settings.MIDDLEWARE[:1], 'core.metrics.PrometheusMiddleware', *settings.MIDDLEWARE[1:]])
+class MetricsTests(TestCase):
+    """Tests für den /metrics-Endpunkt und die Hot-Path-Metriken"""
+
+    def setUp(self):
+        cache.clear()
+        Video.objects.create(title='Metrics Video', description='Metrics', category='drama', is_active=True)
+
+    def test_endpoint_exposes_metrics(self):
+        """Test: /metrics liefert Latenzen pro View und die Warteschlangenlänge"""
+        self.client.get('/api/video/')
+        OutboundEmail.objects.create(subject='S', to_email='a@example.com', from_email='f@example.com', body_text='x')
+
+        response = self.client.get('/metrics')
+
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn('http_request_duration_seconds_bucket{', body)
+        self.assertIn('view="video_list"', body)
+        self.assertIn('email_outbox_queue_depth{status="queued"} 1.0', body)
+
+    @override_settings(METRICS_ALLOWED_IPS=[], METRICS_TOKEN='scrape-secret')
+    def test_endpoint_requires_allowlist_or_token(self):
+        """Test: /metrics ist ohne erlaubte IP nur mit Bearer-Token abrufbar"""
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-secret').status_code, 200)
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_endpoint_disabled_by_setting(self):
+        """Test: Ohne METRICS_ENABLED gibt es keinen /metrics-Endpunkt"""
+        self.assertEqual(self.client.get('/metrics').status_code, 404)
+
+    def test_catalog_cache_hits_and_misses(self):
+        """Test: Treffer und Fehlgriffe des Katalog-Caches werden gezählt"""
+        misses = sample('cache_lookups_total', cache='catalog', result='miss')
+        hits = sample('cache_lookups_total', cache='catalog', result='hit')
+
+        get_cached_catalog()
+        get_cached_catalog()
+
+        self.assertEqual(sample('cache_lookups_total', cache='catalog', result='miss'), misses + 1)
+        self.assertEqual(sample('cache_lookups_total', cache='catalog', result='hit'), hits + 1)
+
+    def test_segment_bytes_counted(self):
+        """Test: Ausgelieferte Segment-Bytes werden pro Auflösung gezählt"""
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, True)
+        segment = Path(media_root) / '720p' / 'segment_000.ts'
+        segment.parent.mkdir()
+        segment.write_bytes(b'x' * 188)
+        before = sample('hls_segment_bytes_served_total', resolution='720p')
+
+        create_segment_response(segment).close()
+
+        self.assertEqual(sample('hls_segment_bytes_served_total', resolution='720p'), before + 188)
+
+    @override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+    def test_email_delivery_latency_observed(self):
+        """Test: Die Zustelllatenz versendeter E-Mails wird beobachtet"""
+        before = sample('email_delivery_latency_seconds_count')
+        queue_email('Betreff', 'user@example.com', '<p>Hallo</p>')
+
+        process_outbox()
+
+        self.assertEqual(sample('email_delivery_latency_seconds_count'), before + 1)
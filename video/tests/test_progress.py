@@ -0,0 +1,93 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from auth_app.models import CustomUser
+from video.models import Video, WatchProgress
+from video.progress import flush_progress
+
+
+@pytest.mark.django_db
+@pytest.mark.services
+class WatchProgressTests(APITestCase):
+    """Tests für Wiedergabefortschritt und 'Weiterschauen'"""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email='viewer@example.com', password='testpass123')
+        self.video = Video.objects.create(title="Progress Video", description="Progress", duration=600)
+        self.other_video = Video.objects.create(title="Second Video", description="Second", duration=600)
+        self.client.force_authenticate(user=self.user)
+
+    def test_heartbeat_without_redis_writes_through(self):
+        """Test: Ohne Redis wird der Fortschritt direkt gespeichert"""
+        url = reverse('watch_progress', kwargs={'video_id': self.video.id})
+
+        self.assertEqual(self.client.post(url, {'position': 30}, format='json').status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.client.post(url, {'position': 45}, format='json').status_code, status.HTTP_204_NO_CONTENT)
+
+        progress = WatchProgress.objects.get(user=self.user, video=self.video)
+        self.assertEqual(progress.position, 45)
+
+    def test_heartbeat_requires_authentication(self):
+        """Test: Heartbeat ohne Anmeldung wird abgelehnt"""
+        self.client.force_authenticate(user=None)
+        url = reverse('watch_progress', kwargs={'video_id': self.video.id})
+
+        response = self.client.post(url, {'position': 30}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_heartbeat_for_unknown_video_returns_404(self):
+        """Test: Heartbeat für unbekannte oder inaktive Videos liefert 404 statt 500"""
+        Video.objects.filter(id=self.other_video.id).update(is_active=False)
+
+        for video_id in (99999, self.other_video.id):
+            url = reverse('watch_progress', kwargs={'video_id': video_id})
+            response = self.client.post(url, {'position': 30}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(WatchProgress.objects.exists())
+
+    def test_continue_watching_prefers_buffer(self):
+        """Test: Gepufferte Positionen überschreiben ältere Datenbankwerte"""
+        WatchProgress.objects.create(
+            user=self.user, video=self.video, position=10,
+            updated_at=timezone.now() - timezone.timedelta(hours=1)
+        )
+        WatchProgress.objects.create(user=self.user, video=self.other_video, position=599)
+        buffered = {self.video.id: (120, timezone.now())}
+
+        with patch('video.progress.get_buffered_progress', return_value=buffered):
+            response = self.client.get(reverse('continue_watching'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]['video']['id'], self.video.id)
+        self.assertEqual(response.data[0]['position'], 120)
+
+    def test_flush_bulk_upserts_buffer(self):
+        """Test: Flusher schreibt gepufferte Positionen gesammelt in die Datenbank"""
+        WatchProgress.objects.create(user=self.user, video=self.video, position=10)
+        timestamp = timezone.now().timestamp()
+        redis = MagicMock()
+        redis.spop.side_effect = [[str(self.user.id).encode()], []]
+        redis.pipeline.return_value.execute.return_value = [{
+            str(self.video.id).encode(): f"300:{timestamp}".encode(),
+            str(self.other_video.id).encode(): f"20:{timestamp}".encode(),
+            b'99999': f"5:{timestamp}".encode(),
+        }]
+
+        with patch('video.progress.get_redis_connection', return_value=redis):
+            flushed = flush_progress(batch_size=100)
+
+        self.assertEqual(flushed, 2)
+        positions = dict(WatchProgress.objects.filter(user=self.user).values_list('video_id', 'position'))
+        self.assertEqual(positions, {self.video.id: 300, self.other_video.id: 20})
+        trim = redis.pipeline.return_value.eval.call_args
+        self.assertEqual(trim.args[2], f'watch_progress:{self.user.id}')
+        self.assertEqual(trim.args[3:5], (str(self.video.id).encode(), f"300:{timestamp}".encode()))
+        self.assertEqual(len(trim.args[3:]), 6)
+
+    def tearDown(self):
+        Video.objects.all().delete()
+        CustomUser.objects.all().delete()
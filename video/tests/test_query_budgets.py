@@ -0,0 +1,95 @@
+import pytest
+import shutil
+import tempfile
+from pathlib import Path
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from auth_app.models import CustomUser
+from auth_app.tokens import VersionedRefreshToken
+from core.testing import QueryBudgetMixin
+from video.models import Video, WatchProgress
+
+
+@pytest.mark.django_db
+@pytest.mark.views
+class VideoQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    """Query-Budgets der Video-Endpunkte bei wachsender Anzahl an Videos"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = CustomUser.objects.create_user(email='budget@example.com', password='budget', username='budget')
+        self.video = Video.objects.create(title='Budget Video', description='Budget', category='drama')
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {VersionedRefreshToken.for_user(self.user).access_token}'}
+
+    def seed_videos(self, size):
+        """Ergänzt weitere Videos (mit Wiedergabefortschritt des Benutzers) bis zur Anzahl size"""
+        missing = size - WatchProgress.objects.count()
+        videos = Video.objects.bulk_create(
+            Video(title=f'Budget Video {index}', description='Budget', category='action', is_active=True)
+            for index in range(missing)
+        )
+        WatchProgress.objects.bulk_create(
+            WatchProgress(user=self.user, video=video, position=30) for video in videos
+        )
+
+    def test_video_list(self):
+        """Test: Die Videoliste braucht unabhängig von der Anzahl Videos gleich viele Abfragen"""
+        self.assertQueryBudget(1, lambda: self.client.get(reverse('video_list')), self.seed_videos)
+
+    def test_video_home(self):
+        """Test: Die Startseite bleibt bei einer Abfrage"""
+        self.assertQueryBudget(1, lambda: self.client.get(reverse('video_home')), self.seed_videos)
+
+    def test_trending(self):
+        """Test: Trending-Liste mit konstanter Anzahl Abfragen"""
+        self.assertQueryBudget(1, lambda: self.client.get(reverse('video_trending')), self.seed_videos)
+
+    def test_search(self):
+        """Test: Die Suche lädt Treffer gesammelt statt pro Zeile"""
+        self.assertQueryBudget(
+            2, lambda: self.client.get(reverse('video_search'), {'q': 'budget'}), self.seed_videos
+        )
+
+    def test_continue_watching(self):
+        """Test: Weiterschauen lädt Fortschritt und Videos ohne N+1"""
+        self.assertQueryBudget(
+            2, lambda: self.client.get(reverse('continue_watching'), **self.auth), self.seed_videos
+        )
+
+    def test_watch_progress(self):
+        """Test: Ein Heartbeat kostet Authentifizierung, Video-Lookup plus Upsert"""
+        self.assertQueryBudget(
+            6,
+            lambda: self.client.post(reverse('watch_progress', args=[self.video.id]), {'position': 42}, **self.auth),
+            self.seed_videos,
+        )
+
+    def test_hls_manifest_single_video_lookup(self):
+        """Test: Das Manifest lädt das Video nur einmal (plus Aufruf-Zähler)"""
+        self.assertQueryBudget(
+            3, lambda: self.client.get(reverse('hls_manifest', args=[self.video.id, '720p'])), self.seed_videos
+        )
+
+    def test_hls_segment_without_queries(self):
+        """Test: Segmente werden ohne Datenbankzugriff ausgeliefert"""
+        segment = Path(self.media_root) / 'hls' / str(self.video.id) / '720p' / 'segment_000.ts'
+        segment.parent.mkdir(parents=True)
+        segment.write_bytes(b'\x47' * 188)
+
+        self.assertQueryBudget(
+            0,
+            lambda: self.client.get(reverse('hls_segment', args=[self.video.id, '720p', 'segment_000.ts'])),
+            self.seed_videos,
+        )
+
+    def test_direct_video(self):
+        """Test: Direktes Video mit einer Abfrage"""
+        self.assertQueryBudget(
+            1, lambda: self.client.get(reverse('direct_video', args=[self.video.id])), self.seed_videos
+        )
@@ -0,0 +1,72 @@
+import pytest
+import shutil
+import tempfile
+from django.core.management import call_command
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, TransactionTestCase, override_settings
+from core.db_router import PIN_COOKIE, ReplicaPinningMiddleware, _pinned, is_pinned
+from video.models import Video
+
+REPLICA = 'replica_test'
+
+
+@pytest.mark.django_db(transaction=True)
+class ReplicaRouterTests(TransactionTestCase):
+    """Tests für das Read-Replica-Routing mit zwei SQLite-Datenbanken"""
+    databases = {'default', REPLICA}
+
+    @classmethod
+    def setUpClass(cls):
+        cls.replica_dir = tempfile.mkdtemp()
+        connections.settings[REPLICA] = {
+            **connections.settings['default'],
+            'NAME': f'{cls.replica_dir}/replica.sqlite3',
+        }
+        call_command('migrate', database=REPLICA, verbosity=0)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.settings[REPLICA]
+        shutil.rmtree(cls.replica_dir, ignore_errors=True)
+
+    def setUp(self):
+        self.video = Video.objects.create(title='Replica Video', description='Only on the primary', category='drama')
+        _pinned.set(False)
+
+    @override_settings(DATABASE_REPLICAS=[REPLICA])
+    def test_video_reads_go_to_replica(self):
+        """Test: Video-Lesezugriffe gehen an das Replica, Schreibzugriffe an den Primary"""
+        self.assertEqual(Video.objects.count(), 0)
+        self.assertEqual(Video.objects.using('default').count(), 1)
+
+    @override_settings(DATABASE_REPLICAS=[REPLICA])
+    def test_reads_pinned_to_primary_after_write(self):
+        """Test: Nach einem Schreibzugriff liest derselbe Ablauf vom Primary"""
+        Video.objects.filter(pk=self.video.pk).update(is_active=True)
+        self.assertEqual(Video.objects.count(), 1)
+
+    def test_without_replicas_reads_primary(self):
+        """Test: Ohne konfigurierte Replicas bleibt alles auf dem Primary"""
+        self.assertEqual(Video.objects.count(), 1)
+
+    @override_settings(DATABASE_REPLICAS=[REPLICA], DATABASE_REPLICA_PIN_SECONDS=7)
+    def test_middleware_pins_client_after_write(self):
+        """Test: Die Middleware setzt nach Schreibzugriffen ein Pin-Cookie und beachtet es"""
+        def write_view(request):
+            Video.objects.filter(pk=self.video.pk).update(is_active=True)
+            return HttpResponse()
+
+        response = ReplicaPinningMiddleware(write_view)(RequestFactory().post('/'))
+        self.assertEqual(response.cookies[PIN_COOKIE]['max-age'], 7)
+
+        seen = []
+        request = RequestFactory().get('/')
+        request.COOKIES[PIN_COOKIE] = '1'
+        ReplicaPinningMiddleware(lambda request: seen.append(is_pinned()) or HttpResponse())(request)
+        ReplicaPinningMiddleware(lambda request: seen.append(is_pinned()) or HttpResponse())(RequestFactory().get('/'))
+        self.assertEqual(seen, [True, False])
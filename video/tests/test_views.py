@@ -1,10 +1,13 @@
+import gzip
 import pytest
 from unittest.mock import patch
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
+from auth_app.models import CustomUser
 from video.models import Video
 
 
@@ -69,6 +72,149 @@ class VideoListViewTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
 
+@pytest.mark.django_db
+@pytest.mark.views
+@override_settings(VIDEO_HOME_ROW_LIMIT=2)
+class VideoHomeViewTests(APITestCase):
+    """Tests für die VideoHomeView"""
+    
+    def setUp(self):
+        cache.clear()
+        self.action_videos = [
+            Video.objects.create(title=f"Action {i}", description="Action", category="action")
+            for i in range(3)
+        ]
+        self.comedy_video = Video.objects.create(title="Comedy", description="Comedy", category="comedy")
+        Video.objects.create(title="Inactive Drama", description="Drama", category="drama", is_active=False)
+    
+    def _rows(self):
+        response = self.client.get(reverse('video_home'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {row['category']: [video['title'] for video in row['videos']] for row in response.data}
+    
+    def test_home_groups_top_videos_per_category(self):
+        """Test: Neueste Videos pro Kategorie, begrenzt und ohne inaktive Videos"""
+        rows = self._rows()
+        
+        self.assertEqual(list(rows), ['action', 'comedy'])
+        self.assertEqual(rows['action'], ["Action 2", "Action 1"])
+        self.assertEqual(rows['comedy'], ["Comedy"])
+    
+    def test_home_served_from_cache(self):
+        """Test: Zweiter Aufruf benötigt keine Datenbankabfrage"""
+        self._rows()
+        
+        with self.assertNumQueries(0):
+            self._rows()
+    
+    def test_home_rebuilds_changed_categories(self):
+        """Test: Kategorie-Wechsel aktualisiert beide betroffenen Zeilen"""
+        self._rows()
+        
+        self.comedy_video.category = 'drama'
+        self.comedy_video.save()
+        Video.objects.create(title="Action 3", description="Action", category="action")
+        
+        rows = self._rows()
+        self.assertEqual(rows['action'], ["Action 3", "Action 2"])
+        self.assertEqual(rows['drama'], ["Comedy"])
+        self.assertNotIn('comedy', rows)
+    
+    def tearDown(self):
+        Video.objects.all().delete()
+        cache.clear()
+
+
+@pytest.mark.django_db
+@pytest.mark.views
+class VideoSearchViewTests(APITestCase):
+    """Tests für die VideoSearchView"""
+    
+    def setUp(self):
+        self.dragon = Video.objects.create(title="Dragon Castle", description="A knight and a wizard", category="action")
+        self.ocean = Video.objects.create(title="Ocean Voyage", description="Sailors meet a dragon", category="drama")
+        Video.objects.create(title="Dragon Secrets", description="Hidden", is_active=False)
+    
+    def _search(self, query):
+        response = self.client.get(reverse('video_search'), {'q': query})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [video['title'] for video in response.data]
+    
+    def test_search_ranks_title_matches_first(self):
+        """Test: Titeltreffer vor Beschreibungstreffern, inaktive Videos ausgeblendet"""
+        self.assertEqual(self._search("dragon"), ["Dragon Castle", "Ocean Voyage"])
+    
+    def test_search_prefix_and_typo(self):
+        """Test: Präfix- und Tippfehler-tolerante Suche"""
+        self.assertEqual(self._search("voy"), ["Ocean Voyage"])
+        self.assertEqual(self._search("wizrd"), ["Dragon Castle"])
+    
+    def test_search_index_follows_changes(self):
+        """Test: Suchindex wird beim Speichern und Löschen aktualisiert"""
+        self.ocean.title = "Harbor Lights"
+        self.ocean.description = "Calm water"
+        self.ocean.save()
+        self.dragon.delete()
+        
+        self.assertEqual(self._search("dragon"), [])
+        self.assertEqual(self._search("harbor"), ["Harbor Lights"])
+    
+    def test_search_empty_query(self):
+        """Test: Leere Suche liefert leere Liste"""
+        self.assertEqual(self._search(""), [])
+    
+    def tearDown(self):
+        Video.objects.all().delete()
+
+
+@pytest.mark.django_db
+@pytest.mark.views
+@override_settings(COMPRESSION_MIN_SIZE=100)
+class ResponseCompressionTests(APITestCase):
+    """Tests für die Kompression von Katalog-Antworten"""
+    
+    def setUp(self):
+        cache.clear()
+        for i in range(5):
+            Video.objects.create(title=f"Compressed {i}", description="Long description " * 10, category="drama")
+    
+    def test_catalog_gzip_from_precompressed_variant(self):
+        """Test: Katalog wird gzip-komprimiert aus dem Cache ausgeliefert"""
+        url = reverse('video_list')
+        plain = self.client.get(url)
+        
+        with patch('video.utils.precompress') as mock_precompress, patch('core.compression.compress') as mock_compress:
+            response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        
+        mock_precompress.assert_not_called()
+        mock_compress.assert_not_called()
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+    
+    def test_catalog_uncompressed_without_accept_encoding(self):
+        """Test: Ohne Accept-Encoding keine Kompression"""
+        response = self.client.get(reverse('video_list'), HTTP_ACCEPT_ENCODING='gzip;q=0')
+        
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(len(response.data), 5)
+    
+    @override_settings(COMPRESSION_MIN_SIZE=0)
+    def test_auth_responses_never_compressed(self):
+        """Test: Antworten mit Tokens (Login) werden nicht komprimiert (BREACH)"""
+        CustomUser.objects.create_user(email='breach@example.com', password='breachpass123', is_active=True)
+        
+        response = self.client.post(reverse('login'), {'email': 'breach@example.com', 'password': 'breachpass123'},
+                                    format='json', HTTP_ACCEPT_ENCODING='gzip')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('Content-Encoding'))
+    
+    def tearDown(self):
+        Video.objects.all().delete()
+        cache.clear()
+
+
 @pytest.mark.django_db
 @pytest.mark.views
 class HLSManifestViewTests(APITestCase):
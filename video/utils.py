@@ -1,6 +1,7 @@
 """
 Helper functions for the Video app
 """
+import logging
 import os
 from pathlib import Path
 from rest_framework.response import Response
@@ -8,8 +9,21 @@ from rest_framework import status
 from django.http import HttpResponse, HttpResponseRedirect, FileResponse, JsonResponse
 from django.shortcuts import get_object_or_404
 from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from core.compression import precompress
+from core.instrumentation import FILE_IO, cache_get, measure
+from core.metrics import SEGMENT_BYTES, record_cache_lookup
 from .models import Video
 
+HOME_DOCUMENT_CACHE_KEY = 'video_home_document'
+CATALOG_CACHE_KEY = 'video_list_public'
+MANIFEST_CACHE_KEY = 'hls_manifest:{video_id}:{resolution}:{version}'
+
+logger = logging.getLogger(__name__)
+segment_logger = logging.getLogger('video.segments')
+
 
 def get_video_list():
     """
@@ -22,18 +36,144 @@ def get_video_list():
         return []
 
 
-def create_hls_manifest_content(video_id, resolution):
+def render_json(data):
+    """
+    Renders data exactly like the API's default JSON renderer
+    """
+    from rest_framework.settings import api_settings
+    return api_settings.DEFAULT_RENDERER_CLASSES[0]().render(data)
+
+
+def get_cached_catalog():
+    """
+    Returns the serialized video list together with its rendered and
+    precompressed JSON variants, building them on a cache miss
+    """
+    catalog = cache_get(CATALOG_CACHE_KEY)
+    record_cache_lookup('catalog', catalog is not None)
+    if catalog is None:
+        from .api.serializers import VideoSerializer
+        
+        data = list(VideoSerializer(get_video_list(), many=True).data)
+        catalog = {'data': data, 'variants': precompress(render_json(data))}
+        cache.set(CATALOG_CACHE_KEY, catalog, settings.VIDEO_LIST_CACHE_TIMEOUT)
+    return catalog
+
+
+def get_manifest_variants(video, resolution):
+    """
+    Returns the manifest of a video as identity and precompressed variants.
+    Only manifests of finished HLS streams are cached; the key contains
+    updated_at so that saving the video invalidates it.
+    """
+    cache_key = MANIFEST_CACHE_KEY.format(
+        video_id=video.id, resolution=resolution, version=int(video.updated_at.timestamp())
+    )
+    variants = cache_get(cache_key)
+    record_cache_lookup('manifest', variants is not None)
+    if variants is None:
+        playlist_file = Path(settings.MEDIA_ROOT) / 'hls' / str(video.id) / resolution / 'playlist.m3u8'
+        variants = precompress(create_hls_manifest_content(video.id, resolution, video=video))
+        with measure(FILE_IO):
+            finished = playlist_file.exists()
+        if finished:
+            cache.set(cache_key, variants, settings.HLS_MANIFEST_CACHE_TIMEOUT)
+    return variants
+
+
+def get_top_videos_per_category(limit, categories=None):
+    """
+    Retrieves the newest active videos of every category with a single
+    ROW_NUMBER() window query partitioned by category
+    """
+    queryset = Video.objects.filter(is_active=True)
+    if categories is not None:
+        queryset = queryset.filter(category__in=categories)
+    
+    return queryset.annotate(
+        category_rank=Window(
+            expression=RowNumber(),
+            partition_by=[F('category')],
+            order_by=[F('created_at').desc(), F('id').desc()],
+        )
+    ).filter(category_rank__lte=limit).order_by('category', 'category_rank')
+
+
+def build_home_rows(categories=None):
+    """
+    Serializes the top videos per category into home screen rows
+    """
+    from .api.serializers import VideoSerializer
+    
+    videos_by_category = {}
+    for video in get_top_videos_per_category(settings.VIDEO_HOME_ROW_LIMIT, categories):
+        videos_by_category.setdefault(video.category, []).append(video)
+    
+    return {
+        category: list(VideoSerializer(videos, many=True).data)
+        for category, videos in videos_by_category.items()
+    }
+
+
+def assemble_home_document(rows):
+    """
+    Orders the rows by CATEGORY_CHOICES and drops empty categories
+    """
+    return [
+        {'category': category, 'label': label, 'videos': rows[category]}
+        for category, label in Video.CATEGORY_CHOICES
+        if rows.get(category)
+    ]
+
+
+def get_home_document():
+    """
+    Returns the precomputed home screen document, building it on a cache miss
+    """
+    document = cache_get(HOME_DOCUMENT_CACHE_KEY)
+    if document is None:
+        document = assemble_home_document(build_home_rows())
+        cache.set(HOME_DOCUMENT_CACHE_KEY, document, settings.VIDEO_HOME_CACHE_TIMEOUT)
+    return document
+
+
+def refresh_home_document(video):
+    """
+    Rebuilds only the rows affected by a changed video: its current category
+    and any row that still lists it (e.g. after a category change)
+    """
+    document = cache.get(HOME_DOCUMENT_CACHE_KEY)
+    if document is None:
+        return
+    
+    categories = {video.category}
+    for row in document:
+        if any(item['id'] == video.id for item in row['videos']):
+            categories.add(row['category'])
+    
+    rows = {row['category']: row['videos'] for row in document}
+    for category in categories:
+        rows.pop(category, None)
+    rows.update(build_home_rows(categories))
+    
+    cache.set(HOME_DOCUMENT_CACHE_KEY, assemble_home_document(rows), settings.VIDEO_HOME_CACHE_TIMEOUT)
+
+
+def create_hls_manifest_content(video_id, resolution, video=None):
     """
-    Creates HLS manifest content using real HLS segments
+    Creates HLS manifest content using real HLS segments. Callers that
+    already loaded the video pass it to avoid a second lookup.
     """
     from pathlib import Path
     
     hls_dir = Path(settings.MEDIA_ROOT) / 'hls' / str(video_id) / resolution
     playlist_file = hls_dir / 'playlist.m3u8'
     
-    if playlist_file.exists():
+    with measure(FILE_IO):
+        playlist_exists = playlist_file.exists()
+    if playlist_exists:
         try:
-            with open(playlist_file, 'r') as f:
+            with measure(FILE_IO), open(playlist_file, 'r') as f:
                 playlist_content = f.read()
             
             base_url = f"{settings.SITE_URL}/api/video/{video_id}/{resolution}/"
@@ -48,9 +188,10 @@ def create_hls_manifest_content(video_id, resolution):
             
             return '\n'.join(updated_lines)
         except Exception as e:
-            print(f"Fehler beim Lesen der HLS-Playlist: {e}")
+            logger.warning('Fehler beim Lesen der HLS-Playlist %s: %s', playlist_file, e)
     
-    video = Video.objects.get(id=video_id)
+    if video is None:
+        video = Video.objects.get(id=video_id)
     if video.video_file:
         video_url = f"{settings.SITE_URL}{video.video_file.url}"
         return f"""#EXTM3U
@@ -103,7 +244,9 @@ def validate_hls_directory(hls_dir):
     """
     Validates if HLS directory exists
     """
-    if not hls_dir.exists():
+    with measure(FILE_IO):
+        exists = hls_dir.exists()
+    if not exists:
         return JsonResponse({'error': f'HLS directory not found: {hls_dir}'}, status=404)
     return None
 
@@ -112,7 +255,9 @@ def validate_segment_file(segment_path):
     """
     Validates if segment file exists
     """
-    if not segment_path.exists():
+    with measure(FILE_IO):
+        exists = segment_path.exists()
+    if not exists:
         return JsonResponse({'error': f'Segment not found: {segment_path}'}, status=404)
     return None
 
@@ -121,8 +266,18 @@ def create_segment_response(segment_path):
     """
     Creates a FileResponse for video segment
     """
+    with measure(FILE_IO):
+        segment_file = open(segment_path, 'rb')
+    size = os.fstat(segment_file.fileno()).st_size
+    SEGMENT_BYTES.labels(resolution=segment_path.parent.name).inc(size)
+    segment_logger.info('segment_served', extra={
+        'video_id': segment_path.parent.parent.name,
+        'resolution': segment_path.parent.name,
+        'segment': segment_path.name,
+        'bytes': size,
+    })
     response = FileResponse(
-        open(segment_path, 'rb'),
+        segment_file,
         content_type='video/MP2T'
     )
     